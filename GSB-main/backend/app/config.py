@@ -1,6 +1,151 @@
 import os
+from functools import lru_cache
+from typing import Literal, Optional
 
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-AWS_REGION = os.getenv("AWS_REGION", "ap-south-1")
-AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
+from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+# --- Application Settings ---
+# Every tunable lives here. Each field is read from the environment variable of
+# the same name in upper case (mongo_max_pool_size <- MONGO_MAX_POOL_SIZE), with
+# .env loaded first. Values are validated once at startup; a bad value stops the
+# app with a clear error instead of failing on the first request.
+
+READ_PREFERENCES = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+READ_CONCERNS = ("local", "available", "majority", "linearizable", "snapshot")
+
+
+class Settings(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # --- Database ---
+    mongo_uri: str
+    db_name: str
+    mongo_max_pool_size: int = Field(100, ge=1)
+    mongo_min_pool_size: int = Field(0, ge=0)
+    mongo_max_idle_time_ms: int = Field(300_000, ge=0)
+    mongo_wait_queue_timeout_ms: int = Field(5000, ge=1)
+    mongo_server_selection_timeout_ms: int = Field(5000, ge=1)
+    mongo_connect_timeout_ms: int = Field(5000, ge=1)
+    mongo_socket_timeout_ms: int = Field(30_000, ge=1)
+    # Preference order; codecs whose Python package isn't installed are skipped
+    mongo_compressors: str = "zstd,snappy,zlib"
+    mongo_secondary_read_preference: str = "secondaryPreferred"
+    mongo_secondary_read_concern: str = "local"
+    mongo_max_staleness_seconds: int = Field(-1, ge=-1)
+
+    # --- Storage ---
+    aws_access_key_id: Optional[str] = None
+    aws_secret_access_key: Optional[str] = None
+    aws_region: str = "ap-south-1"
+    aws_bucket_name: Optional[str] = None
+    # "s3" or "local" - a disk-backed stand-in for dev/tests, served at /uploads
+    storage_backend: Literal["s3", "local"] = "s3"
+    local_upload_dir: str = "uploads"
+    local_upload_base_url: str = "http://localhost:8000/uploads"
+    max_upload_bytes: int = Field(20 * 1024 * 1024, ge=1)
+    image_workers: int = Field(2, ge=1)
+
+    # --- LLM (OpenRouter) ---
+    openrouter_api_key: Optional[str] = None
+    llm_model: str = "xiaomi/mimo-v2-flash:free"
+    llm_timeout_seconds: float = Field(30.0, gt=0)
+    llm_context_discussions: int = Field(50, ge=1)
+
+    # --- Caching & Singleton Tasks ---
+    cache_backend: Literal["memory", "mongo"] = "memory"
+    village_cards_ttl_seconds: int = Field(60, ge=0)
+    scheme_poll_seconds: int = Field(300, ge=1)
+    scheme_cache_max_age: int = Field(300, ge=0)
+    leader_lock_ttl_seconds: int = Field(30, ge=3)
+
+    # --- Response Compression (brotli needs the `brotli` package) ---
+    compression_min_bytes: int = Field(1024, ge=0)
+    gzip_level: int = Field(6, ge=1, le=9)
+    brotli_quality: int = Field(4, ge=0, le=11)
+
+    # --- Rate Limiting (token buckets: burst size, refill per minute) ---
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["memory", "mongo"] = "memory"
+    write_rate_burst: int = Field(10, ge=1)
+    write_rate_per_minute: float = Field(20, gt=0)
+    login_rate_burst: int = Field(5, ge=1)
+    login_rate_per_minute: float = Field(5, gt=0)
+    # Per-IP buckets are this many times a user's (shared kiosks, mobile NAT)
+    rate_limit_ip_multiplier: int = Field(10, ge=1)
+
+    # --- Background Job Queue ---
+    job_workers: int = Field(2, ge=0)
+    job_poll_seconds: float = Field(1.0, gt=0)
+    job_max_attempts: int = Field(5, ge=1)
+    job_backoff_base_seconds: float = Field(2.0, gt=0)
+    job_backoff_max_seconds: float = Field(300.0, gt=0)
+    job_lease_seconds: int = Field(60, ge=1)
+    job_retention_seconds: int = Field(7 * 24 * 3600, ge=60)
+
+    # --- Complaint Analytics ---
+    # Bucket boundaries follow local time (IST by default)
+    analytics_utc_offset_minutes: int = Field(330, ge=-720, le=840)
+    analytics_max_days: int = Field(366, ge=1)
+    # The escalations view lists what the sweeper has stamped, so keep it frequent
+    escalation_sweep_seconds: int = Field(300, ge=10)
+
+    # --- Archival (0 days = keep everything hot) ---
+    complaint_archive_days: int = Field(365, ge=0)
+    discussion_archive_days: int = Field(365, ge=0)
+    chat_archive_days: int = Field(365, ge=0)
+    archive_interval_seconds: int = Field(6 * 3600, ge=60)
+    archive_batch_size: int = Field(500, ge=1)
+
+    # --- Query Profiling ---
+    slow_query_ms: float = Field(100, ge=0)
+    profiler_flush_seconds: int = Field(30, ge=1)
+
+    # --- Domain Rules & Page Sizes ---
+    escalation_days: int = Field(14, ge=1)
+    feed_page_size: int = Field(50, ge=1)
+    feed_max_page_size: int = Field(200, ge=1)
+    complaint_list_limit: int = Field(100, ge=1)
+    complaint_batch_limit: int = Field(200, ge=1)
+    escalation_page_size: int = Field(50, ge=1)
+    escalation_max_page_size: int = Field(500, ge=1)
+    nearby_project_radius_m: int = Field(500, ge=1)
+    nearby_project_limit: int = Field(5, ge=0)
+
+    @field_validator("cache_backend", "rate_limit_backend", "storage_backend", mode="before")
+    @classmethod
+    def lower_case(cls, value):
+        return value.lower() if isinstance(value, str) else value
+
+    @field_validator("mongo_secondary_read_preference")
+    @classmethod
+    def known_read_preference(cls, value):
+        if value not in READ_PREFERENCES:
+            raise ValueError(f"must be one of {', '.join(READ_PREFERENCES)}")
+        return value
+
+    @field_validator("mongo_secondary_read_concern")
+    @classmethod
+    def known_read_concern(cls, value):
+        if value not in READ_CONCERNS:
+            raise ValueError(f"must be one of {', '.join(READ_CONCERNS)}")
+        return value
+
+    @classmethod
+    def from_env(cls, environ=os.environ) -> "Settings":
+        values = {name: environ[name.upper()] for name in cls.model_fields if name.upper() in environ}
+        return cls(**values)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Loads .env and validates the environment once per process."""
+    load_dotenv()
+    try:
+        return Settings.from_env()
+    except ValidationError as e:
+        fields = ", ".join(str(err["loc"][0]).upper() for err in e.errors())
+        raise RuntimeError(f"Invalid configuration ({fields}):\n{e}") from None
+
+
+settings = get_settings()
@@ -1,14 +1,119 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+import importlib.util
+from app.config import settings
+from app.utils.metrics import MongoCommandMetrics, MongoPoolMetrics
+from app.utils.query_profiler import slow_query_recorder
 
-load_dotenv()
+MONGO_URI = settings.mongo_uri
+DB_NAME = settings.db_name
 
-MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME = os.getenv("DB_NAME")
+# --- Connection Pool & Timeouts ---
+# Without timeouts a Mongo hiccup hangs requests indefinitely; fail fast instead.
+MONGO_MAX_POOL_SIZE = settings.mongo_max_pool_size
+MONGO_MIN_POOL_SIZE = settings.mongo_min_pool_size
+MONGO_MAX_IDLE_TIME_MS = settings.mongo_max_idle_time_ms
+MONGO_WAIT_QUEUE_TIMEOUT_MS = settings.mongo_wait_queue_timeout_ms
+MONGO_SERVER_SELECTION_TIMEOUT_MS = settings.mongo_server_selection_timeout_ms
+MONGO_CONNECT_TIMEOUT_MS = settings.mongo_connect_timeout_ms
+MONGO_SOCKET_TIMEOUT_MS = settings.mongo_socket_timeout_ms
+# Uninstalled codecs are skipped (zstd -> `zstandard`, snappy -> `python-snappy`, zlib is built in)
+MONGO_COMPRESSORS = settings.mongo_compressors
 
-client = AsyncIOMotorClient(MONGO_URI)
+# --- Read Routing ---
+# Read-mostly endpoints (feed, user listings) use `secondary_db` and
+# may be served by secondaries; everything else reads from the primary.
+MONGO_SECONDARY_READ_PREFERENCE = settings.mongo_secondary_read_preference
+MONGO_SECONDARY_READ_CONCERN = settings.mongo_secondary_read_concern
+MONGO_MAX_STALENESS_SECONDS = settings.mongo_max_staleness_seconds
+
+COMPRESSOR_PACKAGES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+
+def available_compressors(preference: str) -> list:
+    names = []
+    for name in (c.strip() for c in preference.split(",") if c.strip()):
+        package = COMPRESSOR_PACKAGES.get(name, name)
+        if package is None or importlib.util.find_spec(package) is not None:
+            names.append(name)
+    return names
+
+
+def create_client(uri: str = MONGO_URI, **overrides) -> AsyncIOMotorClient:
+    """
+    Builds the Motor client from the settings above. `overrides` win, e.g.
+    create_client(maxPoolSize=10) for scripts.
+    Command monitoring feeds the per-collection latency histograms at /metrics
+    and the slow-query report at /api/admin/admin/slow-queries; pool monitoring
+    feeds the mongo_pool_* gauges.
+    """
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "retryReads": True,
+        "retryWrites": True,
+    }
+    compressors = available_compressors(MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    options.update(overrides)
+
+    listeners = [
+        MongoCommandMetrics(),
+        slow_query_recorder,
+        MongoPoolMetrics(options["maxPoolSize"]),
+    ]
+    return AsyncIOMotorClient(uri, event_listeners=listeners, **options)
+
+
+def database_with(client: AsyncIOMotorClient, read_preference: str, read_concern: str = None):
+    """A handle on DB_NAME with its own read preference / read concern."""
+    mode = read_pref_mode_from_name(read_preference)
+    staleness = MONGO_MAX_STALENESS_SECONDS if read_preference != "primary" else -1
+    return client.get_database(
+        DB_NAME,
+        read_preference=make_read_preference(mode, None, max_staleness=staleness),
+        read_concern=ReadConcern(read_concern),
+    )
+
+
+client = create_client()
 db = client[DB_NAME]
+secondary_db = database_with(client, MONGO_SECONDARY_READ_PREFERENCE, MONGO_SECONDARY_READ_CONCERN)
 
 async def get_database():
     return db
+
+# --- Multi-document Transactions ---
+# Only replica sets and mongos support transactions; a standalone server (local
+# dev) rejects the first command with IllegalOperation. Callers pass a fallback
+# that reaches the same end state another way (usually a queued job).
+ILLEGAL_OPERATION = 20
+transactions_supported = None  # unknown until the first attempt
+
+
+async def run_in_transaction(work, fallback):
+    """
+    Returns await work(session) run inside a transaction (retried on transient
+    errors by the driver), or await fallback() where transactions aren't available.
+    """
+    global transactions_supported
+    if transactions_supported is not False:
+        try:
+            async with await client.start_session() as session:
+                result = await session.with_transaction(work)
+            transactions_supported = True
+            return result
+        except OperationFailure as e:
+            if e.code != ILLEGAL_OPERATION:
+                raise
+            transactions_supported = False
+            print("⚠️ MongoDB transactions unavailable (standalone server); using queued fallbacks.")
+    return await fallback()
@@ -1,8 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from app.database import db
+from app.services import archive, complaint_stats, escalations, images, jobs, leader, llm, rollups, scheme_catalog, slow_queries, search as search_service
+from app.services import proposals as proposal_service
+from app.utils import s3
+from app.utils.cache import get_cache
+from app.utils import rate_limit
+from app.utils.compression import CompressionMiddleware
+from app.utils.metrics import PrometheusMiddleware, render_metrics
 from app.routers import (
+    admin,
     official_contractor_chat,
     auth, 
     community, 
@@ -12,28 +21,119 @@ from app.routers import (
     schemes, 
     proposals, 
     complaints,
+    search,
 )
 import pymongo
+import asyncio
 import os
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+async def create_indexes():
     # --- Create Indexes for Performance ---
-    print("⚡ Creating Database Indexes...")
-    try:
+    # (collection, keys, options) - created concurrently, each is independent
+    specs = [
         # Unique Constraints
-        await db.villagers.create_index([("phone_number", pymongo.ASCENDING)], unique=True)
-        await db.contractors.create_index([("contractor_id", pymongo.ASCENDING)], unique=True)
-        await db.government_officials.create_index([("government_id", pymongo.ASCENDING)], unique=True)
-        await db.schemes.create_index([("scheme_id", pymongo.ASCENDING)], unique=True)
-        
+        (db.villagers, [("phone_number", pymongo.ASCENDING)], {"unique": True}),
+        (db.contractors, [("contractor_id", pymongo.ASCENDING)], {"unique": True}),
+        (db.government_officials, [("government_id", pymongo.ASCENDING)], {"unique": True}),
+        (db.schemes, [("scheme_id", pymongo.ASCENDING)], {"unique": True}),
+
         # Rapid Feed Fetching (Descending Order on Time)
-        await db.discussions.create_index([("created_at", pymongo.DESCENDING)])
+        (db.discussions, [("created_at", pymongo.DESCENDING)], {}),
+
+        # Content-Addressed Attachments (looked up by URL when releasing references)
+        (db.attachments, [("url", pymongo.ASCENDING)], {}),
+
+        # Project Listings per Village / Contractor
+        (db.projects, [("village_name", pymongo.ASCENDING)], {}),
+        (db.projects, [("contractor_id", pymongo.ASCENDING)], {}),
+
+        # Proximity Queries on Project Routes
+        (db.projects, [("route", pymongo.GEOSPHERE)], {}),
+    ]
+    print("⚡ Creating Database Indexes...")
+    results = await asyncio.gather(
+        *(collection.create_index(keys, **options) for collection, keys, options in specs),
+        # Village-scoped Full-Text Search (complaints & discussions)
+        search_service.create_search_indexes(),
+        # Shared cache expiry (no-op for the in-memory backend)
+        get_cache().ensure_indexes(),
+        # Shared rate-limit buckets expire once refilled (no-op in memory)
+        rate_limit.get_buckets().ensure_indexes(),
+        # Background job queue (claim order, idempotency keys, retention)
+        jobs.ensure_indexes(),
+        # Escalation sweeper (Pending complaints by age)
+        complaint_stats.ensure_indexes(),
+        # Escalations view (state / district / taluk / village, oldest first)
+        escalations.ensure_indexes(),
+        # Proposal dedupe key (merges older duplicates first) and ranked lists
+        proposal_service.ensure_indexes(),
+        # Archiver scans and the archive collections' read indexes
+        archive.ensure_indexes(),
+        return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    for e in errors:
+        print(f"❌ Error creating indexes: {e}")
+    if not errors:
         print("✅ Database indexes verified/created.")
+
+async def ensure_rollups():
+    try:
+        await rollups.ensure_rollups()
     except Exception as e:
-        print(f"❌ Error creating indexes: {e}")
+        print(f"❌ Error building project rollups: {e}")
+    try:
+        await complaint_stats.ensure_complaint_stats()
+    except Exception as e:
+        print(f"❌ Error building complaint analytics: {e}")
+    try:
+        backfilled = await escalations.backfill_complaint_locations()
+        if backfilled:
+            print(f"✅ Copied villager locations onto {backfilled} complaints.")
+    except Exception as e:
+        print(f"❌ Error backfilling complaint locations: {e}")
+
+async def startup_work():
+    """
+    One-off startup work, run in the background so the app serves traffic
+    right away, and on one worker only (see services/leader.py).
+    """
+    async def job():
+        await asyncio.gather(create_indexes(), ensure_rollups())
+
+    try:
+        await leader.run_once("startup", job)
+    except Exception as e:
+        print(f"❌ Startup leader election failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_task = asyncio.create_task(startup_work())
+
+    # --- Scheme Catalog (per worker: in-memory snapshot + background refresh) ---
+    try:
+        await scheme_catalog.refresh()
+    except Exception as e:
+        print(f"❌ Error loading scheme catalog: {e}")
+    catalog_task = asyncio.create_task(scheme_catalog.run_refresher())
+    profiler_task = asyncio.create_task(slow_queries.run_profiler())
+    # --- Job Queue Consumers (every worker; claims are atomic) ---
+    jobs_task = asyncio.create_task(jobs.run_workers())
+    # --- Singleton Jobs (one worker at a time) ---
+    sweeper_task = asyncio.create_task(
+        leader.run_as_leader("escalation-sweeper", complaint_stats.run_escalation_sweeper)
+    )
+    archiver_task = asyncio.create_task(leader.run_as_leader("archiver", archive.run_archiver))
+
     yield
 
+    tasks = (startup_task, catalog_task, profiler_task, jobs_task, sweeper_task, archiver_task)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await llm.close_client()
+    images.shutdown()
+
 app = FastAPI(
     title="Gram-Sahayak API", 
     version="1.0.0", 
@@ -60,6 +160,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- COMPRESSION ---
+# gzip / brotli by Accept-Encoding, above COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# --- METRICS ---
+# Added last so it wraps everything else (including CORS) in the timing
+app.add_middleware(PrometheusMiddleware)
+
 # --- REGISTER ROUTERS ---
 # Using /api prefix to ensure clear separation from frontend routing
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -71,6 +179,13 @@ app.include_router(schemes.router, prefix="/api/schemes", tags=["Schemes"])
 app.include_router(proposals.router, prefix="/api/proposals", tags=["Proposals"])
 app.include_router(complaints.router, prefix="/api/complaints", tags=["Complaints"])
 app.include_router(official_contractor_chat.router, prefix="/api/chat", tags=["Chat"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+
+# Local S3 stand-in: serve uploaded files straight from disk
+if s3.STORAGE_BACKEND == "local":
+    os.makedirs(s3.LOCAL_UPLOAD_DIR, exist_ok=True)
+    app.mount("/uploads", StaticFiles(directory=s3.LOCAL_UPLOAD_DIR), name="uploads")
 
 @app.get("/")
 async def root():
@@ -89,7 +204,15 @@ async def health_check():
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
+    # Development server (single process, auto-reload).
+    # Production: `python serve.py` runs several workers, see README.
     import uvicorn
     # Use environment port if available (standard for cloud deployments)
     port = int(os.environ.get("PORT", 8000))
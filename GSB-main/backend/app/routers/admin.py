@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.routers.community import get_user_details
+from app.services import jobs
+from app.services.slow_queries import load_report
+from app.utils.query_profiler import slow_query_recorder
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    user_id: str = Query(..., description="Government ID or Database ID of the official"),
+    source: str = Query("db", pattern="^(db|memory)$", description="db = all workers, memory = this process"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Slow query shapes ranked by total time.
+    'no_index' is true when the sampled explain() plan used a COLLSCAN.
+    Officials only (query shapes reveal collection and field names).
+    """
+    user, role, error = await get_user_details(user_id)
+    if error:
+        raise HTTPException(status_code=404, detail=error)
+    if role != "official":
+        raise HTTPException(status_code=403, detail="Access Denied. Only Officials can view the slow-query report.")
+
+    return {
+        "threshold_ms": slow_query_recorder.threshold_ms,
+        "shapes": await load_report(source, limit)
+    }
+
+@router.get("/jobs")
+async def get_job_queue(
+    user_id: str = Query(..., description="Government ID or Database ID of the official"),
+    limit: int = Query(20, ge=1, le=200, description="Recent dead letters to include")
+):
+    """
+    Background job queue: jobs per status and the latest dead letters.
+    Officials only.
+    """
+    user, role, error = await get_user_details(user_id)
+    if error:
+        raise HTTPException(status_code=404, detail=error)
+    if role != "official":
+        raise HTTPException(status_code=403, detail="Access Denied. Only Officials can view the job queue.")
+
+    return await jobs.queue_summary(limit)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body
 from app.database import db
 from app.schemas import VillagerSignup, VillagerLogin, ContractorLogin, OfficialLogin
 from app.security import get_password_hash, verify_password
+from app.utils import rate_limit
 
 # This router handles all authentication related paths
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -10,7 +11,10 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 # 1. VILLAGER AUTHENTICATION
 # ==========================================
 
-@router.post("/signup/villager", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/signup/villager", status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit.limit("signup.villager", "phone_number", kind="login"))]
+)
 async def signup_villager(villager: VillagerSignup):
     """
     Registers a new Villager.
@@ -37,7 +41,7 @@ async def signup_villager(villager: VillagerSignup):
         "name": villager.name
     }
 
-@router.post("/login/villager")
+@router.post("/login/villager", dependencies=[Depends(rate_limit.limit("login.villager", "phone_number", kind="login"))])
 async def login_villager(credentials: VillagerLogin):
     """
     Villager Login: Uses Phone Number + Password
@@ -64,7 +68,7 @@ async def login_villager(credentials: VillagerLogin):
 # 2. CONTRACTOR AUTHENTICATION
 # ==========================================
 
-@router.post("/login/contractor")
+@router.post("/login/contractor", dependencies=[Depends(rate_limit.limit("login.contractor", "contractor_id", kind="login"))])
 async def login_contractor(credentials: ContractorLogin):
     """
     Contractor Login: Uses Contractor ID + Password
@@ -90,7 +94,7 @@ async def login_contractor(credentials: ContractorLogin):
 # 3. GOVERNMENT OFFICIAL AUTHENTICATION
 # ==========================================
 
-@router.post("/login/official")
+@router.post("/login/official", dependencies=[Depends(rate_limit.limit("login.official", "government_id", kind="login"))])
 async def login_official(credentials: OfficialLogin):
     """
     Official Login: Uses Government ID + Password
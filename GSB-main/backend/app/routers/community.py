@@ -1,24 +1,51 @@
-from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form
-from app.database import db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, BackgroundTasks, Request
+from app.config import settings
+from app.database import db, secondary_db
 from app.schemas import DiscussionResponse, CommentCreate
+from app.services import archive
 from app.services.llm import ask_openrouter
-from app.utils.s3 import upload_file_to_s3
-from datetime import datetime, timedelta, timezone
-import random
+from app.services.attachments import store_upload
+from app.services.images import process_discussion_image
+from app.utils import rate_limit
+from app.utils.responses import FastJSONResponse, mongo_projection, not_modified, response_fields, revalidate_headers, trusted_list, weak_etag
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+import secrets
 from bson import ObjectId
+from pymongo import ReturnDocument
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/community", tags=["Community Discussion"])
 
 # --- CONSTANTS ---
 IST = timezone(timedelta(hours=5, minutes=30))
+FEED_PROJECTION = mongo_projection(DiscussionResponse, "updated_at")
+FEED_FIELDS = response_fields(DiscussionResponse)
+LLM_CONTEXT_DISCUSSIONS = settings.llm_context_discussions
 
 # --- HELPER: Random Anonymizer ---
 ADJECTIVES = ["Silent", "Hidden", "Mystery", "Brave", "Calm", "Wandering", "Happy", "Vocal", "Fast", "Wise"]
 NOUNS = ["Tiger", "River", "Banyan", "Peacock", "Lotus", "Eagle", "Lion", "Voice", "Horse", "Bear"]
 
 def generate_anonymous_name():
-    return f"{random.choice(ADJECTIVES)} {random.choice(NOUNS)}"
+    # Unseeded on purpose: a name derived from the (public) user id could be
+    # recomputed by anyone and would unmask every anonymous post
+    return f"{secrets.choice(ADJECTIVES)} {secrets.choice(NOUNS)}"
+
+async def anonymous_identity(user: dict) -> str:
+    if user.get("anonymous_identity"):
+        return user["anonymous_identity"]
+    # First post: store a name only if none was set meanwhile, then use
+    # whichever name won, so concurrent first posts agree
+    saved = await db.villagers.find_one_and_update(
+        {"_id": user["_id"], "anonymous_identity": {"$in": [None, ""]}},
+        {"$set": {"anonymous_identity": generate_anonymous_name()}},
+        projection={"anonymous_identity": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if saved is None:
+        saved = await db.villagers.find_one({"_id": user["_id"]}, {"anonymous_identity": 1})
+    return saved["anonymous_identity"]
 
 async def get_user_details(user_identifier: str):
     """
@@ -66,8 +93,12 @@ async def reset_discussions():
     return {"message": "All discussions cleared."}
 
 # --- 1. POST A DISCUSSION ---
-@router.post("/discuss", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/discuss", status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit.limit("community.post", "user_id"))]
+)
 async def post_discussion(
+    background_tasks: BackgroundTasks,
     content: str = Form(..., description="Content of the discussion"),
     category: str = Form("General", description="Category of the post"),
     image: UploadFile = File(None, description="Optional image upload"),
@@ -81,20 +112,12 @@ async def post_discussion(
     display_name = ""
 
     if role == "villager":
-        if "anonymous_identity" in user and user["anonymous_identity"]:
-            display_name = user["anonymous_identity"]
-        else:
-            display_name = generate_anonymous_name()
-            await db.villagers.update_one(
-                {"_id": user["_id"]},
-                {"$set": {"anonymous_identity": display_name}}
-            )
+        display_name = await anonymous_identity(user)
     else:
         display_name = f"Official {user['name']}"
 
-    image_url = None
-    if image:
-        image_url = upload_file_to_s3(image.file, image.filename, folder="community")
+    stored = await store_upload(image, folder="community") if image else None
+    image_url = stored.url if stored else None
 
     new_post = {
         "village_name": village_name,
@@ -112,6 +135,9 @@ async def post_discussion(
     }
     
     result = await db.discussions.insert_one(new_post)
+
+    if stored:
+        background_tasks.add_task(process_discussion_image, result.inserted_id, stored)
     
     return {
         "message": "Posted successfully", 
@@ -122,7 +148,7 @@ async def post_discussion(
     }
 
 # --- 2. UPVOTE ---
-@router.patch("/{discussion_id}/upvote")
+@router.patch("/{discussion_id}/upvote", dependencies=[Depends(rate_limit.limit("community.upvote", "user_id"))])
 async def upvote_discussion(
     discussion_id: str,
     user_id: str = Query(..., description="Unique ID: Can be _id, government_id, or username")
@@ -136,33 +162,35 @@ async def upvote_discussion(
     except:
         raise HTTPException(status_code=400, detail="Invalid Discussion ID")
 
-    discussion = await db.discussions.find_one({"_id": oid})
+    # Toggle with guarded updates: the upvoters check and the counter move together,
+    # so concurrent clicks can't double count or drift
+    user_oid = str(user["_id"])
+    scope = {"_id": oid, "village_name": user["village_name"]}
+    toggles = (
+        ({"upvoters": {"$ne": user_oid}}, {"$inc": {"upvotes": 1}, "$addToSet": {"upvoters": user_oid}}, "Upvoted successfully"),
+        ({"upvoters": user_oid}, {"$inc": {"upvotes": -1}, "$pull": {"upvoters": user_oid}}, "Upvote removed"),
+    )
+    for guard, update, message in toggles:
+        discussion = await db.discussions.find_one_and_update(
+            {**scope, **guard}, {**update, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            projection={"upvotes": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if discussion:
+            return {"message": message, "upvotes": max(0, discussion.get("upvotes", 0))}
+
+    discussion = await db.discussions.find_one({"_id": oid}, {"village_name": 1})
     if not discussion:
         raise HTTPException(status_code=404, detail="Discussion not found")
-
     if discussion["village_name"] != user["village_name"]:
          raise HTTPException(status_code=403, detail="You can only upvote discussions in your own village")
-
-    user_oid = str(user["_id"])
-    upvoters = discussion.get("upvoters", [])
-
-    if user_oid in upvoters:
-        await db.discussions.update_one(
-            {"_id": oid},
-            {"$inc": {"upvotes": -1}, "$pull": {"upvoters": user_oid}}
-        )
-        new_count = discussion.get("upvotes", 0) - 1
-        return {"message": "Upvote removed", "upvotes": max(0, new_count)}
-    
-    else:
-        await db.discussions.update_one(
-            {"_id": oid},
-            {"$inc": {"upvotes": 1}, "$push": {"upvoters": user_oid}}
-        )
-        return {"message": "Upvoted successfully", "upvotes": discussion.get("upvotes", 0) + 1}
+    raise HTTPException(status_code=409, detail="Discussion changed, please retry.")
 
 # --- 3. COMMENT ---
-@router.post("/{discussion_id}/comment", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{discussion_id}/comment", status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit.limit("community.comment", "user_id"))]
+)
 async def add_comment(
     discussion_id: str,
     comment: CommentCreate,
@@ -174,14 +202,7 @@ async def add_comment(
 
     display_name = ""
     if role == "villager":
-        if "anonymous_identity" in user and user["anonymous_identity"]:
-            display_name = user["anonymous_identity"]
-        else:
-            display_name = generate_anonymous_name()
-            await db.villagers.update_one(
-                {"_id": user["_id"]},
-                {"$set": {"anonymous_identity": display_name}}
-            )
+        display_name = await anonymous_identity(user)
     else:
         display_name = f"Official {user['name']}"
 
@@ -199,7 +220,7 @@ async def add_comment(
 
     result = await db.discussions.update_one(
         {"_id": disc_oid},
-        {"$push": {"replies": reply_obj}}
+        {"$push": {"replies": reply_obj}, "$set": {"updated_at": datetime.now(timezone.utc)}}
     )
 
     if result.modified_count == 0:
@@ -208,36 +229,43 @@ async def add_comment(
     return {"message": "Comment added", "identity": display_name}
 
 # --- 4. FEED ---
-@router.get("/feed", response_model=list[DiscussionResponse])
+@router.get("/feed", response_model=list[DiscussionResponse], response_class=FastJSONResponse)
 async def get_feed(
     user_id: str = Query(..., description="Unique ID: Can be _id, government_id, or username"),
-    limit: int = 50
+    limit: int = Query(settings.feed_page_size, ge=1, le=settings.feed_max_page_size),
+    start: Optional[date] = Query(None, description="Posted on or after (UTC date); older dates include archived posts"),
+    end: Optional[date] = Query(None, description="Posted on or before (UTC date)"),
+    request: Request = None
 ):
     user, role, error = await get_user_details(user_id)
     if error:
         raise HTTPException(status_code=404, detail=error)
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'start' must be on or before 'end'")
         
     village_name = user["village_name"]
+    query = {"village_name": village_name, **archive.date_range("created_at", start, end)}
 
-    discussions = await db.discussions.find(
-        {"village_name": village_name}
-    ).sort("created_at", -1).limit(limit).to_list(limit)
+    if archive.reaches_archive("discussions", start):
+        discussions = await archive.find_with_archive(
+            "discussions", query, FEED_PROJECTION, ("created_at", -1), limit, start
+        )
+    else:
+        # Feed tolerates slightly stale reads -> may be served by a secondary
+        discussions = await secondary_db.discussions.find(
+            query, FEED_PROJECTION
+        ).sort("created_at", -1).limit(limit).to_list(limit)
     
-    results = []
+    etag = weak_etag(discussions)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    # Projected docs already match DiscussionResponse -> skip re-validation
     for d in discussions:
-        results.append(DiscussionResponse(
-            id=str(d["_id"]),
-            village_name=d["village_name"],
-            user_name=d["user_name"],
-            user_role=d["user_role"],
-            content=d["content"],
-            category=d["category"],
-            created_at=d["created_at"],
-            upvotes=d.get("upvotes", 0),
-            replies=d.get("replies", []),
-            image_url=d.get("image_url")
-        ))
-    return results
+        d["id"] = str(d["_id"])
+        d.setdefault("upvotes", 0)
+    return trusted_list(discussions, FEED_FIELDS, headers=revalidate_headers(etag))
 
 # --- 5. AI Q&A (OpenRouter) ---
 class OfficialQuery(BaseModel):
@@ -265,7 +293,7 @@ async def ask_official_query(
     # 2. Fetch Context
     discussions = await db.discussions.find(
         {"village_name": village_name}
-    ).sort("created_at", -1).limit(50).to_list(50)
+    ).sort("created_at", -1).limit(LLM_CONTEXT_DISCUSSIONS).to_list(LLM_CONTEXT_DISCUSSIONS)
 
     if not discussions:
         return {"answer": "No discussions found for this village yet."}
@@ -1,13 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Form, UploadFile, File, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Form, UploadFile, File, Query, Body, BackgroundTasks, Request
+from app.config import settings
 from app.database import db
-from app.schemas import ComplaintResponse, ReopenRequest
-from app.utils.s3 import upload_file_to_s3
+from app.schemas import BatchReopenRequest, ComplaintResponse, ReopenRequest
+from app.services import archive, complaint_stats, escalations, jobs
+from app.services.attachments import release_attachments, retain_attachments, store_upload
+from app.services.images import process_complaint_image, process_shared_complaint_image
+from app.utils.escalation import ESCALATION_DAYS, is_time_escalated, within_window_filter
+from app.utils.geo import near_filter, point
+from app.utils import rate_limit
+from app.utils.responses import FastJSONResponse, mongo_projection, not_modified, response_fields, revalidate_headers, trim, trusted_list, weak_etag
 from typing import List, Optional
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 
 router = APIRouter(prefix="/complaints", tags=["Complaints & Grievances"])
 
+# --- Fast Response Projection ---
+COMPLAINT_PROJECTION = mongo_projection(ComplaintResponse, "updated_at")
+COMPLAINT_FIELDS = response_fields(ComplaintResponse)
+
+# --- Nearby Project Linking ---
+NEARBY_PROJECT_RADIUS_M = settings.nearby_project_radius_m
+NEARBY_PROJECT_LIMIT = settings.nearby_project_limit
+COMPLAINT_LIST_LIMIT = settings.complaint_list_limit
+COMPLAINT_BATCH_LIMIT = settings.complaint_batch_limit
+ANALYTICS_MAX_DAYS = settings.analytics_max_days
+ESCALATION_PAGE_SIZE = settings.escalation_page_size
+ESCALATION_MAX_PAGE_SIZE = settings.escalation_max_page_size
+
 # --- Helper: Calculate Days, Escalation & Tier ---
 def process_complaint_status(complaint: dict) -> dict:
     """
@@ -41,7 +62,7 @@ def process_complaint_status(complaint: dict) -> dict:
                 days_pending = delta.days
                 
                 # 14 DAYS RULE
-                if current_status == "Pending" and days_pending > 14:
+                if current_status == "Pending" and is_time_escalated(created_at, now_aware):
                     is_escalated = True
                     complaint["status"] = "Migrated to Higher Officials"
                     
@@ -75,13 +96,33 @@ def process_complaint_status(complaint: dict) -> dict:
     
     return complaint
 
+# --- Queued Side Effects (see services/jobs.py) ---
+@jobs.handler("complaint.link")
+async def link_complaint(payload: dict):
+    """Adds a new complaint to the village officials' and the villager's lists."""
+    complaint_id = payload["complaint_id"]
+    await db.government_officials.update_many(
+        {"village_name": payload["village_name"]},
+        {"$addToSet": {"assigned_complaints": complaint_id}}
+    )
+    await db.villagers.update_one(
+        {"_id": payload["villager_id"]},
+        {"$addToSet": {"complaints_raised": complaint_id}}
+    )
+
 # 1. RAISE COMPLAINT
-@router.post("/raise", status_code=status.HTTP_201_CREATED, response_model=ComplaintResponse)
+@router.post(
+    "/raise", status_code=status.HTTP_201_CREATED, response_model=ComplaintResponse,
+    dependencies=[Depends(rate_limit.limit("complaints.raise", "phone_number"))]
+)
 async def raise_complaint(
+    background_tasks: BackgroundTasks,
     phone_number: str = Form(..., description="Registered Phone Number"),
     complaint_name: str = Form(..., description="Title"),
     complaint_desc: str = Form(..., description="Description"),
     location: str = Form(..., description="Location"),
+    latitude: Optional[float] = Form(None, ge=-90, le=90, description="Optional GPS latitude"),
+    longitude: Optional[float] = Form(None, ge=-180, le=180, description="Optional GPS longitude"),
     files: List[UploadFile] = File(default=None, description="Optional files to upload")
 ):
     villager = await db.villagers.find_one({"phone_number": phone_number})
@@ -90,24 +131,35 @@ async def raise_complaint(
     
     village_name = villager["village_name"]
 
-    uploaded_urls = []
-    if files:
-        for file in files:
-            if file.filename:
-                url = upload_file_to_s3(file.file, file.filename, folder="complaints")
-                if url: uploaded_urls.append(url)
+    # Link to projects running near the reported spot (uses the projects 2dsphere index)
+    location_point = None
+    nearby_projects = []
+    if latitude is not None and longitude is not None:
+        location_point = point(latitude, longitude)
+        query = near_filter("route", latitude, longitude, NEARBY_PROJECT_RADIUS_M)
+        query["village_name"] = village_name
+        nearby = await db.projects.find(query, {"_id": 1}).limit(NEARBY_PROJECT_LIMIT).to_list(NEARBY_PROJECT_LIMIT)
+        nearby_projects = [str(p["_id"]) for p in nearby]
+
+    uploaded_files = await store_uploads(files, "complaints")
+    uploaded_urls = [f.url for f in uploaded_files]
 
+    now = datetime.now(timezone.utc)
     new_complaint = {
         "complaint_name": complaint_name,
         "complaint_desc": complaint_desc,
         "location": location,
+        "location_point": location_point,
+        "nearby_projects": nearby_projects,
         "villager_id": str(villager["_id"]),
         "villager_name": villager["name"],
         "villager_phone": phone_number,
         "village_name": village_name,
+        **escalations.location_of(villager),
         "attachments": uploaded_urls,
         "status": "Pending",
-        "created_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "raised_at": now,  # never reset (created_at restarts the timer on reopen)
         "resolution_notes": None,
         "resolution_attachments": [],
         "resolved_by": None,
@@ -117,25 +169,40 @@ async def raise_complaint(
 
     result = await db.complaints.insert_one(new_complaint)
     complaint_id = result.inserted_id
+    await complaint_stats.record_raised(new_complaint)
 
-    await db.government_officials.update_many(
-        {"village_name": village_name},
-        {"$push": {"assigned_complaints": str(complaint_id)}}
-    )
-    await db.villagers.update_one(
-        {"_id": villager["_id"]},
-        {"$push": {"complaints_raised": str(complaint_id)}}
+    for stored in uploaded_files:
+        background_tasks.add_task(process_complaint_image, complaint_id, "attachments", stored)
+
+    # Officials' and villager's complaint lists are filled in by a queued job
+    await jobs.enqueue(
+        "complaint.link",
+        {"complaint_id": str(complaint_id), "village_name": village_name, "villager_id": villager["_id"]},
+        idempotency_key=f"complaint.link:{complaint_id}"
     )
 
     new_complaint["_id"] = complaint_id
     return process_complaint_status(new_complaint)
 
+# --- Helper: Optional Date Range (reaches into the archive, see services/archive.py) ---
+def created_between(start: Optional[date], end: Optional[date]) -> dict:
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'start' must be on or before 'end'")
+    return archive.date_range("created_at", start, end)
+
 # 2. FETCH COMPLAINTS (Villager)
-@router.get("/villager/{phone_number}", response_model=List[ComplaintResponse])
-async def get_complaints_by_villager(phone_number: str):
+@router.get("/villager/{phone_number}", response_model=List[ComplaintResponse], response_class=FastJSONResponse)
+async def get_complaints_by_villager(
+    phone_number: str,
+    start: Optional[date] = Query(None, description="Raised on or after (UTC date); older dates include archived complaints"),
+    end: Optional[date] = Query(None, description="Raised on or before (UTC date)"),
+    request: Request = None
+):
     clean_phone = phone_number.strip()
-    query = {"villager_phone": {"$regex": f"^\s*{clean_phone}\s*$", "$options": "i"}}
-    complaints = await db.complaints.find(query).sort("created_at", -1).to_list(100)
+    query = {"villager_phone": {"$regex": f"^\s*{clean_phone}\s*$", "$options": "i"}, **created_between(start, end)}
+    complaints = await archive.find_with_archive(
+        "complaints", query, COMPLAINT_PROJECTION, ("created_at", -1), COMPLAINT_LIST_LIMIT, start
+    )
     
     results = []
     for c in complaints:
@@ -143,23 +210,109 @@ async def get_complaints_by_villager(phone_number: str):
             results.append(process_complaint_status(c))
         except:
             pass
-    return results
+    etag = weak_etag(results, ("status",))
+    return not_modified(request, etag) or trusted_list(results, COMPLAINT_FIELDS, headers=revalidate_headers(etag))
 
 # 3. FETCH COMPLAINTS (Official)
-@router.get("/official/{government_id}", response_model=List[ComplaintResponse])
-async def get_complaints_for_official(government_id: str):
+@router.get("/official/{government_id}", response_model=List[ComplaintResponse], response_class=FastJSONResponse)
+async def get_complaints_for_official(
+    government_id: str,
+    start: Optional[date] = Query(None, description="Raised on or after (UTC date); older dates include archived complaints"),
+    end: Optional[date] = Query(None, description="Raised on or before (UTC date)"),
+    request: Request = None
+):
     official = await db.government_officials.find_one({"government_id": government_id})
     if not official:
         raise HTTPException(status_code=404, detail="Official not found")
 
     assigned_village = official["village_name"]
-    complaints = await db.complaints.find({"village_name": assigned_village}).sort("created_at", -1).to_list(100)
-    return [process_complaint_status(c) for c in complaints]
+    complaints = await archive.find_with_archive(
+        "complaints", {"village_name": assigned_village, **created_between(start, end)},
+        COMPLAINT_PROJECTION, ("created_at", -1), COMPLAINT_LIST_LIMIT, start
+    )
+    results = [process_complaint_status(c) for c in complaints]
+    etag = weak_etag(results, ("status",))
+    return not_modified(request, etag) or trusted_list(results, COMPLAINT_FIELDS, headers=revalidate_headers(etag))
+
+# --- Helpers: Resolve / Reopen Rules (shared by the single and batch endpoints) ---
+def resolve_error(complaint: Optional[dict], official: dict) -> Optional[HTTPException]:
+    if not complaint:
+        return HTTPException(status_code=404, detail="Complaint not found")
+    if complaint["village_name"] != official["village_name"]:
+        return HTTPException(status_code=403, detail="Access Denied: You cannot manage complaints from other villages.")
+    created_at = complaint.get("created_at")
+    if created_at and is_time_escalated(created_at):
+        return HTTPException(
+            status_code=403,
+            detail=f"Action Forbidden: Complaint has exceeded {ESCALATION_DAYS} days and is migrated to higher officials."
+        )
+    return None
+
+def resolve_guard(official: dict) -> dict:
+    """Re-checks resolve_error's rules inside the write, so a stale read can't slip through."""
+    return {"village_name": official["village_name"], **within_window_filter()}
+
+def resolution_update(official: dict, notes: Optional[str], urls: List[str], now: datetime) -> dict:
+    return {
+        "status": "Resolved",
+        "resolution_notes": notes,
+        "resolution_attachments": urls,
+        "resolution_attachments_renditions": [],
+        "resolved_by": official["name"],
+        "resolved_at": now,
+        "updated_at": now
+    }
+
+def reopen_error(complaint: Optional[dict], phone_number: str) -> Optional[HTTPException]:
+    if not complaint:
+        return HTTPException(status_code=404, detail="Complaint not found")
+    if complaint["villager_phone"] != phone_number:
+        return HTTPException(status_code=403, detail="Access Denied: You can only reopen your own complaints.")
+    if complaint.get("status") != "Resolved":
+        return HTTPException(status_code=400, detail="Only 'Resolved' complaints can be reopened.")
+    return None
+
+def reopen_transition(current_reopens: int, now: datetime) -> tuple:
+    """
+    (guard, update) taking a Resolved complaint to its next tier. The guard
+    pins the tier, so two concurrent reopens can't both move the same step.
+    """
+    if not current_reopens:
+        # First Reopen -> Second Attempt
+        return (
+            {"status": "Resolved", "reopen_count": {"$in": [0, None]}},
+            {"$set": {"status": "Pending", "reopen_count": 1, "reopened_at": now, "created_at": now, "updated_at": now}}  # RESET TIMER
+        )
+    # Second Reopen -> Escalated
+    return (
+        {"status": "Resolved", "reopen_count": {"$gte": 1}},
+        {"$set": {"status": "Migrated to Higher Officials", "reopened_at": now, "escalated_at": now, "updated_at": now},
+         "$inc": {"reopen_count": 1}}
+    )
+
+def reopened(before: dict, update: dict) -> dict:
+    """The complaint after `update` (from reopen_transition) was applied to `before`."""
+    return {**before, **update["$set"], "reopen_count": before.get("reopen_count", 0) + 1}
+
+async def store_uploads(files: Optional[List[UploadFile]], folder: str) -> list:
+    stored_files = []
+    try:
+        for file in files or []:
+            if file.filename:
+                stored = await store_upload(file, folder=folder)
+                if stored:
+                    stored_files.append(stored)
+    except HTTPException:
+        # e.g. a later file over the size limit (413): drop the refs taken so far
+        await release_attachments([f.url for f in stored_files])
+        raise
+    return stored_files
 
 # 4. RESOLVE COMPLAINT (Form Data - Allows File Uploads)
 @router.patch("/{complaint_id}/resolve", response_model=ComplaintResponse)
 async def resolve_complaint(
     complaint_id: str,
+    background_tasks: BackgroundTasks,
     official_id: str = Form(..., description="Government ID of Official"),
     resolution_notes: str = Form(None, description="Remarks or notes on resolution"),
     files: List[UploadFile] = File(default=None, description="Proof of resolution (Images/Docs)")
@@ -173,43 +326,35 @@ async def resolve_complaint(
     except:
         raise HTTPException(status_code=400, detail="Invalid Complaint ID format")
 
-    complaint = await db.complaints.find_one({"_id": comp_oid})
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
+    # Validate before uploading, so a rejected resolve never touches storage
+    current = await db.complaints.find_one({"_id": comp_oid}, {"village_name": 1, "created_at": 1})
+    error = resolve_error(current, official)
+    if error:
+        raise error
 
-    if complaint["village_name"] != official["village_name"]:
-        raise HTTPException(status_code=403, detail="Access Denied: You cannot manage complaints from other villages.")
+    stored_files = await store_uploads(files, "resolutions")
+    resolution_urls = [f.url for f in stored_files]
+    update_data = resolution_update(official, resolution_notes, resolution_urls, datetime.now(timezone.utc))
 
-    created_at = complaint.get("created_at")
-    if created_at:
-        if created_at.tzinfo is None:
-            created_at = created_at.replace(tzinfo=timezone.utc)
-        
-        delta = datetime.now(timezone.utc) - created_at
-        if delta.days > 14:
-             raise HTTPException(
-                 status_code=403, 
-                 detail="Action Forbidden: Complaint has exceeded 14 days and is migrated to higher officials."
-             )
-
-    resolution_urls = []
-    if files:
-        for file in files:
-            if file.filename:
-                url = upload_file_to_s3(file.file, file.filename, folder="resolutions")
-                if url: resolution_urls.append(url)
-
-    update_data = {
-        "status": "Resolved",
-        "resolution_notes": resolution_notes,
-        "resolution_attachments": resolution_urls,
-        "resolved_by": official["name"],
-        "resolved_at": datetime.now(timezone.utc)
-    }
+    # The village and 14-day checks are repeated in the filter (the complaint
+    # may have changed since the read), and the old document (for analytics
+    # and old proof files) comes back
+    complaint = await db.complaints.find_one_and_update(
+        {"_id": comp_oid, **resolve_guard(official)},
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
+    )
+    if complaint is None:
+        await release_attachments(resolution_urls)
+        current = await db.complaints.find_one({"_id": comp_oid}, {"village_name": 1, "created_at": 1})
+        raise resolve_error(current, official) or HTTPException(status_code=409, detail="Complaint changed, please retry.")
 
-    await db.complaints.update_one({"_id": comp_oid}, {"$set": update_data})
-    updated_complaint = await db.complaints.find_one({"_id": comp_oid})
-    return process_complaint_status(updated_complaint)
+    for stored in stored_files:
+        background_tasks.add_task(process_complaint_image, comp_oid, "resolution_attachments", stored)
+    await complaint_stats.record_resolved(complaint, update_data["resolved_at"])
+    # Re-resolving replaces the earlier proof files
+    await release_attachments(complaint.get("resolution_attachments", []))
+    return process_complaint_status({**complaint, **update_data})
 
 # 5. REOPEN COMPLAINT (JSON Data - "Not Resolved" Button)
 @router.patch("/{complaint_id}/reopen", response_model=ComplaintResponse)
@@ -226,34 +371,222 @@ async def reopen_complaint(
     except:
         raise HTTPException(status_code=400, detail="Invalid Complaint ID")
 
-    complaint = await db.complaints.find_one({"_id": comp_oid})
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
+    # Try each tier's guarded update; whichever matches moved the complaint atomically
+    now = datetime.now(timezone.utc)
+    for current_reopens in (0, 1):
+        guard, update = reopen_transition(current_reopens, now)
+        complaint = await db.complaints.find_one_and_update(
+            {"_id": comp_oid, "villager_phone": request.phone_number, **guard},
+            update,
+            return_document=ReturnDocument.BEFORE
+        )
+        if complaint:
+            break
+    else:
+        current = await db.complaints.find_one({"_id": comp_oid}, {"villager_phone": 1, "status": 1})
+        raise reopen_error(current, request.phone_number) or HTTPException(status_code=409, detail="Complaint changed, please retry.")
 
-    # Verify Phone Number from JSON body
-    if complaint["villager_phone"] != request.phone_number:
-         raise HTTPException(status_code=403, detail="Access Denied: You can only reopen your own complaints.")
+    updated_complaint = reopened(complaint, update)
+    await complaint_stats.record_reopened(complaint, now, escalated=updated_complaint["reopen_count"] >= 2)
+    return process_complaint_status(updated_complaint)
 
-    if complaint.get("status") != "Resolved":
-         raise HTTPException(status_code=400, detail="Only 'Resolved' complaints can be reopened.")
+# --- Helper: Official-only Dashboards (analytics, escalations) ---
+async def get_dashboard_official(government_id: str) -> dict:
+    official = await db.government_officials.find_one({"government_id": government_id}, {"_id": 1})
+    if not official:
+        raise HTTPException(status_code=403, detail="Only government officials can view complaint dashboards")
+    return official
 
-    current_reopens = complaint.get("reopen_count", 0)
-    new_reopens = current_reopens + 1
-    
-    update_data = {
-        "reopen_count": new_reopens
+# 6. ANALYTICS (Precomputed day / week buckets)
+@router.get("/analytics")
+async def get_complaint_analytics(
+    government_id: str = Query(..., description="Requesting official"),
+    village_name: str = Query(..., description="Village to report on"),
+    start: Optional[date] = Query(None, description="First local date (default: 30 days before end)"),
+    end: Optional[date] = Query(None, description="Last local date (default: today)"),
+    granularity: str = Query("day", pattern="^(day|week)$")
+):
+    """
+    Complaint volume, mean time-to-resolution, reopen and escalation rates per
+    day or ISO week. Served from `complaint_stats`, never from raw complaints.
+    """
+    await get_dashboard_official(government_id)
+    end = end or datetime.now(complaint_stats.LOCAL_TZ).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'start' must be on or before 'end'")
+    if (end - start).days + 1 > ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range too long: at most {ANALYTICS_MAX_DAYS} days")
+
+    return await complaint_stats.query_stats(village_name, start, end, granularity)
+
+# 7. ESCALATIONS (Cross-village, oldest first)
+@router.get("/escalations")
+async def get_escalations(
+    government_id: str = Query(..., description="Requesting official"),
+    state: Optional[str] = Query(None),
+    district: Optional[str] = Query(None),
+    taluk: Optional[str] = Query(None),
+    village_name: Optional[str] = Query(None),
+    limit: int = Query(ESCALATION_PAGE_SIZE, ge=1, le=ESCALATION_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    request: Request = None
+):
+    """
+    Escalated complaints in a state / district / taluk / village, oldest first,
+    so the longest-waiting are triaged first. Keyset-paginated on (created_at, _id).
+    """
+    await get_dashboard_official(government_id)
+    if cursor and escalations.decode_cursor(cursor) is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    scope = escalations.scope_filter(state, district, taluk, village_name)
+    complaints, next_cursor = await escalations.list_escalations(scope, COMPLAINT_PROJECTION, limit, cursor)
+    results = [process_complaint_status(c) for c in complaints]
+    etag = weak_etag(results, ("status",), next_cursor)
+    return not_modified(request, etag) or FastJSONResponse({
+        "results": [trim(c, COMPLAINT_FIELDS) for c in results],
+        "next_cursor": next_cursor,
+    }, headers=revalidate_headers(etag))
+
+@router.get("/escalations/summary")
+async def get_escalation_summary(
+    government_id: str = Query(..., description="Requesting official"),
+    state: Optional[str] = Query(None),
+    district: Optional[str] = Query(None),
+    taluk: Optional[str] = Query(None),
+    village_name: Optional[str] = Query(None)
+):
+    """Escalation counts one level down: states, then districts, taluks and villages."""
+    await get_dashboard_official(government_id)
+    scope = escalations.scope_filter(state, district, taluk, village_name)
+    return await escalations.escalation_summary(scope)
+
+# --- Helpers: Batch Actions ---
+def parse_batch_ids(complaint_ids: List[str]) -> tuple:
+    """(ids in request order without repeats, {id: ObjectId}, {id: error} for malformed ids)."""
+    ids = list(dict.fromkeys(cid.strip() for cid in complaint_ids if cid.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No complaint IDs given")
+    if len(ids) > COMPLAINT_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {COMPLAINT_BATCH_LIMIT} complaints per batch")
+    oids, errors = {}, {}
+    for cid in ids:
+        try:
+            oids[cid] = ObjectId(cid)
+        except:
+            errors[cid] = HTTPException(status_code=400, detail="Invalid Complaint ID format")
+    return ids, oids, errors
+
+async def applied_ids(oids: List[ObjectId], stamp: dict) -> set:
+    """Which guarded batch updates matched, found by the timestamp they wrote."""
+    return {c["_id"] async for c in db.complaints.find({"_id": {"$in": oids}, **stamp}, {"_id": 1})}
+
+def batch_results(ids: List[str], oids: dict, applied: set, errors: dict, action: str) -> dict:
+    conflict = HTTPException(status_code=409, detail="Complaint changed, please retry.")
+    results = []
+    for cid in ids:
+        if cid not in errors and oids[cid] in applied:
+            results.append({"complaint_id": cid, "ok": True})
+            continue
+        error = errors.get(cid, conflict)
+        results.append({"complaint_id": cid, "ok": False, "status_code": error.status_code, "detail": error.detail})
+    return {action: len(applied), "failed": len(ids) - len(applied), "results": results}
+
+# 8. BATCH RESOLVE (Shared notes and proof files)
+@router.patch("/resolve/batch")
+async def resolve_complaints_batch(
+    background_tasks: BackgroundTasks,
+    official_id: str = Form(..., description="Government ID of Official"),
+    complaint_ids: List[str] = Form(..., description="Complaint IDs (repeat the field)"),
+    resolution_notes: str = Form(None, description="Remarks applied to every complaint"),
+    files: List[UploadFile] = File(default=None, description="Proof of resolution shared by every complaint")
+):
+    """
+    Resolves many complaints at once: one official lookup, one read to check
+    village and the 14-day rule, one bulk_write. Returns a result per complaint.
+    """
+    official = await db.government_officials.find_one({"government_id": official_id})
+    if not official:
+        raise HTTPException(status_code=404, detail="Official not found")
+
+    ids, oids, errors = parse_batch_ids(complaint_ids)
+    found = {
+        c["_id"]: c async for c in db.complaints.find(
+            {"_id": {"$in": list(oids.values())}},
+            {"village_name": 1, "created_at": 1, "status": 1, "reopen_count": 1, "resolution_attachments": 1}
+        )
     }
+    ready = []
+    for cid, oid in oids.items():
+        error = resolve_error(found.get(oid), official)
+        if error:
+            errors[cid] = error
+        else:
+            ready.append(oid)
 
-    if new_reopens == 1:
-        # First Reopen -> Second Attempt
-        update_data["status"] = "Pending"
-        update_data["created_at"] = datetime.now(timezone.utc) # RESET TIMER
-        
-    elif new_reopens >= 2:
-        # Second Reopen -> Escalated
-        update_data["status"] = "Migrated to Higher Officials"
+    applied = set()
+    if ready:
+        stored_files = await store_uploads(files, "resolutions")
+        resolution_urls = [f.url for f in stored_files]
+        update_data = resolution_update(official, resolution_notes, resolution_urls, datetime.now(timezone.utc))
+        guard = resolve_guard(official)
+        result = await db.complaints.bulk_write(
+            [UpdateOne({"_id": oid, **guard}, {"$set": update_data}) for oid in ready], ordered=False
+        )
+        applied = set(ready) if result.matched_count == len(ready) else await applied_ids(
+            ready, {"resolved_at": update_data["resolved_at"], "resolved_by": official["name"]}
+        )
 
-    await db.complaints.update_one({"_id": comp_oid}, {"$set": update_data})
-    
-    updated_complaint = await db.complaints.find_one({"_id": comp_oid})
-    return process_complaint_status(updated_complaint)
+        # Every resolved complaint holds its own reference to the shared files
+        if applied:
+            await retain_attachments(resolution_urls, len(applied) - 1)
+            for stored in stored_files:
+                background_tasks.add_task(process_shared_complaint_image, list(applied), "resolution_attachments", stored)
+        else:
+            await release_attachments(resolution_urls)
+
+        resolved_at = update_data["resolved_at"]
+        await complaint_stats.record_events(
+            [e for e in (complaint_stats.resolved_event(found[oid], resolved_at) for oid in applied) if e]
+        )
+        await release_attachments([url for oid in applied for url in found[oid].get("resolution_attachments", [])])
+
+    return batch_results(ids, oids, applied, errors, "resolved")
+
+# 9. BATCH REOPEN (Villager, JSON Data)
+@router.patch("/reopen/batch")
+async def reopen_complaints_batch(request: BatchReopenRequest):
+    """
+    Marks many of a villager's complaints as 'Not Resolved' in one bulk_write.
+    Accepts JSON body: {"phone_number": "...", "complaint_ids": ["..."]}
+    """
+    ids, oids, errors = parse_batch_ids(request.complaint_ids)
+    found = {
+        c["_id"]: c async for c in db.complaints.find(
+            {"_id": {"$in": list(oids.values())}},
+            {"village_name": 1, "villager_phone": 1, "status": 1, "reopen_count": 1}
+        )
+    }
+    now = datetime.now(timezone.utc)
+    ops, ready = [], []
+    for cid, oid in oids.items():
+        complaint = found.get(oid)
+        error = reopen_error(complaint, request.phone_number)
+        if error:
+            errors[cid] = error
+            continue
+        guard, update = reopen_transition(complaint.get("reopen_count", 0), now)
+        ops.append(UpdateOne({"_id": oid, **guard}, update))
+        ready.append(oid)
+
+    applied = set()
+    if ops:
+        result = await db.complaints.bulk_write(ops, ordered=False)
+        applied = set(ready) if result.matched_count == len(ready) else await applied_ids(ready, {"reopened_at": now})
+        await complaint_stats.record_events([
+            complaint_stats.reopened_event(found[oid], now, escalated=found[oid].get("reopen_count", 0) >= 1)
+            for oid in applied
+        ])
+
+    return batch_results(ids, oids, applied, errors, "reopened")
@@ -1,10 +1,32 @@
 from fastapi import APIRouter, Query, HTTPException
+from app.config import settings
 from app.database import db
 from app.schemas import DashboardStats
+from app.services.rollups import get_rollup
+from app.utils.cache import cached
 from bson import ObjectId
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# Cards that are the same for everyone in a village are cached (shared across
+# workers when CACHE_BACKEND=mongo)
+VILLAGE_CARDS_TTL_SECONDS = settings.village_cards_ttl_seconds
+
+async def compute_village_cards(village_name: str) -> dict:
+    # CARD: Issues Resolved
+    # (For MVP, we count global resolved. In V2, we can filter by village too)
+    issues_resolved = await db.discussions.count_documents({"status": "Resolved"})
+
+    # CARD: Village Mood (AI Sentiment)
+    last_insight = await db.insights.find_one(sort=[("generated_at", -1)])
+    sentiment = last_insight["sentiment_score"] if last_insight else 0
+
+    if sentiment > 0.3: mood = "Happy 🙂"
+    elif sentiment < -0.3: mood = "Angry 😡"
+    else: mood = "Neutral 😐"
+
+    return {"issues_resolved": issues_resolved, "village_mood": mood}
+
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
     villager_id: str = Query(..., description="ID of the logged-in user")
@@ -27,24 +49,15 @@ async def get_dashboard_stats(
     village_name = user["village_name"] # <--- Auto-detected from DB
     
     # 2. CARD: Budget Used (Sum of 'In Progress' projects in THIS village)
-    pipeline = [
-        {"$match": {"village_name": village_name, "status": "In Progress"}},
-        {"$group": {"_id": None, "total": {"$sum": "$allocated_budget"}}}
-    ]
-    budget_result = await db.projects.aggregate(pipeline).to_list(1)
-    budget_used = budget_result[0]["total"] if budget_result else 0.0
-
-    # 3. CARD: Issues Resolved 
-    # (For MVP, we count global resolved. In V2, we can filter by village too)
-    issues_resolved = await db.discussions.count_documents({"status": "Resolved"})
+    # Read from the precomputed village rollup instead of aggregating projects
+    rollup = await get_rollup("village", village_name)
+    budget_used = float(rollup["budget_by_status"].get("In Progress", 0.0))
 
-    # 4. CARD: Village Mood (AI Sentiment)
-    last_insight = await db.insights.find_one(sort=[("generated_at", -1)])
-    sentiment = last_insight["sentiment_score"] if last_insight else 0
-    
-    if sentiment > 0.3: mood = "Happy 🙂"
-    elif sentiment < -0.3: mood = "Angry 😡"
-    else: mood = "Neutral 😐"
+    # 3-4. CARDS: Issues Resolved & Village Mood (cached per village)
+    cards = await cached(
+        f"dashboard:village:{village_name}", VILLAGE_CARDS_TTL_SECONDS,
+        lambda: compute_village_cards(village_name)
+    )
 
     # 5. CARD: Personal Impact (The User's Contribution)
     personal_impact = await db.discussions.count_documents({
@@ -54,8 +67,8 @@ async def get_dashboard_stats(
 
     return DashboardStats(
         budget_used=budget_used,
-        issues_resolved=issues_resolved,
-        village_mood=mood,
+        issues_resolved=cards["issues_resolved"],
+        village_mood=cards["village_mood"],
         personal_impact=personal_impact,
         next_meeting="Jan 24, 10 AM"
     )
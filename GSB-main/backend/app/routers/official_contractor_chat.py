@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, status, Query
 from app.database import db
+from app.services import archive
+from app.utils.responses import FastJSONResponse, mongo_projection, response_fields, trusted_list
 from pydantic import BaseModel
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from bson import ObjectId
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/official-contractor-chat", tags=["Official-Contractor Discussion"])
 
@@ -26,6 +28,9 @@ class DiscussionResponse(BaseModel):
     village_name: str
     timestamp: datetime
 
+HISTORY_PROJECTION = mongo_projection(DiscussionResponse)
+HISTORY_FIELDS = response_fields(DiscussionResponse)
+
 # --- Helper: Resolve Identity & Context ---
 async def resolve_user(user_id: str):
     """
@@ -110,25 +115,30 @@ async def send_discussion_message(msg: DiscussionMessage):
     
     return doc
 
-@router.get("/history", response_model=List[DiscussionResponse])
+@router.get("/history", response_model=List[DiscussionResponse], response_class=FastJSONResponse)
 async def get_discussion_history(
     user1: str = Query(..., description="ID of User 1"),
-    user2: str = Query(..., description="ID of User 2")
+    user2: str = Query(..., description="ID of User 2"),
+    start: Optional[date] = Query(None, description="Sent on or after (UTC date); older dates include archived messages"),
+    end: Optional[date] = Query(None, description="Sent on or before (UTC date)")
 ):
     """
     Fetch the discussion history between two users.
     """
-    cursor = db.official_contractor_chats.find({
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'start' must be on or before 'end'")
+
+    query = {
         "$or": [
             {"sender_id": user1, "receiver_id": user2},
             {"sender_id": user2, "receiver_id": user1}
-        ]
-    }).sort("timestamp", 1)
-    
-    messages = await cursor.to_list(1000)
+        ],
+        **archive.date_range("timestamp", start, end)
+    }
+    messages = await archive.find_with_archive(
+        "official_contractor_chats", query, HISTORY_PROJECTION, ("timestamp", 1), 1000, start
+    )
     
-    results = []
     for m in messages:
         m["id"] = str(m["_id"])
-        results.append(m)
-    return results
+    return trusted_list(messages, HISTORY_FIELDS)
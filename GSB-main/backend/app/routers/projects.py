@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form, Body
+from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form, Body, BackgroundTasks, Request
 from app.database import db
-from app.utils.s3 import upload_file_to_s3
+from app.services.attachments import store_upload
+from app.services.images import process_project_image
+from app.services.rollups import apply_project_change, get_rollup
+from app.utils.geo import bbox_polygon, near_filter, parse_bbox, point, route_geometry
+from app.utils.responses import FastJSONResponse, not_modified, revalidate_headers, weak_etag
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -14,8 +19,9 @@ IST = timezone(timedelta(hours=5, minutes=30))
 # --- SCHEMAS ---
 
 class GeoPoint(BaseModel):
-    lat: float
-    lng: float
+    # Out-of-range points would be rejected by the 2dsphere index on insert
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
 
 class Milestone(BaseModel):
     title: str
@@ -39,9 +45,46 @@ class ProjectCreate(BaseModel):
     status: str = "Proposed"
     milestones: List[Milestone] = []
 
+class ProjectDetailsUpdate(BaseModel):
+    """Any subset of the planning fields; start_point and end_point go together."""
+    project_name: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    location: Optional[str] = None
+    start_point: Optional[GeoPoint] = None
+    end_point: Optional[GeoPoint] = None
+    contractor_name: Optional[str] = None
+    contractor_id: Optional[str] = None
+    allocated_budget: Optional[float] = None
+    start_date: Optional[datetime] = None
+    due_date: Optional[datetime] = None
+
 class ProjectUpdateStatus(BaseModel):
     status: str
 
+class MilestoneUpdateStatus(BaseModel):
+    status: str
+
+# Fields the rollups need from the pre-update document
+ROLLUP_PROJECTION = {
+    "village_name": 1, "contractor_id": 1, "allocated_budget": 1,
+    "status": 1, "category": 1, "milestones": 1
+}
+
+# --- HELPER: Project List Response (ETag / 304, see utils/responses.py) ---
+def project_list(request: Optional[Request], projects: list):
+    etag = weak_etag(projects)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    results = []
+    for p in projects:
+        p["id"] = str(p["_id"])
+        del p["_id"]
+        results.append(p)
+    return FastJSONResponse(results, headers=revalidate_headers(etag))
+
 # --- ROUTES ---
 
 # 1. CREATE PROJECT
@@ -50,8 +93,13 @@ async def create_project(project: ProjectCreate):
     new_project = project.dict()
     new_project["created_at"] = datetime.now(IST)
     new_project["images"] = []
+
+    # GeoJSON copies of start/end for the 2dsphere index (raw points kept for the UI)
+    new_project["start_location"] = point(project.start_point.lat, project.start_point.lng)
+    new_project["route"] = route_geometry(new_project["start_point"], new_project["end_point"])
     
     result = await db.projects.insert_one(new_project)
+    await apply_project_change(None, new_project)
     
     return {
         "message": "Project created successfully",
@@ -60,40 +108,77 @@ async def create_project(project: ProjectCreate):
 
 # 2. GET PROJECTS BY VILLAGE
 @router.get("/village/{village_name}")
-async def get_projects_by_village(village_name: str):
+async def get_projects_by_village(village_name: str, request: Request = None):
     projects = await db.projects.find({"village_name": village_name}).to_list(100)
-    
-    results = []
-    for p in projects:
-        p["id"] = str(p["_id"])
-        del p["_id"]
-        results.append(p)
-        
-    return results
+    return project_list(request, projects)
 
 # 3. GET PROJECTS FOR CONTRACTOR
 @router.get("/contractor/{contractor_id}")
-async def get_contractor_projects(contractor_id: str):
+async def get_contractor_projects(contractor_id: str, request: Request = None):
     projects = await db.projects.find({"contractor_id": contractor_id}).to_list(100)
-    
-    results = []
-    for p in projects:
-        p["id"] = str(p["_id"])
-        del p["_id"]
-        results.append(p)
-        
-    return results
+    return project_list(request, projects)
+
+# 4. BUDGET & PROGRESS ROLLUP
+@router.get("/rollup")
+async def get_project_rollup(
+    village_name: Optional[str] = Query(None, description="Rollup for a village"),
+    contractor_id: Optional[str] = Query(None, description="Rollup for a contractor")
+):
+    """
+    Budget committed/spent, per-category budget and milestone completion %.
+    Precomputed on every project write, so this is a single document read.
+    """
+    if bool(village_name) == bool(contractor_id):
+        raise HTTPException(status_code=400, detail="Provide exactly one of village_name or contractor_id")
 
-# 4. UPLOAD PROJECT IMAGE (FIXED)
+    if village_name:
+        return await get_rollup("village", village_name)
+    return await get_rollup("contractor", contractor_id)
+
+# 5. FIND PROJECTS NEAR A LOCATION
+@router.get("/near")
+async def get_projects_near(
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of the search centre"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of the search centre"),
+    radius_m: float = Query(2000, gt=0, le=50000, description="Search radius in metres"),
+    bbox: Optional[str] = Query(None, description="Bounding box: minLng,minLat,maxLng,maxLat"),
+    village_name: Optional[str] = Query(None, description="Restrict to one village"),
+    limit: int = Query(50, ge=1, le=200),
+    request: Request = None
+):
+    """
+    Spatial project lookup on the 'route' 2dsphere index.
+    - lat/lng (+ radius_m): projects whose route passes within the radius, nearest first.
+    - bbox: projects whose route touches the box.
+    """
+    if bbox:
+        box = parse_bbox(bbox)
+        if not box:
+            raise HTTPException(status_code=400, detail="Invalid bbox. Use minLng,minLat,maxLng,maxLat")
+        query = {"route": {"$geoIntersects": {"$geometry": bbox_polygon(*box)}}}
+    elif lat is not None and lng is not None:
+        query = near_filter("route", lat, lng, radius_m)
+    else:
+        raise HTTPException(status_code=400, detail="Provide either lat & lng or bbox")
+
+    if village_name:
+        query["village_name"] = village_name
+
+    projects = await db.projects.find(query).limit(limit).to_list(limit)
+    return project_list(request, projects)
+
+# 6. UPLOAD PROJECT IMAGE (FIXED)
 @router.post("/{project_id}/upload-image")
 async def upload_project_image(
     project_id: str,
+    background_tasks: BackgroundTasks,
     contractor_id: str = Query(..., description="ID of the contractor uploading"),
     file: UploadFile = File(...),
     description: str = Form("Progress Update")
 ):
     """
     Contractor uploads progress images.
+    Thumbnail/web renditions are generated after the response is sent.
     """
     try:
         oid = ObjectId(project_id)
@@ -107,14 +192,11 @@ async def upload_project_image(
     if project.get("contractor_id") != contractor_id:
         raise HTTPException(status_code=403, detail="Unauthorized: You are not the assigned contractor.")
 
-    # --- FIX START ---
-    # 1. Removed 'await' (upload_file_to_s3 is synchronous)
-    # 2. Corrected arguments: file.file, file.filename
-    try:
-        image_url = upload_file_to_s3(file.file, file.filename, folder="projects")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"S3 Upload Failed: {str(e)}")
-    # --- FIX END ---
+    # Content-addressed upload: re-sent photos only cost a metadata write
+    stored = await store_upload(file, folder="projects")
+    if not stored:
+        raise HTTPException(status_code=500, detail="S3 Upload Failed")
+    image_url = stored.url
     
     image_record = {
         "url": image_url,
@@ -125,14 +207,16 @@ async def upload_project_image(
 
     await db.projects.update_one(
         {"_id": oid},
-        {"$push": {"images": image_record}}
+        {"$push": {"images": image_record}, "$set": {"updated_at": datetime.now(timezone.utc)}}
     )
 
+    background_tasks.add_task(process_project_image, oid, stored)
+
     return {"message": "Image uploaded successfully", "url": image_url}
 
-# 5. GET PROJECT DETAILS
+# 7. GET PROJECT DETAILS
 @router.get("/{project_id}")
-async def get_project_details(project_id: str):
+async def get_project_details(project_id: str, request: Request = None):
     try:
         oid = ObjectId(project_id)
     except:
@@ -142,12 +226,17 @@ async def get_project_details(project_id: str):
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    etag = weak_etag([project])
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     project["id"] = str(project["_id"])
     del project["_id"]
 
-    return project
+    return FastJSONResponse(project, headers=revalidate_headers(etag))
 
-# 6. UPDATE PROJECT STATUS
+# 8. UPDATE PROJECT STATUS
 @router.patch("/{project_id}/status")
 async def update_project_status(project_id: str, update: ProjectUpdateStatus):
     try:
@@ -155,12 +244,104 @@ async def update_project_status(project_id: str, update: ProjectUpdateStatus):
     except:
         raise HTTPException(status_code=400, detail="Invalid Project ID")
 
-    result = await db.projects.update_one(
+    before = await db.projects.find_one_and_update(
         {"_id": oid},
-        {"$set": {"status": update.status}}
+        {"$set": {"status": update.status, "updated_at": datetime.now(timezone.utc)}},
+        projection=ROLLUP_PROJECTION,
+        return_document=ReturnDocument.BEFORE
     )
 
-    if result.matched_count == 0:
+    if not before:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    await apply_project_change(before, {**before, "status": update.status})
+
     return {"message": "Project status updated", "new_status": update.status}
+
+# 9. UPDATE MILESTONE STATUS
+@router.patch("/{project_id}/milestones/{index}")
+async def update_milestone_status(project_id: str, index: int, update: MilestoneUpdateStatus):
+    """
+    Updates one milestone (by its position in the list) and the progress rollups.
+    """
+    try:
+        oid = ObjectId(project_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid Project ID")
+
+    if index < 0:
+        raise HTTPException(status_code=400, detail="Invalid milestone index")
+
+    before = await db.projects.find_one_and_update(
+        {"_id": oid, f"milestones.{index}": {"$exists": True}},
+        {"$set": {f"milestones.{index}.status": update.status, "updated_at": datetime.now(timezone.utc)}},
+        projection=ROLLUP_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if not before:
+        raise HTTPException(status_code=404, detail="Project or milestone not found")
+
+    milestones = [dict(m) for m in before.get("milestones", [])]
+    milestones[index]["status"] = update.status
+    await apply_project_change(before, {**before, "milestones": milestones})
+
+    return {"message": "Milestone status updated", "milestone": milestones[index]}
+
+# 10. ADD MILESTONE
+@router.post("/{project_id}/milestones", status_code=status.HTTP_201_CREATED)
+async def add_milestone(project_id: str, milestone: Milestone):
+    try:
+        oid = ObjectId(project_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid Project ID")
+
+    new_milestone = milestone.dict()
+    before = await db.projects.find_one_and_update(
+        {"_id": oid},
+        {"$push": {"milestones": new_milestone}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        projection=ROLLUP_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if not before:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    await apply_project_change(before, {**before, "milestones": before.get("milestones", []) + [new_milestone]})
+
+    return {"message": "Milestone added", "index": len(before.get("milestones", []))}
+
+# 11. UPDATE PROJECT DETAILS (e.g. a project created from an approved proposal)
+@router.patch("/{project_id}/details")
+async def update_project_details(project_id: str, update: ProjectDetailsUpdate):
+    try:
+        oid = ObjectId(project_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid Project ID")
+
+    changes = update.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    if ("start_point" in changes) != ("end_point" in changes):
+        raise HTTPException(status_code=400, detail="Provide start_point and end_point together")
+    updated_fields = sorted(changes)
+
+    if "start_point" in changes:
+        # Keep the indexed GeoJSON copies in step with the raw points
+        changes["start_location"] = point(changes["start_point"]["lat"], changes["start_point"]["lng"])
+        changes["route"] = route_geometry(changes["start_point"], changes["end_point"])
+
+    before = await db.projects.find_one_and_update(
+        {"_id": oid},
+        {"$set": {**changes, "updated_at": datetime.now(timezone.utc)}},
+        projection=ROLLUP_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if not before:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Budget, category and contractor all feed the rollups
+    await apply_project_change(before, {**before, **changes})
+
+    return {"message": "Project details updated", "updated_fields": updated_fields}
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Request
 from app.database import db
 from app.schemas import ProposedProjectCreate, ProposedProjectResponse
+from app.services.proposals import approve_into_project, decode_cursor, list_ranked, normalise_title, vote_id
+from app.utils.responses import FastJSONResponse, not_modified, response_fields, revalidate_headers, trim, weak_etag
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
-from typing import List
+from typing import Optional
 
 router = APIRouter(prefix="/proposals", tags=["Proposed Projects"])
 
+PROPOSAL_FIELDS = response_fields(ProposedProjectResponse)
+
 # --- HELPER: Verify Official Role ---
 async def verify_official(user_id: str):
     """
@@ -27,58 +33,105 @@ async def verify_official(user_id: str):
         )
     return official
 
-# 1. CREATE PROPOSAL (Open to all)
+# --- HELPER: Verify Villager (Voters) ---
+async def verify_villager(user_id: str):
+    try:
+        obj_id = ObjectId(user_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid User ID format")
+
+    villager = await db.villagers.find_one({"_id": obj_id}, {"village_name": 1})
+    if not villager:
+        raise HTTPException(status_code=403, detail="Access Denied. Only villagers can vote on proposals.")
+    return villager
+
+def parse_proposal_id(proposal_id: str) -> ObjectId:
+    try:
+        return ObjectId(proposal_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid Proposal ID")
+
+def to_response(proposal: dict) -> dict:
+    proposal["id"] = str(proposal["_id"])
+    return trim(proposal, PROPOSAL_FIELDS)
+
+# 1. CREATE PROPOSAL (Open to all; repeats of a Pending title are merged)
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=ProposedProjectResponse)
 async def create_proposal(proposal: ProposedProjectCreate):
     new_proposal = proposal.dict()
+    new_proposal["title_key"] = normalise_title(proposal.proposed_project_title, proposal.village_id)
     new_proposal["status"] = "Pending"
     new_proposal["created_at"] = datetime.utcnow()
-    
-    result = await db.proposed_projects.insert_one(new_proposal)
-    
-    new_proposal["id"] = str(result.inserted_id)
-    return new_proposal
+    new_proposal["vote_count"] = 0
+
+    # Upsert on the dedupe key: a near-duplicate counts as support for the existing one
+    for attempt in range(2):
+        try:
+            saved = await db.proposed_projects.find_one_and_update(
+                {"village_id": proposal.village_id, "title_key": new_proposal["title_key"], "status": "Pending"},
+                {"$setOnInsert": new_proposal, "$inc": {"proposal_count": 1, "support": 1},
+                 "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            break
+        except DuplicateKeyError:
+            # A concurrent request inserted it first; the retry matches that one
+            if attempt:
+                raise
+    return to_response(saved)
 
-# 2. GET ALL PROPOSALS (Filter by Village)
-@router.get("/", response_model=List[ProposedProjectResponse])
-async def get_proposals(village_id: str = Query(None, description="Filter by Village ID")):
-    query = {}
+# 2. GET PROPOSALS (Ranked by support, keyset-paginated)
+@router.get("/", response_class=FastJSONResponse)
+async def get_proposals(
+    village_id: str = Query(None, description="Filter by Village ID"),
+    status: Optional[str] = Query(None, description="Pending, Approved or Rejected (default: all but merged)"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    request: Request = None
+):
+    if cursor and decode_cursor(cursor) is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    query = {"status": status} if status else {"status": {"$ne": "Merged"}}
     if village_id:
         query["village_id"] = village_id
-        
-    proposals = await db.proposed_projects.find(query).sort("created_at", -1).to_list(100)
-    
-    results = []
-    for p in proposals:
-        p["id"] = str(p["_id"])
-        results.append(p)
-    return results
 
-# 3. APPROVE PROPOSAL (Restricted to Govt Officials)
+    proposals, next_cursor = await list_ranked(query, limit, cursor)
+    etag = weak_etag(proposals, extra=next_cursor)
+    return not_modified(request, etag) or FastJSONResponse(
+        {"results": [to_response(p) for p in proposals], "next_cursor": next_cursor},
+        headers=revalidate_headers(etag)
+    )
+
+# --- HELPER: Review Transition (Pending -> Rejected, exactly once) ---
+async def review_proposal(proposal_id: str, official: dict, decision: str) -> dict:
+    obj_id = parse_proposal_id(proposal_id)
+
+    # Guarded on status, so concurrent approve / reject clicks can't both win
+    proposal = await db.proposed_projects.find_one_and_update(
+        {"_id": obj_id, "status": "Pending"},
+        {"$set": {
+            "status": decision, "reviewed_by": str(official["_id"]),
+            "reviewed_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        }},
+        return_document=ReturnDocument.AFTER
+    )
+    if proposal is None:
+        raise HTTPException(status_code=404, detail="Proposal not found or already processed")
+    return proposal
+
+# 3. APPROVE PROPOSAL (Restricted to Govt Officials; creates the project)
 @router.patch("/{proposal_id}/approve")
 async def approve_proposal(
     proposal_id: str,
     official_id: str = Query(..., description="ID of the Government Official approving this")
 ):
-    # A. Verify Role
-    await verify_official(official_id)
-
-    # B. Validate Proposal ID
-    try:
-        obj_id = ObjectId(proposal_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid Proposal ID")
-
-    # C. Update Status
-    result = await db.proposed_projects.update_one(
-        {"_id": obj_id},
-        {"$set": {"status": "Approved"}}
-    )
-    
-    if result.modified_count == 0:
+    official = await verify_official(official_id)
+    project_id = await approve_into_project(parse_proposal_id(proposal_id), official)
+    if project_id is None:
         raise HTTPException(status_code=404, detail="Proposal not found or already processed")
-        
-    return {"message": "Project Proposal APPROVED successfully"}
+    return {"message": "Project Proposal APPROVED successfully", "project_id": str(project_id)}
 
 # 4. REJECT PROPOSAL (Restricted to Govt Officials)
 @router.patch("/{proposal_id}/reject")
@@ -86,22 +139,74 @@ async def reject_proposal(
     proposal_id: str,
     official_id: str = Query(..., description="ID of the Government Official rejecting this")
 ):
-    # A. Verify Role
-    await verify_official(official_id)
+    official = await verify_official(official_id)
+    await review_proposal(proposal_id, official, "Rejected")
+    return {"message": "Project Proposal REJECTED"}
+
+# --- HELPER: Votable Proposal (Pending, in the villager's village) ---
+async def votable_proposal(obj_id: ObjectId, villager: dict) -> dict:
+    proposal = await db.proposed_projects.find_one({"_id": obj_id, "status": "Pending"}, {"village_id": 1})
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found or already processed")
+    if proposal["village_id"] != villager["village_name"]:
+        raise HTTPException(status_code=403, detail="You can only vote on proposals for your own village")
+    return proposal
+
+# 5. VOTE FOR A PROPOSAL (Villagers of the same village, once each)
+@router.post("/{proposal_id}/vote", status_code=status.HTTP_201_CREATED)
+async def vote_proposal(
+    proposal_id: str,
+    user_id: str = Query(..., description="Database ID of the voting villager")
+):
+    villager = await verify_villager(user_id)
+    obj_id = parse_proposal_id(proposal_id)
+    await votable_proposal(obj_id, villager)
 
-    # B. Validate Proposal ID
+    # The vote's _id is the uniqueness check; the counter only moves for a new vote
     try:
-        obj_id = ObjectId(proposal_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid Proposal ID")
+        await db.proposal_votes.insert_one({
+            "_id": vote_id(obj_id, user_id),
+            "proposal_id": obj_id,
+            "voter_id": user_id,
+            "created_at": datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="You have already voted for this proposal")
 
-    # C. Update Status
-    result = await db.proposed_projects.update_one(
-        {"_id": obj_id},
-        {"$set": {"status": "Rejected"}}
+    updated = await db.proposed_projects.find_one_and_update(
+        {"_id": obj_id, "status": "Pending"},
+        {"$inc": {"vote_count": 1, "support": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        projection={"vote_count": 1},
+        return_document=ReturnDocument.AFTER
     )
-    
-    if result.modified_count == 0:
+    if not updated:
+        await db.proposal_votes.delete_one({"_id": vote_id(obj_id, user_id)})
         raise HTTPException(status_code=404, detail="Proposal not found or already processed")
-        
-    return {"message": "Project Proposal REJECTED"}
+    return {"message": "Vote recorded", "vote_count": updated["vote_count"]}
+
+# 6. WITHDRAW VOTE
+@router.delete("/{proposal_id}/vote")
+async def withdraw_vote(
+    proposal_id: str,
+    user_id: str = Query(..., description="Database ID of the voting villager")
+):
+    villager = await verify_villager(user_id)
+    obj_id = parse_proposal_id(proposal_id)
+    # Same rules as voting: once a proposal is decided its ranking is final
+    await votable_proposal(obj_id, villager)
+
+    vote = await db.proposal_votes.find_one_and_delete({"_id": vote_id(obj_id, user_id)})
+    if vote is None:
+        raise HTTPException(status_code=404, detail="No vote to withdraw")
+
+    updated = await db.proposed_projects.find_one_and_update(
+        {"_id": obj_id, "status": "Pending"},
+        {"$inc": {"vote_count": -1, "support": -1}, "$set": {"updated_at": datetime.utcnow()}},
+        projection={"vote_count": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        # Decided in the meantime: the vote stands
+        await db.proposal_votes.insert_one(vote)
+        raise HTTPException(status_code=404, detail="Proposal not found or already processed")
+    return {"message": "Vote withdrawn", "vote_count": updated["vote_count"]}
@@ -1,30 +1,54 @@
-from fastapi import APIRouter, HTTPException
-from app.database import db
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.config import settings
 from app.schemas import SchemeResponse
+from app.services import scheme_catalog
+from app.utils.responses import dumps, not_modified
 from typing import List
+import hashlib
 
 router = APIRouter(prefix="/schemes", tags=["Government Schemes"])
 
+# Schemes are served from the in-memory catalog snapshot (see services/scheme_catalog.py)
+SCHEME_CACHE_MAX_AGE = settings.scheme_cache_max_age
+
+def catalog_response(request: Request, body: bytes, etag: str) -> Response:
+    """Weak-ETag JSON response; answers 304 when the client copy is current."""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={SCHEME_CACHE_MAX_AGE}",
+    }
+    return not_modified(request, etag, headers) or Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/", response_model=List[SchemeResponse])
-async def get_all_schemes():
+async def get_all_schemes(request: Request):
     """
     Fetch all available Government Schemes.
     """
-    schemes = await db.schemes.find().to_list(100)
-    results = []
-    for scheme in schemes:
-        scheme["id"] = str(scheme["_id"])
-        results.append(scheme)
-    return results
+    snapshot = await scheme_catalog.get_snapshot()
+    return catalog_response(request, snapshot.body, snapshot.etag)
+
+@router.get("/search", response_model=List[SchemeResponse])
+async def search_schemes(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Words to match in name, description or department"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Ranked keyword search over the in-memory inverted index.
+    """
+    snapshot = await scheme_catalog.get_snapshot()
+    positions = snapshot.search(q, limit)
+    body = dumps([dict(snapshot.schemes[p]) for p in positions])
+    query_hash = hashlib.sha256(f"{q}|{limit}".encode()).hexdigest()[:12]
+    return catalog_response(request, body, f'W/"{snapshot.version}-{query_hash}"')
 
 @router.get("/{scheme_id}", response_model=SchemeResponse)
-async def get_scheme_by_id(scheme_id: str):
+async def get_scheme_by_id(request: Request, scheme_id: str):
     """
     Fetch a specific scheme by its ID (e.g., SCH-AGRI-001).
     """
-    scheme = await db.schemes.find_one({"scheme_id": scheme_id})
-    if not scheme:
+    snapshot = await scheme_catalog.get_snapshot()
+    position = snapshot.get(scheme_id)
+    if position is None:
         raise HTTPException(status_code=404, detail="Scheme not found")
-    scheme["id"] = str(scheme["_id"])
-    return scheme
-
+    return catalog_response(request, snapshot.item_bodies[position], snapshot.item_etags[position])
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.database import db
+from app.routers.community import get_user_details
+from app.routers.complaints import process_complaint_status
+from app.schemas import ComplaintResponse, DiscussionResponse
+from app.services.search import complaint_filters, decode_cursor, search_latency, text_search
+from app.utils.responses import FastJSONResponse, mongo_projection, response_fields, trim
+from typing import Optional
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+COMPLAINT_PROJECTION = mongo_projection(ComplaintResponse)
+COMPLAINT_FIELDS = response_fields(ComplaintResponse) + (("score", 0.0),)
+DISCUSSION_PROJECTION = mongo_projection(DiscussionResponse)
+DISCUSSION_FIELDS = response_fields(DiscussionResponse) + (("score", 0.0),)
+
+def validate_cursor(cursor: Optional[str]):
+    if cursor and decode_cursor(cursor) is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# 1. SEARCH COMPLAINTS (Officials, own village only)
+@router.get("/complaints", response_class=FastJSONResponse)
+async def search_complaints(
+    q: str = Query(..., min_length=1, description="Words to search in title, description and location"),
+    user_id: str = Query(..., description="Government ID or Database ID of the official"),
+    status: Optional[str] = Query(None, description="e.g. Pending, Resolved, Migrated to Higher Officials"),
+    tier: Optional[str] = Query(None, description="First Attempt, Second Attempt or Escalated"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """
+    Ranked full-text search over the official's village complaints.
+    """
+    user, role, error = await get_user_details(user_id)
+    if error:
+        raise HTTPException(status_code=404, detail=error)
+    if role != "official":
+        raise HTTPException(status_code=403, detail="Access Denied. Only Officials can search complaints.")
+    validate_cursor(cursor)
+
+    with search_latency.timer("complaints"):
+        docs, next_cursor = await text_search(
+            db.complaints, user["village_name"], q,
+            complaint_filters(status, tier), COMPLAINT_PROJECTION, limit, cursor
+        )
+
+    results = [trim(process_complaint_status(d), COMPLAINT_FIELDS) for d in docs]
+    return FastJSONResponse({"results": results, "next_cursor": next_cursor})
+
+# 2. SEARCH DISCUSSIONS (Any member of the village)
+@router.get("/discussions", response_class=FastJSONResponse)
+async def search_discussions(
+    q: str = Query(..., min_length=1, description="Words to search in post content and category"),
+    user_id: str = Query(..., description="Unique ID: Can be _id, government_id, or username"),
+    category: Optional[str] = Query(None, description="Exact category filter"),
+    status: Optional[str] = Query(None, description="Open or Resolved"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """
+    Ranked full-text search over the community feed of the user's village.
+    """
+    user, role, error = await get_user_details(user_id)
+    if error:
+        raise HTTPException(status_code=404, detail=error)
+
+    validate_cursor(cursor)
+
+    filters = []
+    if category:
+        filters.append({"category": category})
+    if status:
+        filters.append({"status": status})
+
+    with search_latency.timer("discussions"):
+        docs, next_cursor = await text_search(
+            db.discussions, user["village_name"], q,
+            filters, DISCUSSION_PROJECTION, limit, cursor
+        )
+
+    for d in docs:
+        d["id"] = str(d["_id"])
+        d.setdefault("upvotes", 0)
+    results = [trim(d, DISCUSSION_FIELDS) for d in docs]
+    return FastJSONResponse({"results": results, "next_cursor": next_cursor})
+
+# 3. QUERY LATENCY
+@router.get("/stats")
+async def get_search_stats():
+    """p50/p95/p99 latency of the most recent searches, per kind."""
+    return search_latency.summary()
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, status
-from app.database import db
+from app.database import db, secondary_db
 from app.schemas import (
     VillagerResponse, 
     ContractorResponse, 
     OfficialResponse, 
     ContractorDashboardResponse
 )
+from app.services.rollups import get_rollup
 from typing import List
 
 router = APIRouter(prefix="/users", tags=["User Management"])
@@ -13,11 +14,12 @@ router = APIRouter(prefix="/users", tags=["User Management"])
 # ==========================
 # 1. FETCH ALL USERS
 # ==========================
+# Listings are read-mostly and may be served by a secondary (see database.py)
 
 @router.get("/villagers", response_model=List[VillagerResponse])
 async def get_all_villagers():
     """Fetch all registered villagers with full details"""
-    users = await db.villagers.find().to_list(1000)
+    users = await secondary_db.villagers.find().to_list(1000)
     for user in users:
         user["id"] = str(user["_id"])
         # Ensure optional list fields exist if DB record is old
@@ -28,7 +30,7 @@ async def get_all_villagers():
 @router.get("/contractors", response_model=List[ContractorResponse])
 async def get_all_contractors():
     """Fetch all registered contractors"""
-    users = await db.contractors.find().to_list(1000)
+    users = await secondary_db.contractors.find().to_list(1000)
     for user in users:
         user["id"] = str(user["_id"])
     return users
@@ -36,7 +38,7 @@ async def get_all_contractors():
 @router.get("/officials", response_model=List[OfficialResponse])
 async def get_all_officials():
     """Fetch all officials with assigned complaints"""
-    users = await db.government_officials.find().to_list(1000)
+    users = await secondary_db.government_officials.find().to_list(1000)
     for user in users:
         user["id"] = str(user["_id"])
         # Ensure optional list fields exist
@@ -72,37 +74,29 @@ async def get_contractor_by_id(contractor_id: str):
     
     user["id"] = str(user["_id"])
 
-    # 2. Fetch Projects assigned to this Contractor
-    cursor = db.projects.find({"contractor_id": contractor_id})
+    # 2. Dashboard Statistics come from the precomputed contractor rollup
+    rollup = await get_rollup("contractor", contractor_id)
+    completed_count = int(rollup["count_by_status"].get("Completed", 0))
+    total_value = float(rollup["budget_committed"])
+    active_count = int(rollup["project_count"]) - completed_count
+
+    # 3. Fetch only the active projects (with the fields the summary needs)
+    cursor = db.projects.find(
+        {"contractor_id": contractor_id, "status": {"$ne": "Completed"}},
+        {"project_name": 1, "status": 1, "allocated_budget": 1, "location": 1, "start_date": 1}
+    )
     projects_list = await cursor.to_list(length=1000)
 
-    # 3. Calculate Dashboard Statistics
-    total_value = 0.0
-    active_count = 0
-    completed_count = 0
     active_projects_data = []
-
     for p in projects_list:
-        p_status = p.get("status", "Pending")
-        budget = float(p.get("allocated_budget", 0))
-
-        # Sum up total contract value
-        total_value += budget
-
-        # Count Active vs Completed
-        if p_status == "Completed":
-            completed_count += 1
-        else:
-            active_count += 1
-            # Add to the list of active projects
-            active_projects_data.append({
-                "id": str(p["_id"]),
-                "project_name": p.get("project_name", "Untitled Project"),
-                "status": p_status,
-                "allocated_budget": budget,
-                "location": p.get("location", "Unknown"),
-                "start_date": p.get("start_date")
-            })
+        active_projects_data.append({
+            "id": str(p["_id"]),
+            "project_name": p.get("project_name", "Untitled Project"),
+            "status": p.get("status", "Pending"),
+            "allocated_budget": float(p.get("allocated_budget", 0)),
+            "location": p.get("location", "Unknown"),
+            "start_date": p.get("start_date")
+        })
 
     # 4. Construct the Final Response
     response_data = {
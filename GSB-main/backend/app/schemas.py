@@ -111,6 +111,7 @@ class DiscussionResponse(BaseModel):
     upvotes: int
     replies: List[DiscussionComment] = []
     image_url: Optional[str] = None
+    image_thumbnail_url: Optional[str] = None
 
 # --- AI Insight Models ---
 class InsightCreate(BaseModel):
@@ -176,6 +177,9 @@ class ProposedProjectResponse(BaseModel):
     proposed_project_title: str
     status: str
     created_at: datetime
+    vote_count: int = 0
+    proposal_count: int = 1
+    project_id: Optional[str] = None
 
 # --- Complaint Schemas ---
 class ComplaintResponse(BaseModel):
@@ -187,7 +191,14 @@ class ComplaintResponse(BaseModel):
     village_name: str
     villager_phone: str
     attachments: List[str]
+    attachments_renditions: List[dict] = []
     created_at: datetime
+    nearby_projects: List[str] = []
+
+    # Denormalised from the villager (escalation hierarchy)
+    taluk: Optional[str] = None
+    district: Optional[str] = None
+    state: Optional[str] = None
     
     # Escalation Fields
     days_pending: int = 0
@@ -196,6 +207,7 @@ class ComplaintResponse(BaseModel):
     # Resolution Details
     resolution_notes: Optional[str] = None
     resolution_attachments: List[str] = []
+    resolution_attachments_renditions: List[dict] = []
     resolved_by: Optional[str] = None
     resolved_at: Optional[datetime] = None
     
@@ -207,6 +219,10 @@ class ComplaintResponse(BaseModel):
 class ReopenRequest(BaseModel):
     phone_number: str
 
+class BatchReopenRequest(BaseModel):
+    phone_number: str
+    complaint_ids: List[str]
+
 # --- Contractor Dashboard Schemas ---
 class ProjectSummary(BaseModel):
     id: str
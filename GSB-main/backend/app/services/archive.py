@@ -0,0 +1,178 @@
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from typing import NamedTuple, Optional
+
+import pymongo
+from pymongo import ReplaceOne
+
+from app.config import settings
+from app.database import db
+
+# Cold tier for data the hot paths no longer show. A leader-only job
+# (run_archiver) moves documents past their policy's age into
+# `<collection>_archive`, which has the same shape and the read indexes only.
+# List endpoints read the archive as well when an explicit date range starts
+# before the archive horizon (see find_with_archive).
+#
+# A move is copy-then-delete, both keyed by _id and guarded by the age filter:
+# a rerun after a crash just replaces the copies, and a document that changed
+# in between (e.g. a complaint reopened) stays hot and its copy is dropped.
+
+ARCHIVE_INTERVAL_SECONDS = settings.archive_interval_seconds
+ARCHIVE_BATCH_SIZE = settings.archive_batch_size
+
+
+class ArchivePolicy(NamedTuple):
+    collection: str
+    age_field: str       # archived once this is older than `days`
+    days: int            # 0 disables archiving for the collection
+    extra: dict          # further conditions, e.g. only Resolved complaints
+    indexes: tuple       # read indexes created on the archive collection
+    idle_fields: tuple = ()  # must also be missing or older than `days` (no recent activity)
+
+
+POLICIES = {
+    "complaints": ArchivePolicy(
+        "complaints", "resolved_at", settings.complaint_archive_days, {"status": "Resolved"},
+        (
+            [("villager_phone", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],
+            [("village_name", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],
+        ),
+    ),
+    # Discussions have no closed state: a thread counts as closed once it has
+    # had no upvote or comment (updated_at, reply times) for the whole period
+    "discussions": ArchivePolicy(
+        "discussions", "created_at", settings.discussion_archive_days, {},
+        ([("village_name", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)],),
+        ("updated_at", "replies.created_at"),
+    ),
+    "official_contractor_chats": ArchivePolicy(
+        "official_contractor_chats", "timestamp", settings.chat_archive_days, {},
+        (
+            [("sender_id", pymongo.ASCENDING), ("receiver_id", pymongo.ASCENDING), ("timestamp", pymongo.ASCENDING)],
+        ),
+    ),
+}
+
+
+def archive_name(collection: str) -> str:
+    return f"{collection}_archive"
+
+
+def horizon(policy: ArchivePolicy, now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=policy.days)
+
+
+def age_filter(policy: ArchivePolicy, now: Optional[datetime] = None) -> dict:
+    cutoff = horizon(policy, now)
+    idle = {field: {"$not": {"$gte": cutoff}} for field in policy.idle_fields}
+    return {policy.age_field: {"$lt": cutoff}, **idle, **policy.extra}
+
+
+# --- Archiver ---
+
+async def archive_batch(policy: ArchivePolicy, now: Optional[datetime] = None) -> int:
+    """Moves up to ARCHIVE_BATCH_SIZE documents. Returns how many left the hot collection."""
+    hot, cold = db[policy.collection], db[archive_name(policy.collection)]
+    query = age_filter(policy, now)
+    docs = await hot.find(query).limit(ARCHIVE_BATCH_SIZE).to_list(ARCHIVE_BATCH_SIZE)
+    if not docs:
+        return 0
+
+    archived_at = datetime.now(timezone.utc)
+    await cold.bulk_write(
+        [ReplaceOne({"_id": d["_id"]}, {**d, "archived_at": archived_at}, upsert=True) for d in docs],
+        ordered=False
+    )
+    ids = [d["_id"] for d in docs]
+    result = await hot.delete_many({"_id": {"$in": ids}, **query})
+
+    if result.deleted_count < len(ids):
+        # Changed since the copy (no longer matches the age filter): keep it hot only
+        still_hot = [d["_id"] async for d in hot.find({"_id": {"$in": ids}}, {"_id": 1})]
+        await cold.delete_many({"_id": {"$in": still_hot}})
+    return result.deleted_count
+
+
+async def archive_collection(policy: ArchivePolicy) -> int:
+    if policy.days <= 0:
+        return 0
+    now = datetime.now(timezone.utc)
+    moved = 0
+    while True:
+        count = await archive_batch(policy, now)
+        moved += count
+        if count < ARCHIVE_BATCH_SIZE:
+            return moved
+
+
+async def run_archiver():
+    """Leader-only background job (see services/leader.py run_as_leader)."""
+    while True:
+        for policy in POLICIES.values():
+            try:
+                moved = await archive_collection(policy)
+                if moved:
+                    print(f"🗄️ Archived {moved} {policy.collection} documents.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Archiving {policy.collection} failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+
+async def ensure_indexes():
+    for policy in POLICIES.values():
+        # The archiver's scan on the hot collection (same key as the feed's created_at index)
+        await db[policy.collection].create_index([(policy.age_field, pymongo.DESCENDING)])
+        for keys in policy.indexes:
+            await db[archive_name(policy.collection)].create_index(keys)
+
+
+# --- Reads ---
+
+def start_of(day: Optional[date]) -> Optional[datetime]:
+    return datetime.combine(day, time(), timezone.utc) if day else None
+
+
+def date_range(field: str, start: Optional[date], end: Optional[date]) -> dict:
+    """Query clause for [start, end] in whole UTC days (empty if neither is given)."""
+    bounds = {}
+    if start:
+        bounds["$gte"] = start_of(start)
+    if end:
+        bounds["$lt"] = start_of(end + timedelta(days=1))
+    return {field: bounds} if bounds else {}
+
+
+def reaches_archive(collection: str, start: Optional[date]) -> bool:
+    policy = POLICIES[collection]
+    return bool(start) and policy.days > 0 and start_of(start) < horizon(policy)
+
+
+async def find_with_archive(collection: str, query: dict, projection: dict, sort: tuple,
+                            limit: int, start: Optional[date] = None) -> list:
+    """
+    find(query).sort(sort).limit(limit) on the hot collection, merged with the
+    archive when `start` reaches past the archive horizon.
+    sort: (field, pymongo.ASCENDING | pymongo.DESCENDING)
+    """
+    field, direction = sort
+    docs = await db[collection].find(query, projection).sort(field, direction).limit(limit).to_list(limit)
+    if not reaches_archive(collection, start):
+        return docs
+
+    cold = await db[archive_name(collection)].find(query, projection).sort(field, direction).limit(limit).to_list(limit)
+    seen = {d["_id"] for d in docs}
+    merged = docs + [d for d in cold if d["_id"] not in seen]
+    merged.sort(key=lambda d: _sort_key(d.get(field)), reverse=direction == pymongo.DESCENDING)
+    return merged[:limit]
+
+
+def _sort_key(value):
+    if value is None:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
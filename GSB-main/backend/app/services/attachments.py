@@ -0,0 +1,126 @@
+import hashlib
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException, UploadFile
+from pymongo import ReturnDocument
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import db
+from app.utils.s3 import content_addressed_key, detect_content_type, put_object_if_absent
+
+CHUNK_SIZE = 256 * 1024
+MAX_UPLOAD_BYTES = settings.max_upload_bytes
+# Uploads larger than this spill from memory to a temp file while being hashed
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+class StoredUpload(NamedTuple):
+    url: str
+    digest: str
+    content_type: str
+    size: int
+    data: bytes
+    duplicate: bool
+
+
+async def store_upload(upload: UploadFile, folder: str) -> Optional[StoredUpload]:
+    """
+    Content-addressed upload.
+    The file is hashed (SHA-256) while it is streamed into a spooled temp file
+    (capped at MAX_UPLOAD_BYTES -> 413), and stored under a key derived from the
+    hash. Bytes we've already seen only cost a metadata write:
+      1. attachments[hash] exists -> bump ref_count, reuse its URL
+      2. otherwise HEAD the key, PUT only if missing, then create the metadata doc
+    Only images keep their bytes in memory (for the rendition workers).
+    Returns None if the upload failed.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+        hasher = hashlib.sha256()
+        size = 0
+        head = b""
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File '{upload.filename}' exceeds the {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB limit."
+                )
+            if not head:
+                head = chunk[:16]
+            hasher.update(chunk)
+            spool.write(chunk)
+
+        digest = hasher.hexdigest()
+        now = datetime.now(timezone.utc)
+
+        try:
+            # 1. Known content -> metadata-only write
+            existing = await db.attachments.find_one_and_update(
+                {"_id": digest},
+                {"$inc": {"ref_count": 1}, "$set": {"last_referenced_at": now}, "$addToSet": {"folders": folder}},
+                projection={"url": 1, "content_type": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if existing:
+                data = _image_bytes(spool, existing["content_type"])
+                return StoredUpload(existing["url"], digest, existing["content_type"], size, data, True)
+
+            # 2. New to us (the object may still exist from an earlier, lost metadata write)
+            content_type = detect_content_type(head, upload.filename or "")
+            key = content_addressed_key(digest, content_type)
+            spool.seek(0)
+            url, _ = await run_in_threadpool(put_object_if_absent, spool, key, content_type)
+
+            await db.attachments.update_one(
+                {"_id": digest},
+                {
+                    "$setOnInsert": {
+                        "key": key,
+                        "url": url,
+                        "content_type": content_type,
+                        "size": size,
+                        "original_filename": upload.filename,
+                        "created_at": now,
+                    },
+                    "$inc": {"ref_count": 1},
+                    "$set": {"last_referenced_at": now},
+                    "$addToSet": {"folders": folder},
+                },
+                upsert=True
+            )
+            return StoredUpload(url, digest, content_type, size, _image_bytes(spool, content_type), False)
+
+        except Exception as e:
+            print(f"❌ Attachment Upload Error: {str(e)}")
+            return None
+
+
+def _image_bytes(spool, content_type: str) -> bytes:
+    if not content_type.startswith("image/"):
+        return b""
+    spool.seek(0)
+    return spool.read()
+
+
+async def release_attachments(urls: List[str]):
+    """
+    Drops one reference per list entry (e.g. when a resolution's proof files are
+    replaced). A photo attached twice holds two references, so it is released twice.
+    """
+    for url, count in Counter(urls).items():
+        await db.attachments.update_many({"url": url}, {"$inc": {"ref_count": -count}})
+
+
+async def retain_attachments(urls: List[str], copies: int):
+    """
+    Adds references for `copies` more documents holding the same URL list
+    (one upload shared by several complaints in a batch resolve).
+    """
+    if copies <= 0:
+        return
+    for url, count in Counter(urls).items():
+        await db.attachments.update_many({"url": url}, {"$inc": {"ref_count": count * copies}})
@@ -0,0 +1,308 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+import pymongo
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import db
+from app.utils.escalation import escalation_cutoff, escalation_time
+
+# Time-bucketed complaint counters, kept in `complaint_stats`.
+#   _id: "<village>:day:2026-10-19" or "<village>:week:2026-W42"
+#   {village_name, granularity, period, period_start,
+#    raised, resolved, reopened, escalated, resolution_seconds,
+#    resolved_by_tier: {First Attempt, Second Attempt, Escalated}}
+# Every raise / resolve / reopen / escalation $incs its day and week bucket, so
+# a range query is one _id range scan over at most a few hundred small docs.
+# Time-based escalations happen without a request; a leader-only sweeper
+# (run_escalation_sweeper) records them.
+
+LOCAL_TZ = timezone(timedelta(minutes=settings.analytics_utc_offset_minutes))
+ESCALATION_SWEEP_SECONDS = settings.escalation_sweep_seconds
+SWEEP_BATCH_SIZE = 500
+
+GRANULARITIES = ("day", "week")
+COUNTERS = ("raised", "resolved", "reopened", "escalated", "resolution_seconds")
+TIERS = ("First Attempt", "Second Attempt", "Escalated")
+
+
+def resolution_tier(reopen_count: int) -> str:
+    """Same tiers as the complaint responses (process_complaint_status)."""
+    if reopen_count >= 2:
+        return "Escalated"
+    return "Second Attempt" if reopen_count == 1 else "First Attempt"
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def period_key(day: date, granularity: str) -> str:
+    if granularity == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.isoformat()
+
+
+def period_start(day: date, granularity: str) -> date:
+    return day - timedelta(days=day.weekday()) if granularity == "week" else day
+
+
+def bucket_id(village_name: str, granularity: str, period: str) -> str:
+    return f"{village_name}:{granularity}:{period}"
+
+
+def _buckets(village_name: str, at: datetime) -> list:
+    """(_id, fields set on insert) of the day and week buckets covering `at`."""
+    day = _aware(at).astimezone(LOCAL_TZ).date()
+    buckets = []
+    for granularity in GRANULARITIES:
+        period = period_key(day, granularity)
+        buckets.append((bucket_id(village_name, granularity, period), {
+            "village_name": village_name,
+            "granularity": granularity,
+            "period": period,
+            "period_start": datetime.combine(period_start(day, granularity), time(), LOCAL_TZ),
+        }))
+    return buckets
+
+
+def _bucket_op(_id: str, fields: dict, counters: dict, now: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"_id": _id},
+        {"$inc": counters, "$set": {"updated_at": now}, "$setOnInsert": fields},
+        upsert=True
+    )
+
+
+async def record(village_name: str, at: datetime, counters: dict, session=None):
+    await record_events([(village_name, at, counters)], session)
+
+
+async def record_events(events: list, session=None):
+    """(village_name, at, counters) events, merged per bucket into one bulk_write."""
+    increments, meta = {}, {}
+    for village_name, at, counters in events:
+        counters = {k: v for k, v in counters.items() if v}
+        if not village_name or not counters:
+            continue
+        for _id, fields in _buckets(village_name, at):
+            meta[_id] = fields
+            bucket = increments.setdefault(_id, {})
+            for field, value in counters.items():
+                bucket[field] = bucket.get(field, 0) + value
+    if increments:
+        now = datetime.now(timezone.utc)
+        ops = [_bucket_op(_id, meta[_id], counters, now) for _id, counters in increments.items()]
+        await db.complaint_stats.bulk_write(ops, ordered=False, session=session)
+
+
+# --- Events (called after the complaint write succeeds) ---
+
+def raised_event(complaint: dict) -> tuple:
+    return complaint["village_name"], complaint["created_at"], {"raised": 1}
+
+
+def resolved_event(before: dict, resolved_at: datetime) -> Optional[tuple]:
+    """`before` is the complaint as it was; re-resolving a Resolved one isn't counted."""
+    if before.get("status") == "Resolved":
+        return None
+    opened_at = before.get("created_at")
+    seconds = (resolved_at - _aware(opened_at)).total_seconds() if opened_at else 0
+    return before["village_name"], resolved_at, {
+        "resolved": 1,
+        "resolution_seconds": max(0.0, seconds),
+        f"resolved_by_tier.{resolution_tier(before.get('reopen_count', 0))}": 1,
+    }
+
+
+def reopened_event(complaint: dict, reopened_at: datetime, escalated: bool) -> tuple:
+    return complaint["village_name"], reopened_at, {"reopened": 1, "escalated": int(escalated)}
+
+
+async def record_raised(complaint: dict, session=None):
+    await record_events([raised_event(complaint)], session)
+
+
+async def record_resolved(before: dict, resolved_at: datetime, session=None):
+    event = resolved_event(before, resolved_at)
+    if event:
+        await record_events([event], session)
+
+
+async def record_reopened(complaint: dict, reopened_at: datetime, escalated: bool, session=None):
+    await record_events([reopened_event(complaint, reopened_at, escalated)], session)
+
+
+async def record_escalated(village_name: str, escalated_at: datetime, session=None):
+    await record(village_name, escalated_at, {"escalated": 1}, session)
+
+
+# --- Time-based Escalation Sweeper ---
+
+async def sweep_escalations() -> int:
+    """
+    Stamps `escalated_at` on Pending complaints that crossed the escalation
+    cutoff and counts each one once, in the bucket of the day it escalated.
+    """
+    query = {"status": "Pending", "created_at": {"$lte": escalation_cutoff()}, "escalated_at": {"$exists": False}}
+    swept = 0
+    while True:
+        batch = await db.complaints.find(query, {"village_name": 1, "created_at": 1}).limit(SWEEP_BATCH_SIZE).to_list(SWEEP_BATCH_SIZE)
+        if not batch:
+            return swept
+        for complaint in batch:
+            escalated_at = escalation_time(complaint["created_at"])
+            result = await db.complaints.update_one(
+                {"_id": complaint["_id"], **query}, {"$set": {"escalated_at": escalated_at}}
+            )
+            if result.modified_count:
+                await record_escalated(complaint["village_name"], escalated_at)
+                swept += 1
+
+
+async def run_escalation_sweeper():
+    """Leader-only background job (see services/leader.py run_as_leader)."""
+    while True:
+        try:
+            swept = await sweep_escalations()
+            if swept:
+                print(f"⏫ Recorded {swept} time-based complaint escalations.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Escalation sweep failed: {e}")
+        await asyncio.sleep(ESCALATION_SWEEP_SECONDS)
+
+
+# --- Reads ---
+
+def _periods(start: date, end: date, granularity: str) -> list:
+    periods = []
+    day = period_start(start, granularity)
+    step = timedelta(days=7 if granularity == "week" else 1)
+    while day <= end:
+        periods.append((period_key(day, granularity), day))
+        day += step
+    return periods
+
+
+def _with_rates(counts: dict) -> dict:
+    """Replaces resolution_seconds with the mean, and adds reopen / escalation rates."""
+    result = {c: v for c, v in counts.items() if c != "resolution_seconds"}
+    resolved, raised = counts["resolved"], counts["raised"]
+    result["mean_resolution_hours"] = round(counts["resolution_seconds"] / resolved / 3600, 2) if resolved else None
+    result["reopen_rate"] = round(counts["reopened"] / resolved, 4) if resolved else None
+    result["escalation_rate"] = round(counts["escalated"] / raised, 4) if raised else None
+    return result
+
+
+async def query_stats(village_name: str, start: date, end: date, granularity: str = "day") -> dict:
+    """Counters per period (zero-filled) plus totals for [start, end] in local dates."""
+    periods = _periods(start, end, granularity)
+    first, last = periods[0][0], periods[-1][0]
+    docs = await db.complaint_stats.find({"_id": {
+        "$gte": bucket_id(village_name, granularity, first),
+        "$lte": bucket_id(village_name, granularity, last),
+    }}).to_list(len(periods))
+    by_period = {d["period"]: d for d in docs}
+
+    buckets = []
+    totals = defaultdict(float)
+    total_tiers = defaultdict(int)
+    for period, day in periods:
+        doc = by_period.get(period, {})
+        counts = {c: doc.get(c, 0) for c in COUNTERS}
+        tiers = {t: doc.get("resolved_by_tier", {}).get(t, 0) for t in TIERS}
+        for c, v in counts.items():
+            totals[c] += v
+        for t, v in tiers.items():
+            total_tiers[t] += v
+        buckets.append({"period": period, "period_start": day, **_with_rates(counts), "resolved_by_tier": tiers})
+
+    totals = {c: (totals[c] if c == "resolution_seconds" else int(totals[c])) for c in COUNTERS}
+    return {
+        "village_name": village_name,
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "totals": {**_with_rates(totals), "resolved_by_tier": dict(total_tiers)},
+        "buckets": buckets,
+    }
+
+
+# --- Bootstrap ---
+
+async def ensure_indexes():
+    # Escalation sweeper scan
+    await db.complaints.create_index([("status", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)])
+
+
+async def rebuild_complaint_stats() -> int:
+    """
+    Recomputes every bucket from the complaints collection (bootstrap / repair).
+    Only the latest resolution and reopen of each complaint are on the document,
+    so history from before the counters existed is approximate.
+    """
+    increments = defaultdict(lambda: defaultdict(float))
+    meta = {}
+
+    def add(village_name, at, counters):
+        for key, fields in _buckets(village_name, at):
+            meta[key] = fields
+            for field, value in counters.items():
+                increments[key][field] += value
+
+    fields = {
+        "village_name": 1, "status": 1, "created_at": 1, "raised_at": 1, "resolved_at": 1,
+        "reopen_count": 1, "reopened_at": 1, "escalated_at": 1,
+    }
+    # Archived complaints (services/archive.py) still count towards their periods
+    async def all_complaints():
+        for collection in (db.complaints, db.complaints_archive):
+            async for c in collection.find({}, fields):
+                yield c
+
+    async for c in all_complaints():
+        village_name = c.get("village_name")
+        opened_at = c.get("created_at")
+        if not village_name or not opened_at:
+            continue
+        add(village_name, c.get("raised_at") or opened_at, {"raised": 1})
+        if c.get("status") == "Resolved" and c.get("resolved_at"):
+            seconds = (_aware(c["resolved_at"]) - _aware(opened_at)).total_seconds()
+            add(village_name, c["resolved_at"], {
+                "resolved": 1,
+                "resolution_seconds": max(0.0, seconds),
+                f"resolved_by_tier.{resolution_tier(c.get('reopen_count', 0))}": 1,
+            })
+        if c.get("reopen_count"):
+            add(village_name, c.get("reopened_at") or opened_at, {"reopened": c["reopen_count"]})
+        if c.get("escalated_at"):
+            add(village_name, c["escalated_at"], {"escalated": 1})
+
+    now = datetime.now(timezone.utc)
+    await db.complaint_stats.delete_many({})
+    docs = []
+    for key, fields in increments.items():
+        doc = {"_id": key, **meta[key], "updated_at": now}
+        for field, value in fields.items():
+            if "." in field:
+                parent, child = field.split(".", 1)
+                doc.setdefault(parent, {})[child] = int(value)
+            else:
+                doc[field] = value if field == "resolution_seconds" else int(value)
+        docs.append(doc)
+    if docs:
+        await db.complaint_stats.insert_many(docs)
+    return len(docs)
+
+
+async def ensure_complaint_stats():
+    """Builds the buckets on first start against an existing complaints collection."""
+    if await db.complaint_stats.estimated_document_count() == 0 and await db.complaints.estimated_document_count() > 0:
+        count = await rebuild_complaint_stats()
+        print(f"✅ Built {count} complaint analytics buckets.")
@@ -0,0 +1,159 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+import pymongo
+from bson import ObjectId
+
+from app.database import db
+
+# Cross-village view of escalated complaints for higher officials.
+# Complaints carry denormalised taluk / district / state (copied from the
+# villager on raise) and `escalated_at`, stamped on a second reopen and by the
+# escalation sweeper in services/complaint_stats.py. Escalation is terminal, so
+# the partial indexes below only ever hold escalated complaints and stay small.
+
+HIERARCHY = ("state", "district", "taluk", "village_name")
+LOCATION_FIELDS = ("taluk", "district", "state")
+ESCALATED = {"escalated_at": {"$exists": True}}
+BACKFILL_BATCH_SIZE = 500
+
+
+def location_of(villager: dict) -> dict:
+    return {field: villager.get(field) for field in LOCATION_FIELDS}
+
+
+# Scope prefixes that get an index; each ends in created_at for oldest-first pages
+SCOPE_INDEXES = (
+    ("state",),
+    ("state", "district"),
+    ("state", "district", "taluk"),
+    ("village_name",),
+)
+
+
+async def ensure_indexes():
+    for fields in SCOPE_INDEXES:
+        await db.complaints.create_index(
+            [(field, pymongo.ASCENDING) for field in fields]
+            + [("created_at", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+            partialFilterExpression=ESCALATED,
+            name="escalations_by_" + "_".join(fields),
+        )
+
+
+def scope_filter(state: Optional[str], district: Optional[str], taluk: Optional[str],
+                 village_name: Optional[str]) -> dict:
+    scope = {"state": state, "district": district, "taluk": taluk, "village_name": village_name}
+    return {field: value for field, value in scope.items() if value}
+
+
+def next_level(scope: dict) -> Optional[str]:
+    """The hierarchy field to group by below the most specific one given."""
+    if scope.get("village_name"):
+        return None
+    for field in HIERARCHY:
+        if not scope.get(field):
+            return field
+    return None
+
+
+# --- Keyset Cursor (created_at, _id) ---
+
+def encode_cursor(created_at: datetime, doc_id: ObjectId) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "id": str(doc_id)}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _naive_utc(datetime.fromisoformat(data["t"])), ObjectId(data["id"])
+    except Exception:
+        return None
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Mongo hands back naive UTC datetimes; compare like with like."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+# --- Queries ---
+
+async def list_escalations(scope: dict, projection: dict, limit: int, cursor: Optional[str] = None) -> tuple:
+    """Oldest escalations first. Returns (docs, next_cursor)."""
+    query = {**scope, **ESCALATED}
+    after = decode_cursor(cursor) if cursor else None
+    if after:
+        created_at, last_id = after
+        query["$or"] = [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": last_id}},
+        ]
+
+    docs = await db.complaints.find(query, projection).sort(
+        [("created_at", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]
+    ).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(_naive_utc(docs[-1]["created_at"]), docs[-1]["_id"])
+    return docs, next_cursor
+
+
+async def escalation_summary(scope: dict) -> dict:
+    """Escalation counts and the oldest one, grouped one level below `scope`."""
+    level = next_level(scope)
+    group_key = f"${level}" if level else None
+    rows = await db.complaints.aggregate([
+        {"$match": {**scope, **ESCALATED}},
+        {"$group": {"_id": group_key, "count": {"$sum": 1}, "oldest_created_at": {"$min": "$created_at"}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]).to_list(None)
+    return {
+        "scope": scope,
+        "level": level,
+        "total": sum(r["count"] for r in rows),
+        "groups": [
+            {"name": r["_id"], "count": r["count"], "oldest_created_at": r["oldest_created_at"]}
+            for r in rows
+        ] if level else [],
+    }
+
+
+# --- Backfill ---
+
+async def backfill_complaint_locations() -> int:
+    """
+    Copies taluk / district / state onto complaints raised before they were
+    denormalised, and stamps escalated_at on older "Migrated" complaints.
+    Returns how many complaints got a location.
+    """
+    missing = {"state": {"$exists": False}}
+    phones = await db.complaints.distinct("villager_phone", missing)
+    updated = 0
+    for start in range(0, len(phones), BACKFILL_BATCH_SIZE):
+        batch = phones[start:start + BACKFILL_BATCH_SIZE]
+        async for villager in db.villagers.find(
+            {"phone_number": {"$in": batch}}, {"phone_number": 1, **{f: 1 for f in LOCATION_FIELDS}}
+        ):
+            result = await db.complaints.update_many(
+                {"villager_phone": villager["phone_number"], **missing},
+                {"$set": {**location_of(villager), "updated_at": datetime.now(timezone.utc)}}
+            )
+            updated += result.modified_count
+        # Villager gone: store explicit nulls so the next start doesn't look again
+        await db.complaints.update_many(
+            {"villager_phone": {"$in": batch}, **missing},
+            {"$set": {**{f: None for f in LOCATION_FIELDS}, "updated_at": datetime.now(timezone.utc)}}
+        )
+
+    async for c in db.complaints.find(
+        {"status": "Migrated to Higher Officials", "escalated_at": {"$exists": False}},
+        {"reopened_at": 1, "resolved_at": 1, "created_at": 1}
+    ):
+        at = c.get("reopened_at") or c.get("resolved_at") or c.get("created_at")
+        await db.complaints.update_one({"_id": c["_id"]}, {"$set": {"escalated_at": at}})
+    return updated
@@ -0,0 +1,161 @@
+import asyncio
+import io
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from bson import ObjectId
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import db
+from app.services.attachments import StoredUpload
+from app.utils.s3 import put_object_if_absent
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# --- Rendition Settings ---
+# name -> (longest edge in px, JPEG quality)
+RENDITIONS = {
+    "thumbnail": (320, 60),
+    "web": (1280, 75),
+}
+RENDERABLE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+IMAGE_WORKERS = settings.image_workers
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the parent already runs Motor / threadpool threads and
+        # forking with live threads can deadlock the children
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown():
+    """Stops the worker pool (called from the app lifespan)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def render_renditions(data: bytes) -> dict:
+    """
+    CPU-bound part, runs inside the worker pool.
+    Returns {name: jpeg_bytes}. Images are EXIF-rotated and stripped of metadata.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        results = {}
+        for name, (edge, quality) in RENDITIONS.items():
+            copy = image.copy()
+            copy.thumbnail((edge, edge), Image.LANCZOS)
+            out = io.BytesIO()
+            copy.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+            results[name] = out.getvalue()
+        return results
+
+
+async def create_renditions(stored: StoredUpload) -> Optional[dict]:
+    """
+    Generates and stores the renditions for one uploaded image.
+    Renditions are keyed by the content hash, so a duplicate upload reuses them.
+    Returns {"thumbnail_url": ..., "web_url": ...} or None if the file isn't renderable.
+    """
+    if stored.content_type not in RENDERABLE_TYPES:
+        return None
+
+    attachment = await db.attachments.find_one({"_id": stored.digest}, {"renditions": 1})
+    if attachment and attachment.get("renditions"):
+        return attachment["renditions"]
+
+    if Image is None:
+        print("⚠️ Pillow not installed - skipping image renditions.")
+        return None
+
+    loop = asyncio.get_running_loop()
+    rendered = await loop.run_in_executor(_get_executor(), render_renditions, stored.data)
+
+    urls = {}
+    for name, body in rendered.items():
+        key = f"renditions/{stored.digest[:2]}/{stored.digest}-{name}.jpg"
+        urls[f"{name}_url"], _ = await run_in_threadpool(put_object_if_absent, io.BytesIO(body), key, "image/jpeg")
+
+    await db.attachments.update_one({"_id": stored.digest}, {"$set": {"renditions": urls}})
+    return urls
+
+
+# --- Post-Upload Pipeline (scheduled as FastAPI background tasks) ---
+
+async def process_project_image(project_id: ObjectId, stored: StoredUpload):
+    """Adds thumbnail/web URLs to the matching entry in project.images."""
+    try:
+        urls = await create_renditions(stored)
+        if urls:
+            await db.projects.update_one(
+                {"_id": project_id, "images.url": stored.url},
+                {"$set": {**{f"images.$.{k}": v for k, v in urls.items()}, "updated_at": datetime.now(timezone.utc)}}
+            )
+    except Exception as e:
+        print(f"❌ Image pipeline error (project {project_id}): {e}")
+
+
+async def process_complaint_image(complaint_id: ObjectId, field: str, stored: StoredUpload):
+    """
+    Records renditions for one complaint file next to the original URL list.
+    field: "attachments" or "resolution_attachments".
+    """
+    try:
+        urls = await create_renditions(stored)
+        if urls:
+            await db.complaints.update_one(
+                {"_id": complaint_id},
+                {"$push": {f"{field}_renditions": {"url": stored.url, **urls}},
+                 "$set": {"updated_at": datetime.now(timezone.utc)}}
+            )
+    except Exception as e:
+        print(f"❌ Image pipeline error (complaint {complaint_id}): {e}")
+
+
+async def process_shared_complaint_image(complaint_ids: List[ObjectId], field: str, stored: StoredUpload):
+    """One file attached to several complaints (batch resolve): render once, record on all."""
+    try:
+        urls = await create_renditions(stored)
+        if urls:
+            await db.complaints.update_many(
+                {"_id": {"$in": complaint_ids}},
+                {"$push": {f"{field}_renditions": {"url": stored.url, **urls}},
+                 "$set": {"updated_at": datetime.now(timezone.utc)}}
+            )
+    except Exception as e:
+        print(f"❌ Image pipeline error (complaints {', '.join(map(str, complaint_ids))}): {e}")
+
+
+async def process_discussion_image(discussion_id: ObjectId, stored: StoredUpload):
+    """Sets the feed thumbnail for a community post image."""
+    try:
+        urls = await create_renditions(stored)
+        if urls:
+            await db.discussions.update_one(
+                {"_id": discussion_id},
+                {"$set": {
+                    "image_thumbnail_url": urls["thumbnail_url"],
+                    "image_web_url": urls["web_url"],
+                    "updated_at": datetime.now(timezone.utc),
+                }}
+            )
+    except Exception as e:
+        print(f"❌ Image pipeline error (discussion {discussion_id}): {e}")
@@ -0,0 +1,258 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+import pymongo
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.config import settings
+from app.database import db
+from app.services.leader import INSTANCE_ID
+from app.utils.metrics import (
+    JOB_DURATION,
+    JOB_QUEUE_DEPTH,
+    JOB_QUEUE_LATENCY,
+    JOBS_ENQUEUED,
+    JOBS_PROCESSED,
+)
+
+# Durable queue for work that doesn't need to finish before the response.
+#   jobs:      {kind, payload, status: queued|running|done, attempts, max_attempts,
+#               run_at, idempotency_key, lease_until, worker, last_error, ...}
+#   jobs_dead: jobs that failed max_attempts times (kept for inspection)
+# Every app worker runs JOB_WORKERS consumers; claiming is one atomic
+# find_one_and_update, so a job runs on one consumer at a time. A consumer that
+# dies mid-job leaves a lease that expires, and the job is picked up again -
+# handlers must therefore be idempotent ($addToSet, conditional $set, ...).
+
+JOB_WORKERS = settings.job_workers
+JOB_POLL_SECONDS = settings.job_poll_seconds
+JOB_MAX_ATTEMPTS = settings.job_max_attempts
+JOB_BACKOFF_BASE_SECONDS = settings.job_backoff_base_seconds
+JOB_BACKOFF_MAX_SECONDS = settings.job_backoff_max_seconds
+JOB_LEASE_SECONDS = settings.job_lease_seconds
+JOB_RETENTION_SECONDS = settings.job_retention_seconds
+DEPTH_SAMPLE_SECONDS = 15
+
+Handler = Callable[[dict], Awaitable[None]]
+_handlers: dict = {}
+
+
+def handler(kind: str):
+    """Registers `async def fn(payload: dict)` as the handler for `kind`."""
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+async def ensure_indexes():
+    await db.jobs.create_index([("status", pymongo.ASCENDING), ("run_at", pymongo.ASCENDING)])
+    await db.jobs.create_index([("status", pymongo.ASCENDING), ("lease_until", pymongo.ASCENDING)])
+    await db.jobs.create_index(
+        "idempotency_key", unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}}
+    )
+    # Finished jobs are purged after the retention window (only they have finished_at)
+    await db.jobs.create_index("finished_at", expireAfterSeconds=JOB_RETENTION_SECONDS)
+
+
+async def enqueue(kind: str, payload: dict, idempotency_key: Optional[str] = None,
+                  delay_seconds: float = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> Optional[ObjectId]:
+    """
+    Queues a job and returns its id. With an idempotency_key, enqueueing the
+    same key again (e.g. a retried request) is a no-op that returns None.
+    """
+    if kind not in _handlers:
+        raise ValueError(f"No handler registered for job kind '{kind}'")
+
+    now = datetime.now(timezone.utc)
+    job = {
+        "kind": kind,
+        "payload": payload,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_at": now + timedelta(seconds=delay_seconds),
+        "created_at": now,
+    }
+    if idempotency_key:
+        job["idempotency_key"] = idempotency_key
+    try:
+        result = await db.jobs.insert_one(job)
+    except DuplicateKeyError:
+        return None
+    JOBS_ENQUEUED.labels(kind).inc()
+    return result.inserted_id
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff, capped, with jitter: half to all of base * 2^(attempts-1)."""
+    ceiling = min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+# --- Consumers ---
+
+async def claim() -> Optional[dict]:
+    """Takes the oldest due job, or one whose previous consumer's lease ran out."""
+    now = datetime.now(timezone.utc)
+    return await db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "run_at": {"$lte": now}},
+            {"status": "running", "lease_until": {"$lt": now}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "started_at": now,
+                "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "worker": INSTANCE_ID,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_at", pymongo.ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def run_job(job: dict):
+    kind = job["kind"]
+    started = time.perf_counter()
+    waited = (_aware(job["started_at"]) - _aware(job["run_at"])).total_seconds()
+    JOB_QUEUE_LATENCY.labels(kind).observe(max(0.0, waited))
+
+    try:
+        fn = _handlers.get(kind)
+        if fn is None:
+            raise LookupError(f"No handler registered for job kind '{kind}'")
+        await fn(job["payload"])
+    except asyncio.CancelledError:
+        # Shutdown: hand the job back untouched (minus this attempt)
+        await db.jobs.update_one(
+            {"_id": job["_id"], "worker": INSTANCE_ID},
+            {"$set": {"status": "queued"}, "$inc": {"attempts": -1}}
+        )
+        raise
+    except Exception as e:
+        await fail(job, e)
+        return
+    finally:
+        JOB_DURATION.labels(kind).observe(time.perf_counter() - started)
+
+    await db.jobs.update_one(
+        {"_id": job["_id"]},
+        {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)}, "$unset": {"lease_until": ""}}
+    )
+    JOBS_PROCESSED.labels(kind, "done").inc()
+
+
+async def fail(job: dict, error: Exception):
+    """Reschedules with backoff, or moves the job to jobs_dead after max_attempts."""
+    kind = job["kind"]
+    message = f"{error.__class__.__name__}: {error}"
+    if job["attempts"] >= job.get("max_attempts", JOB_MAX_ATTEMPTS):
+        dead = {**job, "status": "dead", "last_error": message, "failed_at": datetime.now(timezone.utc)}
+        dead.pop("lease_until", None)
+        await db.jobs_dead.replace_one({"_id": job["_id"]}, dead, upsert=True)
+        await db.jobs.delete_one({"_id": job["_id"]})
+        JOBS_PROCESSED.labels(kind, "dead").inc()
+        print(f"❌ Job {kind} {job['_id']} moved to dead letters after {job['attempts']} attempts: {message}")
+        return
+
+    delay = backoff_seconds(job["attempts"])
+    await db.jobs.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "status": "queued",
+                "run_at": datetime.now(timezone.utc) + timedelta(seconds=delay),
+                "last_error": message,
+            },
+            "$unset": {"lease_until": ""},
+        }
+    )
+    JOBS_PROCESSED.labels(kind, "retry").inc()
+    print(f"⚠️ Job {kind} {job['_id']} failed (attempt {job['attempts']}), retrying in {delay:.0f}s: {message}")
+
+
+async def run_pending(limit: Optional[int] = None) -> int:
+    """Drains due jobs on the calling task. Returns how many ran (used by tests and scripts)."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = await claim()
+        if job is None:
+            break
+        await run_job(job)
+        ran += 1
+    return ran
+
+
+async def sample_depth():
+    now = datetime.now(timezone.utc)
+    JOB_QUEUE_DEPTH.labels("queued").set(await db.jobs.count_documents({"status": "queued", "run_at": {"$lte": now}}))
+    JOB_QUEUE_DEPTH.labels("scheduled").set(await db.jobs.count_documents({"status": "queued", "run_at": {"$gt": now}}))
+    JOB_QUEUE_DEPTH.labels("running").set(await db.jobs.count_documents({"status": "running"}))
+    JOB_QUEUE_DEPTH.labels("dead").set(await db.jobs_dead.estimated_document_count())
+
+
+async def _consume(worker_id: int):
+    while True:
+        try:
+            job = await claim()
+        except PyMongoError as e:
+            print(f"⚠️ Job consumer {worker_id} could not claim: {e}")
+            job = None
+        if job is None:
+            await asyncio.sleep(JOB_POLL_SECONDS)
+            continue
+        try:
+            await run_job(job)
+        except PyMongoError as e:
+            # Bookkeeping failed; the lease expires and the job is retried
+            print(f"⚠️ Job consumer {worker_id} lost track of job {job['_id']}: {e}")
+
+
+async def _sample_depth_forever():
+    while True:
+        try:
+            await sample_depth()
+        except PyMongoError as e:
+            print(f"⚠️ Job queue depth sample failed: {e}")
+        await asyncio.sleep(DEPTH_SAMPLE_SECONDS)
+
+
+async def run_workers():
+    """Background task started from the app lifespan (in every app worker)."""
+    tasks = [asyncio.create_task(_consume(i)) for i in range(JOB_WORKERS)]
+    tasks.append(asyncio.create_task(_sample_depth_forever()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# --- Inspection ---
+
+async def queue_summary(dead_limit: int = 20) -> dict:
+    counts = await db.jobs.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(None)
+    dead = await db.jobs_dead.find(
+        {}, {"kind": 1, "attempts": 1, "last_error": 1, "failed_at": 1, "idempotency_key": 1}
+    ).sort("failed_at", -1).limit(dead_limit).to_list(dead_limit)
+    for d in dead:
+        d["id"] = str(d.pop("_id"))
+    return {
+        "by_status": {c["_id"]: c["count"] for c in counts},
+        "dead_letters": await db.jobs_dead.count_documents({}),
+        "recent_dead": dead,
+    }
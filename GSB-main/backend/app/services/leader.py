@@ -0,0 +1,107 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.config import settings
+from app.database import db
+
+# Leader election over a Mongo document per job, so that with N app workers
+# (see serve.py) one-off startup work and singleton background jobs run once.
+#   leader_locks: {_id: <job name>, owner: <instance id>, expires_at}
+# The owner renews the lease every ttl/3; if it dies the lease expires and
+# another worker takes over.
+
+LEADER_LOCK_TTL_SECONDS = settings.leader_lock_ttl_seconds
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLock:
+    def __init__(self, name: str, ttl_seconds: int = LEADER_LOCK_TTL_SECONDS):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+
+    async def acquire(self) -> bool:
+        """Takes or renews the lease. False if another live instance holds it."""
+        now = datetime.now(timezone.utc)
+        try:
+            await db.leader_locks.update_one(
+                {"_id": self.name, "$or": [{"owner": INSTANCE_ID}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": INSTANCE_ID, "expires_at": now + timedelta(seconds=self.ttl_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # The document exists and belongs to someone else (upsert lost the race)
+            return False
+
+    async def release(self):
+        try:
+            await db.leader_locks.delete_one({"_id": self.name, "owner": INSTANCE_ID})
+        except PyMongoError as e:
+            print(f"⚠️ Could not release leader lock '{self.name}': {e}")
+
+
+async def _hold(lock: LeaderLock, task: asyncio.Task):
+    """Renews the lease while `task` runs; cancels it if leadership is lost."""
+    while not task.done():
+        await asyncio.wait({task}, timeout=lock.ttl_seconds / 3)
+        if task.done():
+            break
+        try:
+            still_leader = await lock.acquire()
+        except PyMongoError as e:
+            print(f"⚠️ Leader lease renewal failed for '{lock.name}': {e}")
+            still_leader = False
+        if not still_leader:
+            print(f"⚠️ Lost leadership of '{lock.name}', stopping it on this worker.")
+            task.cancel()
+    return task.result()
+
+
+async def run_once(name: str, job) -> bool:
+    """
+    Startup work (index creation, rollup backfill): the worker that wins the
+    lock runs `job()`, the others skip it. Returns True if this worker ran it.
+    """
+    lock = LeaderLock(name)
+    if not await lock.acquire():
+        print(f"ℹ️ '{name}' is running on another worker, skipping.")
+        return False
+    try:
+        await _hold(lock, asyncio.create_task(job()))
+    finally:
+        await lock.release()
+    return True
+
+
+async def run_as_leader(name: str, job):
+    """
+    Long-running background job (lifespan task) that must run on one worker only.
+    Non-leaders keep polling and take over when the leader's lease expires.
+    """
+    lock = LeaderLock(name)
+    while True:
+        try:
+            leader = await lock.acquire()
+        except PyMongoError as e:
+            print(f"⚠️ Leader election failed for '{name}': {e}")
+            leader = False
+
+        if leader:
+            task = asyncio.create_task(job())
+            try:
+                await _hold(lock, task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise  # we were cancelled (shutdown), not the job
+            except Exception as e:
+                print(f"❌ Leader job '{name}' failed: {e}")
+            finally:
+                task.cancel()
+                await lock.release()
+
+        await asyncio.sleep(lock.ttl_seconds / 3)
@@ -1,15 +1,33 @@
 import httpx
-import os
-from dotenv import load_dotenv
+import time
+from typing import Optional
+from app.config import settings
+from app.utils.metrics import LLM_REQUEST_DURATION, LLM_TOKENS
 
-load_dotenv()
+OPENROUTER_API_KEY = settings.openrouter_api_key
+LLM_MODEL = settings.llm_model
+LLM_TIMEOUT_SECONDS = settings.llm_timeout_seconds
 
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+# One pooled client, created on the first LLM call and closed from the app
+# lifespan. Reuses TLS connections to OpenRouter between requests.
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=LLM_TIMEOUT_SECONDS)
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 async def ask_openrouter(context_text: str, user_query: str):
     """
     Sends community discussions + User Query to OpenRouter.
-    Model: xiaomi/mimo-v2-flash:free
+    Model: LLM_MODEL (settings.llm_model)
     """
     if not OPENROUTER_API_KEY:
         return "Error: OPENROUTER_API_KEY is missing in .env"
@@ -28,29 +46,37 @@ async def ask_openrouter(context_text: str, user_query: str):
     If the answer is not in the discussions, state that clearly.
     """
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "xiaomi/mimo-v2-flash:free",
-                    "messages": [{"role": "user", "content": prompt}]
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data['choices'][0]['message']['content']
-            else:
-                return f"Error from OpenRouter: {response.status_code} - {response.text}"
-                
-        except Exception as e:
-            return f"LLM Connection Failed: {str(e)}"
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await get_client().post(
+            "https://openrouter.ai/api/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": LLM_MODEL,
+                "messages": [{"role": "user", "content": prompt}]
+            },
+            timeout=LLM_TIMEOUT_SECONDS
+        )
+
+        if response.status_code == 200:
+            outcome = "ok"
+            data = response.json()
+            usage = data.get("usage") or {}
+            LLM_TOKENS.labels(LLM_MODEL, "prompt").inc(usage.get("prompt_tokens", 0))
+            LLM_TOKENS.labels(LLM_MODEL, "completion").inc(usage.get("completion_tokens", 0))
+            return data['choices'][0]['message']['content']
+        else:
+            outcome = f"http_{response.status_code}"
+            return f"Error from OpenRouter: {response.status_code} - {response.text}"
+
+    except Exception as e:
+        return f"LLM Connection Failed: {str(e)}"
+    finally:
+        LLM_REQUEST_DURATION.labels(LLM_MODEL, outcome).observe(time.perf_counter() - start)
 
 # Keep the old analysis function if you need it, or it can be removed.
 # I will leave a simplified version just in case other parts call it.
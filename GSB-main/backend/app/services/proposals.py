@@ -0,0 +1,221 @@
+import base64
+import json
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pymongo
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app import database
+from app.database import db
+from app.services import jobs
+from app.services.rollups import apply_project_change
+
+# Proposed projects are deduplicated per village on a normalised title:
+#   "Repair of Village Pond - Rampur" and "village pond repair" -> "pond repair village"
+# A unique partial index on (village_id, title_key) over Pending proposals makes
+# a repeat proposal bump `proposal_count` on the existing one instead of adding
+# a row. Villagers vote through `proposal_votes` (_id "<proposal_id>:<voter_id>",
+# so one vote each), and `support` = vote_count + proposal_count is the ranking key.
+
+IST = timezone(timedelta(hours=5, minutes=30))
+STOPWORDS = {"a", "an", "and", "at", "by", "for", "in", "near", "of", "on", "the", "to", "with"}
+DEDUPE_INDEX = "proposal_dedupe"
+# The queued create-project job is due this long after it's enqueued, by which
+# time the approval write that follows the enqueue has landed
+APPROVAL_JOB_DELAY_SECONDS = 5
+
+
+def normalise_title(title: str, village_id: Optional[str] = None) -> str:
+    text = unicodedata.normalize("NFKC", title).casefold()
+    if village_id:
+        # Seed data suffixes titles with " - <village>"
+        text = re.sub(rf"\s*[-–:]\s*{re.escape(village_id.casefold())}\s*$", "", text)
+    words = re.findall(r"\w+", text)
+    return " ".join(sorted({w for w in words if w not in STOPWORDS}) or words)
+
+
+def vote_id(proposal_id: ObjectId, voter_id: str) -> str:
+    return f"{proposal_id}:{voter_id}"
+
+
+# --- Keyset Cursor (support desc, _id desc) ---
+
+def encode_cursor(support: int, doc_id: ObjectId) -> str:
+    raw = json.dumps({"s": support, "id": str(doc_id)}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(data["s"]), ObjectId(data["id"])
+    except Exception:
+        return None
+
+
+async def list_ranked(query: dict, limit: int, cursor: Optional[str] = None) -> tuple:
+    """Most supported first. Returns (docs, next_cursor)."""
+    after = decode_cursor(cursor) if cursor else None
+    if after:
+        support, last_id = after
+        query = {**query, "$or": [
+            {"support": {"$lt": support}},
+            {"support": support, "_id": {"$lt": last_id}},
+        ]}
+
+    docs = await db.proposed_projects.find(query).sort(
+        [("support", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+    ).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].get("support", 1), docs[-1]["_id"])
+    return docs, next_cursor
+
+
+# --- Approval -> Project ---
+# Approving creates the project skeleton (officials fill in budget, contractor,
+# dates and route later through PATCH /projects/{id}/details), links both ids and
+# updates the village rollup. On a replica set that's one transaction. On a standalone server the
+# create-project job is queued *before* the guarded status flip, so there's no
+# moment where an approved proposal has no pending project creation.
+
+def project_skeleton(proposal: dict, project_id: ObjectId, approved_by: str) -> dict:
+    return {
+        "_id": project_id,
+        "project_name": proposal["proposed_project_title"],
+        "description": "",
+        "category": "General",
+        "village_name": proposal["village_id"],
+        "location": "",
+        "allocated_budget": 0.0,
+        "approved_by": approved_by,
+        "status": "Proposed",
+        "milestones": [],
+        "images": [],
+        "proposal_id": proposal["_id"],
+        "created_at": datetime.now(IST),
+    }
+
+
+async def approve_into_project(proposal_id: ObjectId, official: dict) -> Optional[ObjectId]:
+    """Returns the new project's id, or None if the proposal wasn't Pending."""
+    project_id = ObjectId()
+    approved_by = official.get("name") or str(official["_id"])
+    approval = {"$set": {
+        "status": "Approved",
+        "reviewed_by": str(official["_id"]),
+        "reviewed_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "project_id": project_id,
+    }}
+
+    async def in_transaction(session):
+        proposal = await db.proposed_projects.find_one_and_update(
+            {"_id": proposal_id, "status": "Pending"}, approval,
+            return_document=ReturnDocument.AFTER, session=session
+        )
+        if not proposal:
+            return None
+        project = project_skeleton(proposal, project_id, approved_by)
+        await db.projects.insert_one(project, session=session)
+        await apply_project_change(None, project, session=session)
+        return project_id
+
+    async def queued():
+        await jobs.enqueue(
+            "proposal.create_project",
+            {"proposal_id": proposal_id, "project_id": project_id, "approved_by": approved_by},
+            idempotency_key=f"proposal.create_project:{project_id}",
+            delay_seconds=APPROVAL_JOB_DELAY_SECONDS
+        )
+        proposal = await db.proposed_projects.find_one_and_update(
+            {"_id": proposal_id, "status": "Pending"}, approval, projection={"_id": 1}
+        )
+        # Lost the race: the job finds a different (or no) project_id and does nothing
+        return project_id if proposal else None
+
+    return await database.run_in_transaction(in_transaction, queued)
+
+
+@jobs.handler("proposal.create_project")
+async def create_project_for_proposal(payload: dict):
+    """Queued half of approve_into_project (standalone servers). Idempotent."""
+    proposal = await db.proposed_projects.find_one({"_id": payload["proposal_id"]})
+    if proposal and proposal.get("status") == "Pending":
+        # Enqueued just before the approval write; try again once it has landed
+        raise RuntimeError("Approval not committed yet")
+    if not proposal or proposal.get("project_id") != payload["project_id"]:
+        return
+
+    project = project_skeleton(proposal, payload["project_id"], payload["approved_by"])
+    result = await db.projects.update_one({"_id": project["_id"]}, {"$setOnInsert": project}, upsert=True)
+    if result.upserted_id is not None:
+        await apply_project_change(None, project)
+
+
+# --- Bootstrap ---
+
+async def merge_duplicate_proposals() -> int:
+    """
+    Gives older proposals a title_key and counters, then folds Pending
+    duplicates into the oldest one (the rest become status "Merged").
+    Must run before the unique index is built. Returns how many were merged.
+    """
+    async for p in db.proposed_projects.find(
+        {"title_key": {"$exists": False}}, {"proposed_project_title": 1, "village_id": 1}
+    ):
+        await db.proposed_projects.update_one({"_id": p["_id"]}, {"$set": {
+            "title_key": normalise_title(p.get("proposed_project_title", ""), p.get("village_id")),
+            "vote_count": 0,
+            "proposal_count": 1,
+            "support": 1,
+            "updated_at": datetime.utcnow(),
+        }})
+
+    groups = await db.proposed_projects.aggregate([
+        {"$match": {"status": "Pending"}},
+        {"$group": {
+            "_id": {"village_id": "$village_id", "title_key": "$title_key"},
+            "ids": {"$push": "$_id"},
+            "votes": {"$sum": "$vote_count"},
+            "proposals": {"$sum": "$proposal_count"},
+        }},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ]).to_list(None)
+
+    merged = 0
+    for group in groups:
+        keep, *rest = sorted(group["ids"])
+        # Votes only exist alongside the unique index, so duplicates carry none to move
+        await db.proposed_projects.update_many(
+            {"_id": {"$in": rest}}, {"$set": {"status": "Merged", "merged_into": keep, "updated_at": datetime.utcnow()}}
+        )
+        await db.proposed_projects.update_one({"_id": keep}, {"$set": {
+            "vote_count": group["votes"],
+            "proposal_count": group["proposals"],
+            "support": group["votes"] + group["proposals"],
+            "updated_at": datetime.utcnow(),
+        }})
+        merged += len(rest)
+    return merged
+
+
+async def ensure_indexes():
+    if DEDUPE_INDEX not in await db.proposed_projects.index_information():
+        merged = await merge_duplicate_proposals()
+        if merged:
+            print(f"✅ Merged {merged} duplicate project proposals.")
+    await db.proposed_projects.create_index(
+        [("village_id", pymongo.ASCENDING), ("title_key", pymongo.ASCENDING)],
+        unique=True, partialFilterExpression={"status": "Pending"}, name=DEDUPE_INDEX
+    )
+    # Ranked, keyset-paginated list per village
+    await db.proposed_projects.create_index(
+        [("village_id", pymongo.ASCENDING), ("support", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+    )
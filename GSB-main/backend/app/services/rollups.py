@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app.database import db
+
+# Per-village and per-contractor project summaries, kept in `project_rollups`.
+# Every project write applies (contribution after) - (contribution before) as one
+# $inc per rollup document, so reads are a single point lookup by _id.
+
+SPENT_STATUSES = ("In Progress", "Completed")
+MILESTONE_DONE_STATUSES = ("Completed", "Done")
+
+
+def rollup_id(scope: str, key: str) -> str:
+    return f"{scope}:{key}"
+
+
+def _field_key(value) -> str:
+    """Makes a status/category usable as a sub-field name ('.' and leading '$' are reserved)."""
+    return str(value or "Unknown").replace(".", "_").lstrip("$") or "Unknown"
+
+
+def _contribution(project: dict) -> dict:
+    """What one project adds to each of its rollups."""
+    budget = float(project.get("allocated_budget") or 0)
+    project_status = project.get("status", "Pending")
+    milestones = project.get("milestones") or []
+
+    return {
+        "project_count": 1,
+        "budget_committed": budget,
+        "budget_spent": budget if project_status in SPENT_STATUSES else 0,
+        f"budget_by_status.{_field_key(project_status)}": budget,
+        f"count_by_status.{_field_key(project_status)}": 1,
+        f"budget_by_category.{_field_key(project.get('category'))}": budget,
+        "milestones_total": len(milestones),
+        "milestones_completed": sum(1 for m in milestones if m.get("status") in MILESTONE_DONE_STATUSES),
+    }
+
+
+def _rollup_keys(project: dict) -> list:
+    keys = []
+    if project.get("village_name"):
+        keys.append(("village", project["village_name"]))
+    if project.get("contractor_id"):
+        keys.append(("contractor", project["contractor_id"]))
+    return keys
+
+
+async def apply_project_change(before: Optional[dict], after: Optional[dict], session=None):
+    """
+    Incrementally updates rollups for one project write.
+    before=None -> project created, after=None -> project removed.
+    """
+    increments = defaultdict(lambda: defaultdict(int))
+    for project, sign in ((before, -1), (after, 1)):
+        if not project:
+            continue
+        contribution = _contribution(project)
+        for scope, key in _rollup_keys(project):
+            for field, value in contribution.items():
+                increments[(scope, key)][field] += sign * value
+
+    now = datetime.now(timezone.utc)
+    ops = []
+    for (scope, key), fields in increments.items():
+        inc = {f: v for f, v in fields.items() if v}
+        if not inc:
+            continue
+        ops.append(UpdateOne(
+            {"_id": rollup_id(scope, key)},
+            {"$inc": inc, "$set": {"scope": scope, "key": key, "updated_at": now}},
+            upsert=True
+        ))
+
+    if ops:
+        await db.project_rollups.bulk_write(ops, ordered=False, session=session)
+
+
+def empty_rollup(scope: str, key: str) -> dict:
+    return {
+        "scope": scope,
+        "key": key,
+        "project_count": 0,
+        "budget_committed": 0.0,
+        "budget_spent": 0.0,
+        "budget_by_status": {},
+        "count_by_status": {},
+        "budget_by_category": {},
+        "milestones_total": 0,
+        "milestones_completed": 0,
+    }
+
+
+async def get_rollup(scope: str, key: str) -> dict:
+    """Single point read. Milestone completion % is derived on the way out."""
+    doc = await db.project_rollups.find_one({"_id": rollup_id(scope, key)})
+    rollup = {**empty_rollup(scope, key), **(doc or {})}
+    rollup.pop("_id", None)
+
+    total = rollup["milestones_total"]
+    rollup["milestone_completion_pct"] = round(100 * rollup["milestones_completed"] / total, 1) if total else 0.0
+    return rollup
+
+
+async def rebuild_rollups():
+    """
+    Recomputes every rollup from the projects collection (bootstrap / repair).
+    Each rollup is replaced in place by _id, so readers and concurrent
+    apply_project_change writes never see an empty collection; only rollups
+    left with no projects are deleted afterwards.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    async for project in db.projects.find(
+        {}, {"village_name": 1, "contractor_id": 1, "allocated_budget": 1, "status": 1, "category": 1, "milestones": 1}
+    ):
+        contribution = _contribution(project)
+        for scope, key in _rollup_keys(project):
+            for field, value in contribution.items():
+                totals[(scope, key)][field] += value
+
+    now = datetime.now(timezone.utc)
+    ops, ids = [], []
+    for (scope, key), fields in totals.items():
+        doc = {**empty_rollup(scope, key), "updated_at": now}
+        for field, value in fields.items():
+            # Expand "budget_by_status.X" paths into nested dicts
+            if "." in field:
+                parent, child = field.split(".", 1)
+                doc[parent][child] = value
+            else:
+                doc[field] = value
+        ids.append(rollup_id(scope, key))
+        ops.append(ReplaceOne({"_id": ids[-1]}, doc, upsert=True))
+    if ops:
+        await db.project_rollups.bulk_write(ops, ordered=False)
+    await db.project_rollups.delete_many({"_id": {"$nin": ids}})
+    return len(ops)
+
+
+async def ensure_rollups():
+    """Builds the rollups on first start against an existing projects collection."""
+    if await db.project_rollups.estimated_document_count() == 0 and await db.projects.estimated_document_count() > 0:
+        count = await rebuild_rollups()
+        print(f"✅ Built {count} project rollups.")
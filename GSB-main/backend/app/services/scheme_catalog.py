@@ -0,0 +1,173 @@
+import asyncio
+import bisect
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from app.config import settings
+from app.database import db
+from app.schemas import SchemeResponse
+from app.utils.responses import dumps, response_fields, trim
+
+# Government schemes change a few times a year, so the whole catalog is served
+# from an immutable in-memory snapshot. A refresh builds a new snapshot and swaps
+# the reference; readers never see a half-built catalog.
+
+SCHEME_POLL_SECONDS = settings.scheme_poll_seconds
+SCHEME_FIELDS = response_fields(SchemeResponse)
+
+# Search weights per field
+FIELD_WEIGHTS = {"scheme_name": 3, "scheme_dept": 2, "scheme_desc": 1}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: str
+    loaded_at: datetime
+    schemes: tuple                   # response-shaped dicts (read-only views)
+    by_id: Mapping[str, int]         # scheme_id -> position in `schemes`
+    index: Mapping[str, tuple]       # token -> ((position, weight), ...)
+    vocabulary: tuple                # sorted tokens, for prefix lookups
+    body: bytes                      # pre-serialized GET /schemes payload
+    item_bodies: tuple               # pre-serialized GET /schemes/{id} payloads
+    item_etags: tuple                # weak ETags for `item_bodies`
+
+    @property
+    def etag(self) -> str:
+        # Weak: the same body goes out gzip-, brotli- or un-encoded (utils/compression.py)
+        return f'W/"{self.version}"'
+
+    def get(self, scheme_id: str) -> Optional[int]:
+        return self.by_id.get(scheme_id)
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        AND search over name/department/description.
+        The last query token is treated as a prefix (search-as-you-type).
+        Returns positions ranked by summed field weight.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores = None
+        for i, token in enumerate(tokens):
+            if i == len(tokens) - 1:
+                start = bisect.bisect_left(self.vocabulary, token)
+                matches = []
+                for word in self.vocabulary[start:]:
+                    if not word.startswith(token):
+                        break
+                    matches.append(word)
+            else:
+                matches = [token] if token in self.index else []
+
+            token_scores = defaultdict(int)
+            for word in matches:
+                for position, weight in self.index[word]:
+                    token_scores[position] += weight
+
+            if scores is None:
+                scores = dict(token_scores)
+            else:
+                scores = {p: s + token_scores[p] for p, s in scores.items() if p in token_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [position for position, _ in ranked[:limit]]
+
+
+def build_snapshot(docs: list) -> CatalogSnapshot:
+    docs = sorted(docs, key=lambda d: d.get("scheme_id", ""))
+    schemes = []
+    by_id = {}
+    postings = defaultdict(lambda: defaultdict(int))
+
+    for position, doc in enumerate(docs):
+        doc["id"] = str(doc["_id"])
+        shaped = trim(doc, SCHEME_FIELDS)
+        schemes.append(MappingProxyType(shaped))
+        by_id[shaped["scheme_id"]] = position
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in set(tokenize(shaped.get(field))):
+                postings[token][position] += weight
+
+    plain = [dict(s) for s in schemes]
+    body = dumps(plain)
+    item_bodies = tuple(dumps(s) for s in plain)
+    return CatalogSnapshot(
+        version=hashlib.sha256(body).hexdigest()[:32],
+        loaded_at=datetime.now(timezone.utc),
+        schemes=tuple(schemes),
+        by_id=MappingProxyType(by_id),
+        index=MappingProxyType({t: tuple(p.items()) for t, p in postings.items()}),
+        vocabulary=tuple(sorted(postings)),
+        body=body,
+        item_bodies=item_bodies,
+        item_etags=tuple(f'W/"{hashlib.sha256(b).hexdigest()[:32]}"' for b in item_bodies),
+    )
+
+
+# --- Snapshot Lifecycle ---
+
+_snapshot: Optional[CatalogSnapshot] = None
+
+
+async def refresh() -> bool:
+    """Reloads the catalog from Mongo. Returns True if the version changed."""
+    global _snapshot
+    # From the primary: a refresh triggered by a change event must see that
+    # change, and a lagging secondary would pin the old catalog until the next one
+    docs = await db.schemes.find().to_list(None)
+    snapshot = build_snapshot(docs)
+    if _snapshot and _snapshot.version == snapshot.version:
+        return False
+    _snapshot = snapshot
+    print(f"📚 Scheme catalog loaded: {len(snapshot.schemes)} schemes (version {snapshot.version[:8]})")
+    return True
+
+
+async def get_snapshot() -> CatalogSnapshot:
+    if _snapshot is None:
+        await refresh()
+    return _snapshot
+
+
+async def _watch_changes():
+    """Refreshes on every change-stream event (replica sets / Atlas only)."""
+    async with db.schemes.watch() as stream:
+        async for _ in stream:
+            await refresh()
+
+
+async def run_refresher():
+    """
+    Background task started from the app lifespan.
+    Prefers a change stream; standalone servers fall back to polling.
+    """
+    try:
+        await _watch_changes()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"ℹ️ Scheme change stream unavailable ({e.__class__.__name__}), polling every {SCHEME_POLL_SECONDS}s.")
+
+    while True:
+        await asyncio.sleep(SCHEME_POLL_SECONDS)
+        try:
+            await refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep serving the previous snapshot; a bad document must not end the task
+            print(f"⚠️ Scheme catalog refresh failed: {e}")
@@ -0,0 +1,186 @@
+import base64
+import json
+import time
+from collections import deque
+from typing import Optional
+
+from bson import ObjectId
+
+from app.database import db
+from app.utils.escalation import escalation_cutoff
+from app.utils.metrics import SEARCH_QUERY_DURATION
+
+# Village-scoped full-text search on Mongo text indexes.
+# Both text indexes are compound with a `village_name` prefix, so every query
+# must (and does) pin the village with an equality match.
+
+COMPLAINT_TEXT_INDEX = [
+    ("village_name", 1),
+    ("complaint_name", "text"),
+    ("complaint_desc", "text"),
+    ("location", "text"),
+]
+COMPLAINT_TEXT_WEIGHTS = {"complaint_name": 5, "location": 2, "complaint_desc": 1}
+
+DISCUSSION_TEXT_INDEX = [
+    ("village_name", 1),
+    ("content", "text"),
+    ("category", "text"),
+]
+DISCUSSION_TEXT_WEIGHTS = {"category": 3, "content": 1}
+
+
+async def create_search_indexes():
+    await db.complaints.create_index(
+        COMPLAINT_TEXT_INDEX, weights=COMPLAINT_TEXT_WEIGHTS, name="complaints_text_search"
+    )
+    await db.discussions.create_index(
+        DISCUSSION_TEXT_INDEX, weights=DISCUSSION_TEXT_WEIGHTS, name="discussions_text_search"
+    )
+
+
+# --- Keyset Cursor (score, _id) ---
+
+def encode_cursor(score: float, doc_id: ObjectId) -> str:
+    raw = json.dumps({"s": score, "id": str(doc_id)}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(data["s"]), ObjectId(data["id"])
+    except Exception:
+        return None
+
+
+# --- Filters ---
+
+def time_escalated_filter() -> dict:
+    """Pending complaints that process_complaint_status reports as migrated."""
+    return {"status": "Pending", "created_at": {"$lte": escalation_cutoff()}}
+
+
+def escalated_filter() -> dict:
+    """Matches what process_complaint_status reports as the "Escalated" tier."""
+    return {"$or": [
+        {"status": "Migrated to Higher Officials"},
+        {"reopen_count": {"$gte": 2}},
+        time_escalated_filter(),
+    ]}
+
+
+def complaint_filters(status: Optional[str], tier: Optional[str]) -> list:
+    """Filters on the status/tier as shown in responses, not as stored."""
+    clauses = []
+    if status == "Migrated to Higher Officials":
+        clauses.append({"$or": [{"status": status}, time_escalated_filter()]})
+    elif status == "Pending":
+        # Old Pending complaints are displayed as migrated
+        clauses.append({"status": "Pending", "created_at": {"$not": {"$lte": escalation_cutoff()}}})
+    elif status:
+        clauses.append({"status": status})
+
+    if tier == "Escalated":
+        clauses.append(escalated_filter())
+    elif tier == "Second Attempt":
+        clauses.append({"reopen_count": 1, "$nor": [escalated_filter()]})
+    elif tier == "First Attempt":
+        clauses.append({"$nor": [escalated_filter(), {"reopen_count": {"$gte": 1}}]})
+    return clauses
+
+
+# --- Query ---
+
+async def text_search(
+    collection,
+    village_name: str,
+    q: str,
+    filters: list,
+    projection: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> tuple:
+    """
+    Runs a ranked text search. Returns (docs, next_cursor).
+    Docs carry a 'score' field; pages are ordered by (score desc, _id desc).
+    """
+    match = {"village_name": village_name, "$text": {"$search": q}}
+    if filters:
+        match["$and"] = filters
+
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+
+    after = decode_cursor(cursor) if cursor else None
+    if after:
+        score, last_id = after
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": score}},
+            {"score": score, "_id": {"$lt": last_id}},
+        ]}})
+
+    pipeline += [
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {**projection, "score": 1}},
+    ]
+
+    docs = await collection.aggregate(pipeline).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["score"], docs[-1]["_id"])
+    return docs, next_cursor
+
+
+# --- Query Latency Percentiles ---
+
+class LatencyRecorder:
+    """Keeps the last N query durations per search kind for p50/p95/p99 reporting."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.samples = {}
+
+    def record(self, kind: str, seconds: float):
+        self.samples.setdefault(kind, deque(maxlen=self.window)).append(seconds)
+        SEARCH_QUERY_DURATION.labels(kind).observe(seconds)
+
+    def timer(self, kind: str):
+        return _Timer(self, kind)
+
+    def summary(self) -> dict:
+        report = {}
+        for kind, samples in self.samples.items():
+            ordered = sorted(samples)
+            report[kind] = {
+                "count": len(ordered),
+                **{f"p{p}_ms": round(_percentile(ordered, p) * 1000, 2) for p in (50, 95, 99)},
+            }
+        return report
+
+
+class _Timer:
+    def __init__(self, recorder: LatencyRecorder, kind: str):
+        self.recorder = recorder
+        self.kind = kind
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.kind, time.perf_counter() - self.start)
+
+
+def _percentile(ordered: list, pct: int) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+search_latency = LatencyRecorder()
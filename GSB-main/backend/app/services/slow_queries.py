@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.database import client, db
+from app.utils.query_profiler import slow_query_recorder
+
+# Background side of the slow-query recorder: runs queued explain() samples and
+# flushes per-shape totals to `slow_query_shapes` so every worker contributes to
+# one report (GET /api/admin/admin/slow-queries or `python slow_query_report.py`).
+
+PROFILER_FLUSH_SECONDS = settings.profiler_flush_seconds
+EXPLAINS_PER_TICK = 5
+
+# Fields of the original command that explain() needs, per command
+EXPLAIN_FIELDS = {
+    "find": ("filter", "sort", "projection", "limit", "skip", "hint"),
+    "aggregate": ("pipeline", "hint"),
+    "count": ("query", "limit", "skip", "hint"),
+    "distinct": ("key", "query"),
+}
+
+
+def _plan_stages(plan: dict) -> list:
+    """Flattens a winning plan tree into its stage names."""
+    stages = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        for child_key in ("inputStage", "queryPlan", "winningPlan"):
+            if child_key in node:
+                stack.append(node[child_key])
+        stack.extend(node.get("inputStages", []))
+    return stages
+
+
+def summarise_explain(result: dict) -> dict:
+    """Pulls the interesting bits out of explain("executionStats") output."""
+    # Aggregations nest the find-layer explain under the first $cursor stage
+    if "stages" in result:
+        for stage in result["stages"]:
+            if "$cursor" in stage:
+                result = stage["$cursor"]
+                break
+
+    planner = result.get("queryPlanner", {})
+    stats = result.get("executionStats", {})
+    stages = _plan_stages(planner.get("winningPlan", {}))
+    return {
+        "winning_stages": stages,
+        "no_index": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "n_returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+        "explained_at": datetime.now(timezone.utc),
+    }
+
+
+async def explain_sample(database: str, collection: str, command_name: str, command: dict) -> dict:
+    inner = {command_name: collection}
+    for field in EXPLAIN_FIELDS[command_name]:
+        if field in command:
+            inner[field] = command[field]
+    if command_name == "aggregate":
+        inner["cursor"] = {}
+    result = await client[database].command({"explain": inner, "verbosity": "executionStats"})
+    return summarise_explain(result)
+
+
+async def run_pending_explains():
+    queue = slow_query_recorder.explain_queue
+    for _ in range(min(EXPLAINS_PER_TICK, len(queue))):
+        key, database, collection, command_name, command = queue.popleft()
+        try:
+            summary = await explain_sample(database, collection, command_name, command)
+        except PyMongoError as e:
+            summary = {"error": str(e), "explained_at": datetime.now(timezone.utc)}
+        slow_query_recorder.set_explain(key, summary)
+        await db.slow_query_shapes.update_one({"_id": key}, {"$set": {"explain": summary}}, upsert=True)
+
+
+async def flush_shapes():
+    deltas = slow_query_recorder.take_unflushed()
+    if not deltas:
+        return
+    ops = []
+    for entry in deltas:
+        ops.append(UpdateOne(
+            {"_id": entry["shape_id"]},
+            {
+                # $set, not $setOnInsert: the explain upsert may have created the doc first
+                "$set": {
+                    "database": entry["database"],
+                    "collection": entry["collection"],
+                    "command": entry["command"],
+                    "shape": entry["shape"],
+                    "last_seen": datetime.now(timezone.utc),
+                },
+                "$inc": {"count": entry["delta"]["count"], "total_ms": entry["delta"]["total_ms"]},
+                "$max": {"max_ms": entry["max_ms"]},
+            },
+            upsert=True
+        ))
+    try:
+        await db.slow_query_shapes.bulk_write(ops, ordered=False)
+    except Exception:
+        # Put the counts back so the next tick retries them
+        slow_query_recorder.restore_unflushed(deltas)
+        raise
+
+
+async def profiler_tick():
+    # Flush first so the shape documents exist before explains are attached
+    await flush_shapes()
+    await run_pending_explains()
+
+
+async def run_profiler():
+    """Lifespan background task: flush totals, explain new shapes."""
+    while True:
+        await asyncio.sleep(PROFILER_FLUSH_SECONDS)
+        try:
+            await profiler_tick()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Slow-query flush failed: {e}")
+
+
+# --- Report ---
+
+def build_report(shapes: list, limit: int = 20) -> list:
+    """Ranks shapes by total time spent; flags the ones without index support."""
+    rows = []
+    for s in shapes:
+        explain = s.get("explain") or {}
+        count = s.get("count", 0)
+        rows.append({
+            "shape_id": s.get("shape_id") or s.get("_id"),
+            "collection": s.get("collection"),
+            "command": s.get("command"),
+            "shape": s.get("shape"),
+            "count": count,
+            "total_ms": round(s.get("total_ms", 0.0), 1),
+            "avg_ms": round(s.get("total_ms", 0.0) / count, 1) if count else 0.0,
+            "max_ms": round(s.get("max_ms", 0.0), 1),
+            "no_index": explain.get("no_index"),
+            "winning_stages": explain.get("winning_stages"),
+            "docs_examined": explain.get("docs_examined"),
+            "n_returned": explain.get("n_returned"),
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows[:limit]
+
+
+async def load_report(source: str = "db", limit: int = 20) -> list:
+    """source='db' merges all workers (persisted); 'memory' is this process only."""
+    if source == "memory":
+        return build_report(slow_query_recorder.snapshot(), limit)
+    await flush_shapes()
+    shapes = await db.slow_query_shapes.find().to_list(None)
+    return build_report(shapes, limit)
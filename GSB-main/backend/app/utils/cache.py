@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from app.config import settings
+
+# Small TTL cache with a pluggable backend.
+#   CACHE_BACKEND=memory  per-process dict (single worker, default)
+#   CACHE_BACKEND=mongo   `cache_entries` collection shared by all workers;
+#                         a TTL index on expires_at cleans up expired keys
+# Values must be BSON-serialisable (dicts, lists, numbers, strings, datetimes).
+
+CACHE_BACKEND = settings.cache_backend
+MEMORY_CACHE_MAX_ENTRIES = 10_000
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int = MEMORY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest insertion (dicts keep insertion order)
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def ensure_indexes(self):
+        pass
+
+
+class MongoCache:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def get(self, key: str) -> Optional[Any]:
+        # The TTL monitor runs once a minute, so check expiry on read as well
+        doc = await self.collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}, {"value": 1}
+        )
+        return doc["value"] if doc else None
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        await self.collection.update_one(
+            {"_id": key}, {"$set": {"value": value, "expires_at": expires_at}}, upsert=True
+        )
+
+    async def delete(self, key: str):
+        await self.collection.delete_one({"_id": key})
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        if CACHE_BACKEND == "mongo":
+            from app.database import db
+            _cache = MongoCache(db.cache_entries)
+        else:
+            _cache = MemoryCache()
+    return _cache
+
+
+async def cached(key: str, ttl_seconds: float, compute):
+    """Returns the cached value for `key`, computing and storing it on a miss."""
+    cache = get_cache()
+    value = await cache.get(key)
+    if value is None:
+        value = await compute()
+        await cache.set(key, value, ttl_seconds)
+    return value
@@ -0,0 +1,69 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Negotiated response compression. Brotli (when the `brotli` package is
+# installed) is preferred over gzip, which is preferred over identity; q=0
+# refuses an encoding. Bodies under COMPRESSION_MIN_BYTES go out as they are,
+# since short JSON barely shrinks and the headers would eat the gain.
+# Levels are kept moderate: this runs on the event loop for every large response.
+
+COMPRESSION_MIN_BYTES = settings.compression_min_bytes
+GZIP_LEVEL = settings.gzip_level
+BROTLI_QUALITY = settings.brotli_quality
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Encodings the client accepts (q > 0), from an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name.strip() and q > 0:
+            accepted.add(name.strip())
+    return accepted
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and ("br" in accepted or "*" in accepted):
+            responder = BrotliResponder(self.app, self.minimum_size, BROTLI_QUALITY)
+        elif "gzip" in accepted or "*" in accepted:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
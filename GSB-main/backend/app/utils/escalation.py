@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import settings
+
+# Complaints still Pending after ESCALATION_DAYS full days are treated as
+# "Migrated to Higher Officials". process_complaint_status, resolve and the
+# search/list filters all use this one cutoff so they agree on the boundary.
+
+ESCALATION_DAYS = settings.escalation_days
+
+
+def escalation_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Complaints created at or before this instant are escalated.
+    `delta.days > ESCALATION_DAYS` means at least ESCALATION_DAYS + 1 full days.
+    """
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=ESCALATION_DAYS + 1)
+
+
+def is_time_escalated(created_at: datetime, now: Optional[datetime] = None) -> bool:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at <= escalation_cutoff(now)
+
+
+def within_window_filter(now: Optional[datetime] = None) -> dict:
+    """Query clause for complaints not past the cutoff (or with no created_at)."""
+    return {"$nor": [{"created_at": {"$lte": escalation_cutoff(now)}}]}
+
+
+def escalation_time(created_at: datetime) -> datetime:
+    """When a still-Pending complaint created at `created_at` becomes escalated."""
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at + timedelta(days=ESCALATION_DAYS + 1)
@@ -0,0 +1,58 @@
+from typing import Optional
+
+# GeoJSON helpers for the `2dsphere` indexed project fields.
+# NOTE: GeoJSON coordinates are [longitude, latitude] - the reverse of {lat, lng}.
+
+
+def point(lat: float, lng: float) -> dict:
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+def route_geometry(start: dict, end: dict) -> dict:
+    """
+    Builds the indexed geometry for a project from its {lat, lng} end points.
+    A LineString needs two distinct points, so single-spot projects become a Point.
+    """
+    if (start["lat"], start["lng"]) == (end["lat"], end["lng"]):
+        return point(start["lat"], start["lng"])
+    return {
+        "type": "LineString",
+        "coordinates": [[start["lng"], start["lat"]], [end["lng"], end["lat"]]],
+    }
+
+
+def bbox_polygon(min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> dict:
+    """Closed GeoJSON polygon for a lng/lat bounding box."""
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [min_lng, min_lat],
+            [max_lng, min_lat],
+            [max_lng, max_lat],
+            [min_lng, max_lat],
+            [min_lng, min_lat],
+        ]],
+    }
+
+
+def parse_bbox(bbox: str) -> Optional[tuple]:
+    """Parses 'minLng,minLat,maxLng,maxLat'. Returns None if malformed."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        return None
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        return None
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def near_filter(field: str, lat: float, lng: float, radius_m: float) -> dict:
+    """Distance-sorted proximity filter (requires a 2dsphere index on `field`)."""
+    return {
+        field: {
+            "$nearSphere": {
+                "$geometry": point(lat, lng),
+                "$maxDistance": radius_m,
+            }
+        }
+    }
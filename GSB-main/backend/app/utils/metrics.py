@@ -0,0 +1,223 @@
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from pymongo import monitoring
+
+# Prometheus metrics shared by the middleware, the Mongo client and the services.
+# Served in text format at GET /metrics.
+# With several workers (serve.py) PROMETHEUS_MULTIPROC_DIR is set and every
+# worker writes its samples there; /metrics then aggregates all of them.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# --- HTTP ---
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ["method"],
+    multiprocess_mode="livesum"
+)
+
+# --- MongoDB ---
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection",
+    ["command", "collection"], buckets=DB_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ["command", "collection"]
+)
+MONGO_POOL_MAX_SIZE = Gauge(
+    "mongo_pool_max_size", "Configured maxPoolSize per server", ["address"],
+    multiprocess_mode="livesum"
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections", "Open connections per server", ["address"],
+    multiprocess_mode="livesum"
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_checked_out", "Connections currently in use per server", ["address"],
+    multiprocess_mode="livesum"
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    ["address"], buckets=DB_BUCKETS
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts", ["address", "reason"]
+)
+
+# --- Object Storage ---
+STORAGE_UPLOAD_DURATION = Histogram(
+    "storage_upload_duration_seconds", "Object upload latency", ["backend"], buckets=SLOW_BUCKETS
+)
+STORAGE_UPLOAD_BYTES = Counter(
+    "storage_upload_bytes_total", "Bytes uploaded to object storage", ["backend"]
+)
+
+# --- LLM ---
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "LLM call latency", ["model", "outcome"], buckets=SLOW_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens used", ["model", "kind"]
+)
+
+# --- Search ---
+SEARCH_QUERY_DURATION = Histogram(
+    "search_query_duration_seconds", "Full-text search latency", ["kind"], buckets=DB_BUCKETS + (2.5,)
+)
+
+
+# --- Background Jobs ---
+JOBS_ENQUEUED = Counter(
+    "jobs_enqueued_total", "Jobs added to the queue (idempotent duplicates excluded)", ["kind"]
+)
+JOBS_PROCESSED = Counter(
+    "jobs_processed_total", "Job attempts by outcome (done, retry, dead)", ["kind", "outcome"]
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds", "Job handler run time", ["kind"], buckets=LATENCY_BUCKETS
+)
+JOB_QUEUE_LATENCY = Histogram(
+    "job_queue_latency_seconds", "Time from a job becoming due to a worker starting it",
+    ["kind"], buckets=LATENCY_BUCKETS + (30, 60)
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth", "Jobs waiting or running, plus dead letters", ["status"],
+    multiprocess_mode="livemax"
+)
+
+
+def render_metrics() -> tuple:
+    """(body, content_type) for the /metrics endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware overhead).
+    Labels by route template (e.g. /api/projects/projects/{project_id}) to keep
+    label cardinality bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path", "<unmatched>"), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command monitoring -> per-collection latency histograms.
+    Registered on the Motor client in app/database.py.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        if not isinstance(collection, str):
+            collection = "-"
+        self._pending[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool utilisation per server: open / checked-out connections vs
+    maxPoolSize, checkout wait time and failures (e.g. waitQueueTimeoutMS).
+    """
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        MONGO_POOL_MAX_SIZE.labels(self._address(event)).set(self.max_pool_size)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        address = self._address(event)
+        MONGO_POOL_CONNECTIONS.labels(address).set(0)
+        MONGO_POOL_CHECKED_OUT.labels(address).set(0)
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.labels(self._address(event)).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.labels(self._address(event)).dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        MONGO_POOL_CHECKOUT_FAILURES.labels(address, str(event.reason)).inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels(address).observe(event.duration)
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        MONGO_POOL_CHECKED_OUT.labels(address).inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels(address).observe(event.duration)
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.labels(self._address(event)).dec()
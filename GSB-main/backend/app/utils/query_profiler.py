@@ -0,0 +1,152 @@
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+
+from pymongo import monitoring
+
+from app.config import settings
+
+# Slow-query recorder. A pymongo CommandListener times every read/write command,
+# groups slow ones by normalised "shape" (values replaced with type placeholders)
+# and queues one sample per new shape for explain("executionStats").
+# Explains and persistence live in app/services/slow_queries.py.
+
+SLOW_QUERY_MS = settings.slow_query_ms
+
+PROFILED_COMMANDS = {
+    "find", "aggregate", "count", "distinct",
+    "update", "delete", "findAndModify", "getMore",
+}
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+IGNORED_COLLECTIONS = {"slow_query_shapes"}
+
+# Command fields that describe the query shape (everything else is noise)
+SHAPE_FIELDS = ("filter", "sort", "projection", "pipeline", "query", "key", "updates", "deletes", "update")
+
+
+def normalise(value):
+    """Replaces literal values with placeholders, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {k: normalise(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        if value and all(not isinstance(v, (dict, list, tuple)) for v in value):
+            return ["?"]
+        return [normalise(v) for v in value]
+    if isinstance(value, bool):
+        return "?bool"
+    if isinstance(value, (int, float)):
+        return "?num"
+    return f"?{type(value).__name__}"
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    shape = {}
+    for field in SHAPE_FIELDS:
+        if field in command:
+            value = command[field]
+            # sort / projection directions are part of the shape, not literals
+            shape[field] = dict(value) if field in ("sort", "projection") else normalise(value)
+    return shape
+
+
+def shape_key(database: str, collection: str, command_name: str, shape: dict) -> str:
+    raw = json.dumps([database, collection, command_name, shape], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """
+    Aggregates slow commands per shape: count, total/max time, last sample.
+    Callbacks run on Motor's worker threads, hence the lock.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS):
+        self.threshold_ms = threshold_ms
+        self.shapes = {}
+        self.explain_queue = deque()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name not in PROFILED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        if not isinstance(collection, str) or collection in IGNORED_COLLECTIONS:
+            return
+        self._pending[(event.connection_id, event.request_id)] = (event.database_name, collection, command)
+
+    def succeeded(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.threshold_ms:
+            self._record(event.command_name, duration_ms, *pending)
+
+    def failed(self, event):
+        self._pending.pop((event.connection_id, event.request_id), None)
+
+    def _record(self, command_name: str, duration_ms: float, database: str, collection: str, command: dict):
+        shape = query_shape(command_name, command)
+        key = shape_key(database, collection, command_name, shape)
+
+        with self._lock:
+            entry = self.shapes.get(key)
+            if entry is None:
+                entry = self.shapes[key] = {
+                    "shape_id": key,
+                    "database": database,
+                    "collection": collection,
+                    "command": command_name,
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "unflushed": {"count": 0, "total_ms": 0.0},
+                    "explain": None,
+                }
+                if command_name in EXPLAINABLE_COMMANDS:
+                    # Keep the real command (with values) so the explain is representative
+                    self.explain_queue.append((key, database, collection, command_name, dict(command)))
+
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = time.time()
+            entry["unflushed"]["count"] += 1
+            entry["unflushed"]["total_ms"] += duration_ms
+
+    def take_unflushed(self) -> list:
+        """Returns and resets per-shape deltas since the last flush."""
+        with self._lock:
+            deltas = []
+            for entry in self.shapes.values():
+                delta = entry["unflushed"]
+                if delta["count"]:
+                    deltas.append({**{k: v for k, v in entry.items() if k != "unflushed"}, "delta": dict(delta)})
+                    entry["unflushed"] = {"count": 0, "total_ms": 0.0}
+            return deltas
+
+    def restore_unflushed(self, deltas: list):
+        """Re-queues deltas from take_unflushed() after a failed flush."""
+        with self._lock:
+            for delta in deltas:
+                entry = self.shapes.get(delta["shape_id"])
+                if entry is not None:
+                    entry["unflushed"]["count"] += delta["delta"]["count"]
+                    entry["unflushed"]["total_ms"] += delta["delta"]["total_ms"]
+
+    def set_explain(self, key: str, explain: dict):
+        with self._lock:
+            if key in self.shapes:
+                self.shapes[key]["explain"] = explain
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [{k: v for k, v in e.items() if k != "unflushed"} for e in self.shapes.values()]
+
+
+slow_query_recorder = SlowQueryRecorder()
@@ -0,0 +1,155 @@
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+
+from app.config import settings
+
+# Token buckets per (route, user) and (route, client IP), checked as a route
+# dependency so a refused request never reaches the handler (no DB lookups,
+# no bcrypt on logins):
+#
+#   @router.post("/discuss", dependencies=[Depends(rate_limit.limit("community.post", "user_id"))])
+#
+# A bucket holds up to `burst` tokens and refills at `per_minute`; each request
+# takes one, and an empty bucket answers 429 with Retry-After. IP buckets are
+# RATE_LIMIT_IP_MULTIPLIER times larger since villagers often share a kiosk or
+# mobile NAT. Behind a proxy, run uvicorn with --proxy-headers so the client IP
+# is the real one.
+#
+#   RATE_LIMIT_BACKEND=memory  per-process dict (single worker, default)
+#   RATE_LIMIT_BACKEND=mongo   `rate_limits` collection shared by all workers,
+#                              one atomic update per bucket; a TTL index drops
+#                              buckets that have refilled
+
+RATE_LIMIT_ENABLED = settings.rate_limit_enabled
+RATE_LIMIT_BACKEND = settings.rate_limit_backend
+RATE_LIMIT_IP_MULTIPLIER = settings.rate_limit_ip_multiplier
+MEMORY_MAX_BUCKETS = 100_000
+
+
+class Rate(NamedTuple):
+    burst: int
+    per_minute: float
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+    def scaled(self, factor: int) -> "Rate":
+        return Rate(self.burst * factor, self.per_minute * factor)
+
+
+RATES = {
+    "write": Rate(settings.write_rate_burst, settings.write_rate_per_minute),
+    # Every attempt costs a bcrypt verification
+    "login": Rate(settings.login_rate_burst, settings.login_rate_per_minute),
+}
+
+
+class MemoryBuckets:
+    def __init__(self, max_entries: int = MEMORY_MAX_BUCKETS):
+        self.max_entries = max_entries
+        self._buckets = {}  # key -> (tokens, monotonic time of last update)
+
+    async def take(self, key: str, rate: Rate) -> float:
+        """Takes a token. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (rate.burst, now))
+        tokens = min(rate.burst, tokens + (now - updated) * rate.per_second)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / rate.per_second
+        if len(self._buckets) >= self.max_entries:
+            # Re-inserting on every take keeps recently used buckets at the end
+            self._buckets.pop(next(iter(self._buckets)), None)
+        self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+        return wait
+
+    async def ensure_indexes(self):
+        pass
+
+
+class MongoBuckets:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def take(self, key: str, rate: Rate) -> float:
+        now = datetime.now(timezone.utc)
+        refill_seconds = rate.burst / rate.per_second
+        elapsed_ms = {"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}
+        refilled = {"$min": [rate.burst, {"$add": [
+            {"$ifNull": ["$tokens", rate.burst]},
+            {"$multiply": [elapsed_ms, rate.per_second / 1000]},
+        ]}]}
+        doc = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=refill_seconds),
+                }},
+            ],
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if doc["allowed"] else (1 - doc["tokens"]) / rate.per_second
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+
+_buckets = None
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        if RATE_LIMIT_BACKEND == "mongo":
+            from app.database import db
+            _buckets = MongoBuckets(db.rate_limits)
+        else:
+            _buckets = MemoryBuckets()
+    return _buckets
+
+
+async def _request_value(request: Request, field: str) -> Optional[str]:
+    """Looks `field` up in the query string, then the (already parsed) form or JSON body."""
+    value = request.query_params.get(field)
+    if value is None:
+        content_type = request.headers.get("content-type", "")
+        try:
+            if content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+                value = (await request.form()).get(field)
+            elif content_type.startswith("application/json"):
+                value = (await request.json()).get(field)
+        except Exception:
+            return None
+    return value.strip() if isinstance(value, str) else None
+
+
+def limit(route: str, user_field: Optional[str] = None, kind: str = "write"):
+    """Route dependency enforcing the `kind` rate per user (`user_field`) and per client IP."""
+    rate = RATES[kind]
+    ip_rate = rate.scaled(RATE_LIMIT_IP_MULTIPLIER)
+
+    async def check(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        buckets = get_buckets()
+        ip = request.client.host if request.client else "unknown"
+        wait = await buckets.take(f"{route}:ip:{ip}", ip_rate)
+        if not wait and user_field:
+            user = await _request_value(request, user_field)
+            if user:
+                wait = await buckets.take(f"{route}:user:{user}", rate)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please slow down.",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+    return check
@@ -0,0 +1,128 @@
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Type
+
+from bson import ObjectId
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+
+def _default(obj: Any):
+    """Encodes the Mongo/Pydantic types the JSON encoders don't know about."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        text = obj.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializes a payload to JSON bytes.
+    Uses orjson when installed, otherwise the stdlib encoder.
+    Datetimes come out the same way Pydantic writes them (UTC as "Z").
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for payloads the router has already shaped.
+    Returning it from a route skips FastAPI's response_model re-validation,
+    so only use it for data projected with `response_fields` / `trim`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# --- Projection Helpers ---
+
+def response_fields(model: Type[BaseModel]) -> tuple:
+    """(name, default) pairs for every field of a response model."""
+    fields = []
+    for name, field in model.model_fields.items():
+        default = field.get_default(call_default_factory=True)
+        fields.append((name, None if default is PydanticUndefined else default))
+    return tuple(fields)
+
+
+def mongo_projection(model: Type[BaseModel], *extra: str) -> dict:
+    """Mongo projection that only loads the fields a response model returns."""
+    projection = {name: 1 for name in model.model_fields if name != "id"}
+    for name in extra:
+        projection[name] = 1
+    return projection
+
+
+def trim(doc: dict, fields: tuple) -> dict:
+    """Shapes a document exactly like the response model would, without validating it."""
+    return {name: doc.get(name, default) for name, default in fields}
+
+
+def trusted_list(docs: Iterable[dict], fields: tuple, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Serializes a list of already-projected documents on the fast path."""
+    return FastJSONResponse([trim(d, fields) for d in docs], status_code=status_code, headers=headers)
+
+
+# --- Conditional GET ---
+# Writes to complaints, discussions, projects and proposals stamp `updated_at`,
+# so a list's weak ETag can come from the documents as fetched: their ids and
+# versions (updated_at, else created_at). A matching If-None-Match gets a 304
+# before anything is trimmed or serialised. Weak, because the same list may go
+# out gzip- or brotli-encoded (see utils/compression.py).
+
+def weak_etag(docs: Iterable[dict], fields: tuple = (), extra: Any = None) -> str:
+    """
+    fields: values worked out at read time that aren't covered by updated_at
+            (e.g. a complaint's time-based escalation status).
+    extra:  anything else in the response, e.g. the next page cursor.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for doc in docs:
+        version = doc.get("updated_at") or doc.get("created_at")
+        digest.update(f"{doc.get('_id')}|{version}|".encode())
+        for name in fields:
+            digest.update(f"{doc.get(name)}|".encode())
+    digest.update(f"{extra}".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def revalidate_headers(etag: str) -> dict:
+    # Per-user lists: browsers keep a private copy but check it on every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(request: Optional[Request], etag: str, headers: Optional[dict] = None) -> Optional[Response]:
+    """
+    A 304 if the client's If-None-Match matches `etag` (weak comparison).
+    headers: the caching headers of the full response (default: revalidate_headers).
+    """
+    if request is None:
+        return None
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers=headers or revalidate_headers(etag))
+    return None
@@ -1,51 +1,131 @@
-import boto3
-import uuid
+import mimetypes
+import threading
+import time
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-AWS_REGION = os.getenv("AWS_REGION")
-AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
-
-# Initialize S3 Client
-try:
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
-except Exception as e:
-    print(f"⚠️ S3 Init Error: {e}")
-    s3_client = None
-
-def upload_file_to_s3(file_obj, filename: str, folder: str = "uploads") -> str:
+from app.config import settings
+from app.utils.metrics import STORAGE_UPLOAD_BYTES, STORAGE_UPLOAD_DURATION
+
+AWS_ACCESS_KEY_ID = settings.aws_access_key_id
+AWS_SECRET_ACCESS_KEY = settings.aws_secret_access_key
+AWS_REGION = settings.aws_region
+AWS_BUCKET_NAME = settings.aws_bucket_name
+
+# "s3" (default) or "local" - a disk-backed stand-in for dev/tests, served at /uploads
+STORAGE_BACKEND = settings.storage_backend
+LOCAL_UPLOAD_DIR = settings.local_upload_dir
+LOCAL_UPLOAD_BASE_URL = settings.local_upload_base_url
+
+# --- S3 Client (created on first use) ---
+# boto3 is slow to import and build, so it's deferred until the first upload
+# instead of costing every cold start. Uploads run in the threadpool, hence the lock.
+_s3_client = None
+_s3_client_failed = False
+_s3_client_lock = threading.Lock()
+
+def get_s3_client():
+    """Shared boto3 client (boto3 clients are thread-safe). None if it can't be built."""
+    global _s3_client, _s3_client_failed
+    if _s3_client is None and not _s3_client_failed:
+        with _s3_client_lock:
+            if _s3_client is None and not _s3_client_failed:
+                try:
+                    import boto3
+                    _s3_client = boto3.client(
+                        "s3",
+                        aws_access_key_id=AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                        region_name=AWS_REGION
+                    )
+                except Exception as e:
+                    print(f"⚠️ S3 Init Error: {e}")
+                    _s3_client_failed = True
+    return _s3_client
+
+# --- Content Type Detection (magic bytes first, file extension second) ---
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+]
+
+def detect_content_type(head: bytes, filename: str = "") -> str:
     """
-    Uploads a file object to S3 and returns the public URL.
+    Guesses the real content type from the first bytes of a file.
+    Falls back to the extension, then to application/octet-stream.
     """
-    if not s3_client:
-        print("❌ S3 Client not initialized.")
-        return None
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "image/heic"
+    guessed, _ = mimetypes.guess_type(filename or "")
+    return guessed or "application/octet-stream"
+
+def _object_url(key: str) -> str:
+    if STORAGE_BACKEND == "local":
+        return f"{LOCAL_UPLOAD_BASE_URL}/{key}"
+    return f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{key}"
+
+def put_object(file_obj, key: str, content_type: str) -> str:
+    """
+    Stores a file object under `key` and returns its public URL.
+    Raises on failure - callers decide how to report it.
+    """
+    start = time.perf_counter()
+    if STORAGE_BACKEND == "local":
+        path = os.path.join(LOCAL_UPLOAD_DIR, *key.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            while chunk := file_obj.read(1024 * 1024):
+                out.write(chunk)
+    else:
+        s3_client = get_s3_client()
+        if not s3_client:
+            raise RuntimeError("S3 Client not initialized.")
 
-    try:
-        # Generate unique filename
-        ext = filename.split(".")[-1] if "." in filename else "bin"
-        unique_name = f"{folder}/{uuid.uuid4()}.{ext}"
-        
         # Upload (No ACL - relies on Bucket Policy)
         s3_client.upload_fileobj(
             file_obj,
             AWS_BUCKET_NAME,
-            unique_name,
-            # We try to guess content type or default to binary
-            ExtraArgs={"ContentType": "application/octet-stream"} 
+            key,
+            ExtraArgs={"ContentType": content_type}
         )
-        
-        return f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{unique_name}"
 
-    except Exception as e:
-        print(f"❌ S3 Upload Error: {str(e)}")
-        return None
+    STORAGE_UPLOAD_DURATION.labels(STORAGE_BACKEND).observe(time.perf_counter() - start)
+    STORAGE_UPLOAD_BYTES.labels(STORAGE_BACKEND).inc(file_obj.tell())
+    return _object_url(key)
+
+def object_exists(key: str) -> bool:
+    """HEAD check used to skip re-uploading content-addressed objects."""
+    if STORAGE_BACKEND == "local":
+        return os.path.exists(os.path.join(LOCAL_UPLOAD_DIR, *key.split("/")))
+
+    s3_client = get_s3_client()
+    if not s3_client:
+        return False
+    from botocore.exceptions import ClientError
+    try:
+        s3_client.head_object(Bucket=AWS_BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+def content_addressed_key(digest: str, content_type: str) -> str:
+    """objects/ab/abcdef...jpg - same bytes always map to the same key."""
+    ext = mimetypes.guess_extension(content_type) or ".bin"
+    return f"objects/{digest[:2]}/{digest}{ext}"
+
+def put_object_if_absent(file_obj, key: str, content_type: str) -> tuple:
+    """
+    HEAD-before-PUT for immutable, content-addressed keys.
+    Returns (url, uploaded) where uploaded is False if the object already existed.
+    """
+    if object_exists(key):
+        return _object_url(key), False
+    return put_object(file_obj, key, content_type), True
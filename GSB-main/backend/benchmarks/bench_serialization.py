@@ -0,0 +1,162 @@
+"""
+Micro-benchmark: per-endpoint response serialisation cost.
+
+Compares the default FastAPI path (response_model validation + stdlib JSON)
+against the trusted fast path in app/utils/responses.py, using synthetic
+documents shaped like the real collections. No database needed.
+
+Usage: python benchmarks/bench_serialization.py [--repeat 200]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing the routers builds the (lazy) Mongo client; no server is contacted
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "gram_sahayak_bench")
+
+from app.routers.complaints import COMPLAINT_FIELDS, process_complaint_status  # noqa: E402
+from app.routers.official_contractor_chat import DiscussionResponse as ChatResponse, HISTORY_FIELDS  # noqa: E402
+from app.routers.community import FEED_FIELDS  # noqa: E402
+from app.schemas import ComplaintResponse, DiscussionResponse  # noqa: E402
+from app.utils.responses import orjson, trusted_list  # noqa: E402
+
+
+# --- Synthetic Documents ---
+
+def make_discussion(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": ObjectId(),
+        "village_name": "Rampur",
+        "user_name": "Silent Tiger",
+        "user_role": "villager",
+        "real_user_id": str(ObjectId()),
+        "content": f"The Water Supply near Ward {i % 10} needs repair. Please help!",
+        "category": "Water Supply",
+        "image_url": None,
+        "status": "Open",
+        "replies": [
+            {"user_name": "Calm River", "user_role": "villager", "content": "Same here", "created_at": now}
+            for _ in range(random.randint(0, 5))
+        ],
+        "created_at": now - timedelta(minutes=i),
+        "upvotes": random.randint(0, 50),
+        "upvoters": [str(ObjectId()) for _ in range(5)],
+    }
+
+
+def make_complaint(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "complaint_name": f"Broken hand pump #{i}",
+        "complaint_desc": "The hand pump near the temple has not worked for a week.",
+        "location": "Ward 4",
+        "villager_phone": "9876543210",
+        "village_name": "Rampur",
+        "attachments": ["https://bucket.s3.ap-south-1.amazonaws.com/complaints/a.jpg"],
+        "status": random.choice(["Pending", "Resolved"]),
+        "created_at": datetime.utcnow() - timedelta(days=random.randint(0, 30)),
+        "reopen_count": random.randint(0, 2),
+    }
+
+
+def make_message(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "sender_id": str(ObjectId()),
+        "sender_role": "government_official",
+        "receiver_id": str(ObjectId()),
+        "receiver_role": "contractor",
+        "content": f"Status update {i}: please share the latest photos.",
+        "village_name": "Rampur",
+        "timestamp": datetime.now(timezone.utc),
+    }
+
+
+# --- Serialisation Paths ---
+
+def default_path(adapter: TypeAdapter, payload: list) -> bytes:
+    """What FastAPI does for response_model routes: validate, dump, json.dumps."""
+    value = adapter.validate_python(payload)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def feed_default(docs: list) -> bytes:
+    # get_feed used to build DiscussionResponse objects, then FastAPI validated again
+    models = [
+        DiscussionResponse(
+            id=str(d["_id"]), village_name=d["village_name"], user_name=d["user_name"],
+            user_role=d["user_role"], content=d["content"], category=d["category"],
+            created_at=d["created_at"], upvotes=d.get("upvotes", 0),
+            replies=d.get("replies", []), image_url=d.get("image_url"),
+        )
+        for d in docs
+    ]
+    return default_path(FEED_ADAPTER, models)
+
+
+def feed_fast(docs: list) -> bytes:
+    for d in docs:
+        d["id"] = str(d["_id"])
+    return trusted_list(docs, FEED_FIELDS).body
+
+
+def complaints_default(docs: list) -> bytes:
+    return default_path(COMPLAINT_ADAPTER, [process_complaint_status(dict(c)) for c in docs])
+
+
+def complaints_fast(docs: list) -> bytes:
+    return trusted_list([process_complaint_status(dict(c)) for c in docs], COMPLAINT_FIELDS).body
+
+
+def history_default(docs: list) -> bytes:
+    for m in docs:
+        m["id"] = str(m["_id"])
+    return default_path(CHAT_ADAPTER, docs)
+
+
+def history_fast(docs: list) -> bytes:
+    for m in docs:
+        m["id"] = str(m["_id"])
+    return trusted_list(docs, HISTORY_FIELDS).body
+
+
+FEED_ADAPTER = TypeAdapter(List[DiscussionResponse])
+COMPLAINT_ADAPTER = TypeAdapter(List[ComplaintResponse])
+CHAT_ADAPTER = TypeAdapter(List[ChatResponse])
+
+SCENARIOS = [
+    ("GET /community/feed", make_discussion, 50, feed_default, feed_fast),
+    ("GET /complaints/official/{id}", make_complaint, 100, complaints_default, complaints_fast),
+    ("GET /chat/history", make_message, 1000, history_default, history_fast),
+]
+
+
+def run(repeat: int):
+    print(f"⚙️  Encoder: {'orjson' if orjson else 'stdlib json'} | repeat={repeat}")
+    print(f"{'endpoint':<34}{'items':>6}{'default µs':>13}{'fast µs':>11}{'speedup':>9}")
+    for name, factory, count, slow, fast in SCENARIOS:
+        docs = [factory(i) for i in range(count)]
+        # Sanity check: both paths must produce the same payload
+        assert json.loads(slow(docs)) == json.loads(fast(docs)), f"{name}: payload mismatch"
+        slow_t = min(timeit.repeat(lambda: slow(docs), number=1, repeat=repeat)) * 1e6
+        fast_t = min(timeit.repeat(lambda: fast(docs), number=1, repeat=repeat)) * 1e6
+        print(f"{name:<34}{count:>6}{slow_t:>13.0f}{fast_t:>11.0f}{slow_t / fast_t:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.repeat)
@@ -0,0 +1,112 @@
+"""
+Cold-start benchmark: import time and launch-to-first-response.
+
+Runs each measurement in a fresh interpreter, several times, and reports the
+median. The server is started with uvicorn against whatever MONGO_URI points
+at; no data is needed, only / is requested.
+
+Usage:
+  python benchmarks/bench_startup.py [--repeat 5] [--port 8123]
+  python benchmarks/bench_startup.py --output startup.json
+
+Phases:
+  import      `import app.main` (routers, schemas, clients)
+  first_200   process spawn -> first 200 from GET /
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("boto3", "botocore") if m in sys.modules]
+print(f"{elapsed:.6f} {','.join(heavy)}")
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "gram_sahayak_bench")
+    return env
+
+
+def measure_import() -> tuple:
+    out = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR,
+                                  env=child_env(), text=True)
+    seconds, _, heavy = out.strip().splitlines()[-1].partition(" ")
+    return float(seconds), heavy
+
+
+def measure_first_response(port: int, timeout: float) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gram-Sahayak cold-start benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    # First run warms the bytecode cache so every sample measures the same thing
+    measure_import()
+
+    imports, eager = [], set()
+    for _ in range(args.repeat):
+        seconds, heavy = measure_import()
+        imports.append(seconds * 1000)
+        eager.update(filter(None, heavy.split(",")))
+
+    first = [measure_first_response(args.port, args.timeout) * 1000 for _ in range(args.repeat)]
+
+    report = {
+        "repeat": args.repeat,
+        "import_ms": {"median": round(statistics.median(imports), 1), "max": round(max(imports), 1)},
+        "first_200_ms": {"median": round(statistics.median(first), 1), "max": round(max(first), 1)},
+        "eager_heavy_imports": sorted(eager),
+    }
+    print(f"{'phase':<14}{'median ms':>12}{'max ms':>10}")
+    for phase in ("import_ms", "first_200_ms"):
+        print(f"{phase[:-3]:<14}{report[phase]['median']:>12}{report[phase]['max']:>10}")
+    if eager:
+        print(f"⚠️ Imported at startup: {', '.join(sorted(eager))}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
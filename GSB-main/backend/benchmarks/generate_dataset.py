@@ -0,0 +1,267 @@
+"""
+Synthetic multi-village dataset for load tests.
+
+Generates villagers, officials, contractors, projects, complaints and
+discussions (with replies and upvotes) in bounded batches, so sizes in the
+millions stream through without holding everything in memory. The same
+--seed and --epoch always produce the same dataset: ObjectIds are drawn from
+the seeded RNG and timestamps are offsets from the epoch, so manifests and
+documents are identical across runs (bar the bcrypt salt).
+
+Usage:
+  python benchmarks/generate_dataset.py --villages 5 --villagers 10000 \\
+      --complaints 200000 --discussions 200000 --manifest bench_manifest.json
+
+Writes to MONGO_URI / DB_NAME (use a throwaway database!). The manifest lists
+sample identities that load_test.py uses to drive the endpoints.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_PASSWORD = "bench-pass"
+BATCH_SIZE = 5000
+DEFAULT_EPOCH = "2026-01-01T00:00:00+00:00"
+
+TALUKS = ["Kunigal", "Tiptur", "Sira", "Madhugiri", "Gubbi"]
+TOPICS = ["Water Supply", "Roads", "Electricity", "School", "Hospital", "Market", "Panchayat"]
+PROBLEMS = ["is broken", "needs repair", "is very dirty", "not working", "is dangerous", "has no light"]
+ADJECTIVES = ["Silent", "Hidden", "Mystery", "Brave", "Calm", "Wandering", "Happy", "Vocal", "Fast", "Wise"]
+NOUNS = ["Tiger", "River", "Banyan", "Peacock", "Lotus", "Eagle", "Lion", "Voice", "Horse", "Bear"]
+CATEGORIES = ["Roads", "Water", "Sanitation", "Electricity", "Education"]
+STATUSES = ["Pending", "Pending", "Pending", "Resolved", "Migrated to Higher Officials"]
+
+
+def village_names(count: int) -> list:
+    return [f"BenchVillage{i:03d}" for i in range(count)]
+
+
+def phone_for(village_index: int, n: int) -> str:
+    return f"9{village_index:03d}{n:06d}"
+
+
+async def insert_batches(collection, docs_iter, label: str):
+    """Streams an iterator of documents into the collection in fixed-size batches."""
+    batch, total, start = [], 0, time.perf_counter()
+    for doc in docs_iter:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            await collection.insert_many(batch, ordered=False)
+            total += len(batch)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+        total += len(batch)
+    print(f"   {label:<12} {total:>10,} docs in {time.perf_counter() - start:6.1f}s")
+    return total
+
+
+async def generate(db, villages: int, villagers: int, complaints: int, discussions: int,
+                   projects: int, chats: int, seed: int, password_hash: str,
+                   epoch: datetime = datetime.fromisoformat(DEFAULT_EPOCH)) -> dict:
+    """
+    Fills `db` (Motor or mongomock-motor database) and returns the manifest.
+    All counts except `villages` are per village.
+    """
+    rng = random.Random(seed)
+    names = village_names(villages)
+    now = epoch
+    manifest = {"seed": seed, "epoch": epoch.isoformat(), "password": BENCH_PASSWORD, "villages": []}
+
+    def new_id() -> ObjectId:
+        return ObjectId(rng.randbytes(12))
+
+    print(f"🌱 Generating {villages} villages (seed={seed})...")
+    for v_index, village in enumerate(names):
+        taluk = TALUKS[v_index % len(TALUKS)]
+        villager_ids = [new_id() for _ in range(villagers)]
+
+        def villager_docs():
+            for n, oid in enumerate(villager_ids):
+                yield {
+                    "_id": oid,
+                    "name": f"Villager {v_index}-{n}",
+                    "gender": rng.choice(["M", "F"]),
+                    "age": rng.randint(18, 80),
+                    "email": f"v{v_index}.{n}@bench.local",
+                    "phone_number": phone_for(v_index, n),
+                    "village_name": village,
+                    "taluk": taluk,
+                    "district": "Tumakuru",
+                    "state": "Karnataka",
+                    "password": password_hash,
+                    "role": "villager",
+                    "anonymous_identity": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+                }
+
+        official_id = new_id()
+        contractor_id = new_id()
+        government_id = f"BENCH-GOV-{v_index:03d}"
+        contractor_code = f"BENCH-CON-{v_index:03d}"
+
+        await insert_batches(db.villagers, villager_docs(), "villagers")
+        await db.government_officials.insert_one({
+            "_id": official_id, "name": f"Official {v_index}", "email": f"o{v_index}@bench.local",
+            "government_id": government_id, "village_name": village, "password": password_hash,
+            "role": "government_official",
+        })
+        await db.contractors.insert_one({
+            "_id": contractor_id, "name": f"Contractor {v_index}", "email": f"c{v_index}@bench.local",
+            "phone_number": phone_for(v_index, 999999), "contractor_id": contractor_code,
+            "password": password_hash, "role": "contractor",
+        })
+
+        def project_docs():
+            for n in range(projects):
+                lat, lng = 13.0 + v_index * 0.05 + rng.random() * 0.02, 77.0 + rng.random() * 0.02
+                yield {
+                    "_id": new_id(),
+                    "project_name": f"{rng.choice(CATEGORIES)} work #{n}",
+                    "description": "Synthetic benchmark project",
+                    "category": rng.choice(CATEGORIES),
+                    "village_name": village,
+                    "location": f"Ward {rng.randint(1, 10)}",
+                    "start_point": {"lat": lat, "lng": lng},
+                    "end_point": {"lat": lat + 0.001, "lng": lng + 0.001},
+                    "start_location": {"type": "Point", "coordinates": [lng, lat]},
+                    "route": {"type": "LineString", "coordinates": [[lng, lat], [lng + 0.001, lat + 0.001]]},
+                    "contractor_name": f"Contractor {v_index}",
+                    "contractor_id": contractor_code,
+                    "allocated_budget": float(rng.randint(1, 100) * 10000),
+                    "approved_by": government_id,
+                    "start_date": now - timedelta(days=rng.randint(0, 365)),
+                    "due_date": now + timedelta(days=rng.randint(30, 365)),
+                    "status": rng.choice(["Proposed", "In Progress", "Completed"]),
+                    "milestones": [{"title": f"Phase {m}", "description": None,
+                                    "status": rng.choice(["Pending", "Completed"])} for m in range(3)],
+                    "images": [],
+                    "created_at": now - timedelta(days=rng.randint(0, 365)),
+                }
+
+        def complaint_docs():
+            for n in range(complaints):
+                owner = rng.randrange(villagers)
+                yield {
+                    "_id": new_id(),
+                    "complaint_name": f"{rng.choice(TOPICS)} {rng.choice(PROBLEMS)}",
+                    "complaint_desc": f"The {rng.choice(TOPICS)} near Ward {rng.randint(1, 10)} {rng.choice(PROBLEMS)}.",
+                    "location": f"Ward {rng.randint(1, 10)}",
+                    "villager_id": str(villager_ids[owner]),
+                    "villager_name": f"Villager {v_index}-{owner}",
+                    "villager_phone": phone_for(v_index, owner),
+                    "village_name": village,
+                    "taluk": taluk,
+                    "district": "Tumakuru",
+                    "state": "Karnataka",
+                    "attachments": [],
+                    "status": rng.choice(STATUSES),
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+                    "resolution_notes": None,
+                    "resolution_attachments": [],
+                    "resolved_by": None,
+                    "resolved_at": None,
+                    "reopen_count": rng.choice([0, 0, 0, 1, 2]),
+                }
+
+        def discussion_docs():
+            for n in range(discussions):
+                upvoters = rng.sample(range(villagers), k=min(villagers, rng.randint(0, 20)))
+                yield {
+                    "_id": new_id(),
+                    "village_name": village,
+                    "user_name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+                    "user_role": "villager",
+                    "real_user_id": str(villager_ids[rng.randrange(villagers)]),
+                    "content": f"The {rng.choice(TOPICS)} near Ward {rng.randint(1, 10)} {rng.choice(PROBLEMS)}. Please help!",
+                    "category": rng.choice(TOPICS),
+                    "image_url": None,
+                    "status": rng.choice(["Open", "Open", "Resolved"]),
+                    "replies": [
+                        {"user_name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}", "user_role": "villager",
+                         "content": "Same problem here.", "created_at": now - timedelta(minutes=rng.randint(0, 5000))}
+                        for _ in range(rng.randint(0, 4))
+                    ],
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+                    "upvotes": len(upvoters),
+                    "upvoters": [str(villager_ids[u]) for u in upvoters],
+                }
+
+        await insert_batches(db.projects, project_docs(), "projects")
+        await insert_batches(db.complaints, complaint_docs(), "complaints")
+        await insert_batches(db.discussions, discussion_docs(), "discussions")
+
+        def chat_docs():
+            pair = [(str(official_id), "government_official"), (str(contractor_id), "contractor")]
+            for n in range(chats):
+                (sender, s_role), (receiver, r_role) = pair if n % 2 == 0 else pair[::-1]
+                yield {
+                    "_id": new_id(),
+                    "sender_id": sender, "sender_role": s_role,
+                    "receiver_id": receiver, "receiver_role": r_role,
+                    "content": f"Status update #{n} on the {rng.choice(CATEGORIES)} work.",
+                    "village_name": village,
+                    "timestamp": now - timedelta(minutes=chats - n),
+                }
+
+        await insert_batches(db.official_contractor_chats, chat_docs(), "chats")
+
+        manifest["villages"].append({
+            "village_name": village,
+            "villager_ids": [str(v) for v in villager_ids[:200]],
+            "phone_numbers": [phone_for(v_index, n) for n in range(min(villagers, 200))],
+            "official_id": str(official_id),
+            "government_id": government_id,
+            "contractor_id": str(contractor_id),
+            "contractor_code": contractor_code,
+        })
+        print(f"✅ {village} done.")
+
+    # Rollups are derived data; dropping them makes the next server start rebuild
+    await db.project_rollups.drop()
+    return manifest
+
+
+async def main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.security import get_password_hash
+
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+    db_name = os.getenv("DB_NAME", "gram_sahayak_bench")
+    db = AsyncIOMotorClient(mongo_uri)[db_name]
+
+    if args.drop:
+        print(f"🗑️  Dropping benchmark database '{db_name}'...")
+        await db.client.drop_database(db_name)
+
+    manifest = await generate(
+        db, args.villages, args.villagers, args.complaints, args.discussions,
+        args.projects, args.chats, args.seed, get_password_hash(BENCH_PASSWORD),
+        epoch=datetime.fromisoformat(args.epoch)
+    )
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"📄 Manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Gram-Sahayak dataset")
+    parser.add_argument("--villages", type=int, default=5)
+    parser.add_argument("--villagers", type=int, default=10000, help="Villagers per village")
+    parser.add_argument("--complaints", type=int, default=20000, help="Complaints per village")
+    parser.add_argument("--discussions", type=int, default=20000, help="Discussions per village")
+    parser.add_argument("--projects", type=int, default=200, help="Projects per village")
+    parser.add_argument("--chats", type=int, default=300, help="Official-contractor messages per village")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--epoch", default=DEFAULT_EPOCH, help="ISO timestamp all dates are offset from")
+    parser.add_argument("--manifest", default="bench_manifest.json")
+    parser.add_argument("--drop", action="store_true", help="Drop the target database first")
+    asyncio.run(main(parser.parse_args()))
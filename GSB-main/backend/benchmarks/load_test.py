@@ -0,0 +1,280 @@
+"""
+HTTP load test for the hot read paths (feed, complaint lists, dashboard,
+login, official-contractor chat history).
+
+Drives a running server (--base-url) or the app in-process (default), with a
+fixed number of concurrent virtual users for a fixed duration. Identities come
+from the manifest written by generate_dataset.py.
+
+Usage:
+  # 1. Seed a throwaway database and start the server against it
+  python benchmarks/generate_dataset.py --drop --manifest bench_manifest.json
+  uvicorn app.main:app --port 8000
+
+  # 2. Record a baseline, then compare a later run against it
+  python benchmarks/load_test.py --base-url http://localhost:8000 --output baseline.json
+  python benchmarks/load_test.py --base-url http://localhost:8000 --compare baseline.json
+
+  # Quick smoke run with no MongoDB at all (in-memory mongomock, tiny dataset)
+  python benchmarks/load_test.py --mongomock --duration 10
+
+Exits non-zero when --compare finds a p95 regression above --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "gram_sahayak_bench")
+
+
+# --- Scenarios ---
+# Each takes (rng, village manifest entry, password) and returns
+# (method, path, request kwargs) for one request.
+
+def feed(rng, v, password):
+    return "GET", "/api/community/community/feed", {"params": {"user_id": rng.choice(v["villager_ids"])}}
+
+
+def complaints_villager(rng, v, password):
+    return "GET", f"/api/complaints/complaints/villager/{rng.choice(v['phone_numbers'])}", {}
+
+
+def complaints_official(rng, v, password):
+    return "GET", f"/api/complaints/complaints/official/{v['government_id']}", {}
+
+
+def dashboard(rng, v, password):
+    return "GET", "/api/dashboard/dashboard/stats", {"params": {"villager_id": rng.choice(v["villager_ids"])}}
+
+
+def login(rng, v, password):
+    body = {"phone_number": rng.choice(v["phone_numbers"]), "password": password}
+    return "POST", "/api/auth/auth/login/villager", {"json": body}
+
+
+def chat_history(rng, v, password):
+    params = {"user1": v["official_id"], "user2": v["contractor_id"]}
+    return "GET", "/api/chat/official-contractor-chat/history", {"params": params}
+
+
+SCENARIOS = {
+    "feed": (feed, 40),
+    "complaints_villager": (complaints_villager, 15),
+    "complaints_official": (complaints_official, 15),
+    "dashboard": (dashboard, 15),
+    "login": (login, 5),
+    "chat_history": (chat_history, 10),
+}
+
+
+# --- Statistics ---
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarise(latencies: list, errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- Driver ---
+
+async def run_load(client: httpx.AsyncClient, manifest: dict, scenarios: list,
+                   concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    names = [name for name in scenarios]
+    weights = [SCENARIOS[name][1] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    password = manifest["password"]
+    recording = False
+
+    async def user(worker_id: int, stop_at: float):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            build = SCENARIOS[name][0]
+            village = rng.choice(manifest["villages"])
+            method, path, kwargs = build(rng, village, password)
+
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            if recording:
+                if failed:
+                    errors[name] += 1
+                else:
+                    latencies[name].append(elapsed_ms)
+
+    if warmup:
+        print(f"🔥 Warm-up for {warmup:.0f}s...")
+        stop_at = time.perf_counter() + warmup
+        await asyncio.gather(*(user(i, stop_at) for i in range(concurrency)))
+
+    print(f"🚀 {concurrency} virtual users for {duration:.0f}s...")
+    recording = True
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*(user(i, stop_at) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [ms for values in latencies.values() for ms in values]
+    return {
+        "scenarios": {name: summarise(latencies[name], errors[name], elapsed) for name in names},
+        "overall": summarise(all_latencies, sum(errors.values()), elapsed),
+    }
+
+
+async def run_in_process(args, manifest):
+    """Serves the app through httpx's ASGI transport (no network hop)."""
+    if args.mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        import app.database
+
+        # Must happen before the routers import `db`
+        app.database.client = AsyncMongoMockClient()
+        app.database.db = app.database.client[os.environ["DB_NAME"]]
+        app.database.secondary_db = app.database.db
+
+    from app.main import app as fastapi_app
+    from app.database import db
+
+    if args.mongomock:
+        from generate_dataset import BENCH_PASSWORD, generate
+        from app.security import get_password_hash
+        manifest = await generate(db, villages=2, villagers=500, complaints=2000, discussions=2000,
+                                  projects=50, chats=100, seed=args.seed,
+                                  password_hash=get_password_hash(BENCH_PASSWORD))
+
+    async with fastapi_app.router.lifespan_context(fastapi_app):
+        transport = httpx.ASGITransport(app=fastapi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_load(client, manifest, args.scenarios, args.concurrency,
+                                  args.duration, args.warmup, args.seed)
+
+
+async def run_remote(args, manifest):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        return await run_load(client, manifest, args.scenarios, args.concurrency,
+                              args.duration, args.warmup, args.seed)
+
+
+# --- Reporting ---
+
+def print_report(report: dict):
+    print(f"\n{'scenario':<22}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    rows = list(report["scenarios"].items()) + [("OVERALL", report["overall"])]
+    for name, s in rows:
+        print(f"{name:<22}{s['requests']:>8}{s['errors']:>6}{s['rps']:>9}"
+              f"{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}")
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> bool:
+    """Prints p95/RPS deltas against a baseline; False if any p95 regressed too far."""
+    print(f"\n📊 Compared with {baseline['meta']['git_revision']} ({baseline['meta']['started_at']})")
+    print(f"{'scenario':<22}{'p95 base':>10}{'p95 now':>10}{'Δp95':>9}{'rps base':>10}{'rps now':>10}")
+    ok = True
+    rows = list(report["scenarios"].items()) + [("OVERALL", report["overall"])]
+    for name, now in rows:
+        base = baseline["overall"] if name == "OVERALL" else baseline["scenarios"].get(name)
+        if not base or not base["p95_ms"] or not now["requests"]:
+            continue
+        delta = (now["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+        flag = ""
+        if delta > max_regression:
+            ok, flag = False, "  ❌"
+        print(f"{name:<22}{base['p95_ms']:>10}{now['p95_ms']:>10}{delta:>+8.1f}%"
+              f"{base['rps']:>10}{now['rps']:>10}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gram-Sahayak load test")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--mongomock", action="store_true", help="In-process against an in-memory DB")
+    parser.add_argument("--manifest", default="bench_manifest.json")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Allowed p95 increase in %%")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.base_url and args.mongomock:
+        parser.error("--mongomock only applies to in-process runs")
+
+    manifest = None
+    if not args.mongomock:
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    runner = run_remote if args.base_url else run_in_process
+    report = asyncio.run(runner(args, manifest))
+    report["meta"] = {
+        "started_at": started_at,
+        "git_revision": git_revision(),
+        "target": args.base_url or ("in-process (mongomock)" if args.mongomock else "in-process"),
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        "scenarios": args.scenarios,
+    }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.config import settings
+from app.routers.projects import ProjectCreate
+from app.schemas import ContractorCreate, OfficialCreate, SchemeBase, VillagerSignup
+from app.security import get_password_hash
+from app.services.escalations import location_of
+from app.utils.geo import point, route_geometry
+
+# Streams NDJSON / CSV exports into MongoDB for onboarding a district:
+#   python bulk_import.py villagers villagers.ndjson --batch-size 2000 --workers 4
+#
+# - Records are upserted on their natural key, so re-running is safe.
+# - Batches go out as unordered bulk_writes from a pool of writer threads;
+#   bcrypt hashing runs in a process pool alongside.
+# - Progress is checkpointed to <file>.checkpoint; a rerun resumes after the
+#   last fully written batch (use --restart to ignore it).
+# - Invalid rows and write errors are appended to <file>.rejects.ndjson.
+#
+# CSV columns with dots nest (start_point.lat -> {"start_point": {"lat": ..}});
+# cells holding JSON arrays/objects (e.g. milestones) are parsed.
+
+MONGO_URI = settings.mongo_uri
+DB_NAME = settings.db_name
+
+
+class ComplaintImport(BaseModel):
+    complaint_name: str
+    complaint_desc: str
+    location: str
+    villager_phone: str
+    created_at: datetime  # part of the natural key, so required
+    status: str = "Pending"
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class ImportKind(NamedTuple):
+    collection: str
+    model: type
+    key: tuple
+    hashes_password: bool = False
+
+
+KINDS = {
+    "villagers": ImportKind("villagers", VillagerSignup, ("phone_number",), True),
+    "officials": ImportKind("government_officials", OfficialCreate, ("government_id",), True),
+    "contractors": ImportKind("contractors", ContractorCreate, ("contractor_id",), True),
+    "schemes": ImportKind("schemes", SchemeBase, ("scheme_id",)),
+    "projects": ImportKind("projects", ProjectCreate, ("village_name", "project_name", "contractor_id")),
+    "complaints": ImportKind("complaints", ComplaintImport, ("villager_phone", "complaint_name", "created_at")),
+}
+
+# Set once on insert only; later imports must not reset them
+INSERT_ONLY_FIELDS = {
+    "password", "created_at", "images", "reopen_count", "attachments", "resolution_attachments",
+    "resolution_notes", "resolved_by", "resolved_at", "assigned_complaints", "complaints_raised",
+}
+
+
+# --- Reading ---
+
+def _nest_csv_row(row: dict) -> dict:
+    record = {}
+    for column, value in row.items():
+        if value is None or value == "":
+            continue
+        value = value.strip()
+        if value[:1] in "[{":
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        target = record
+        *parents, leaf = column.strip().split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return record
+
+
+def read_records(path: str):
+    """Yields (line_no, record or None, raw) lazily; None marks unparsable input."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for line_no, row in enumerate(csv.DictReader(f), start=1):
+                yield line_no, _nest_csv_row(row), row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line), line
+                except ValueError:
+                    yield line_no, None, line
+
+
+def batched(records, size: int):
+    batch = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Transforming ---
+
+def to_document(kind_name: str, kind: ImportKind, record: dict) -> dict:
+    doc = kind.model(**record).model_dump()
+    now = datetime.now(timezone.utc)
+
+    if kind_name == "projects":
+        doc["created_at"] = now
+        doc["images"] = []
+        doc["start_location"] = point(doc["start_point"]["lat"], doc["start_point"]["lng"])
+        doc["route"] = route_geometry(doc["start_point"], doc["end_point"])
+    elif kind_name == "complaints":
+        lat, lng = doc.pop("latitude"), doc.pop("longitude")
+        doc["location_point"] = point(lat, lng) if lat is not None and lng is not None else None
+        doc.update({
+            "attachments": [], "nearby_projects": [],
+            "resolution_notes": None, "resolution_attachments": [],
+            "resolved_by": None, "resolved_at": None, "reopen_count": 0,
+        })
+    elif kind_name == "officials":
+        doc["assigned_complaints"] = []
+    elif kind_name == "villagers":
+        doc["complaints_raised"] = []
+    return doc
+
+
+def upsert_op(kind: ImportKind, doc: dict) -> UpdateOne:
+    key = {field: doc[field] for field in kind.key}
+    insert_only = {k: v for k, v in doc.items() if k in INSERT_ONLY_FIELDS and k not in key}
+    updates = {k: v for k, v in doc.items() if k not in INSERT_ONLY_FIELDS and k not in key}
+    update = {"$setOnInsert": insert_only}
+    if updates:
+        update["$set"] = updates
+    return UpdateOne(key, update, upsert=True)
+
+
+# --- Writing ---
+
+class Importer:
+    def __init__(self, db, kind_name: str, hash_pool, rejects_path: str, dry_run: bool):
+        self.db = db
+        self.kind_name = kind_name
+        self.kind = KINDS[kind_name]
+        self.hash_pool = hash_pool
+        self.rejects_path = rejects_path
+        self.dry_run = dry_run
+        self.totals = {"upserted": 0, "modified": 0, "matched": 0, "rejected": 0}
+
+    def reject(self, entries: list):
+        if not entries:
+            return
+        self.totals["rejected"] += len(entries)
+        with open(self.rejects_path, "a", encoding="utf-8") as f:
+            for line_no, reason, raw in entries:
+                f.write(json.dumps({"line": line_no, "reason": reason, "raw": raw}, default=str) + "\n")
+
+    def _attach_villagers(self, docs: list, rejects: list) -> list:
+        """Complaints reference villagers by phone; resolve the whole batch in one query."""
+        phones = {doc["villager_phone"] for _, doc in docs}
+        villagers = {
+            v["phone_number"]: v for v in self.db.villagers.find(
+                {"phone_number": {"$in": list(phones)}}, {"name": 1, "phone_number": 1, "village_name": 1, "taluk": 1, "district": 1, "state": 1}
+            )
+        }
+        resolved = []
+        for line_no, doc in docs:
+            villager = villagers.get(doc["villager_phone"])
+            if not villager:
+                rejects.append((line_no, "villager not found", doc["villager_phone"]))
+                continue
+            doc["villager_id"] = str(villager["_id"])
+            doc["villager_name"] = villager["name"]
+            doc["village_name"] = villager["village_name"]
+            doc.update(location_of(villager))
+            resolved.append((line_no, doc))
+        return resolved
+
+    def _link_complaints(self, docs: list, upserted_ids: dict):
+        """Mirrors raise_complaint: add new complaints to the villager and village officials."""
+        by_villager, by_village = {}, {}
+        for index, oid in upserted_ids.items():
+            doc = docs[index][1]
+            by_villager.setdefault(doc["villager_id"], []).append(str(oid))
+            by_village.setdefault(doc["village_name"], []).append(str(oid))
+
+        if by_villager:
+            self.db.villagers.bulk_write([
+                UpdateOne({"_id": ObjectId(vid)}, {"$addToSet": {"complaints_raised": {"$each": ids}}})
+                for vid, ids in by_villager.items()
+            ], ordered=False)
+        for village, ids in by_village.items():
+            self.db.government_officials.update_many(
+                {"village_name": village}, {"$addToSet": {"assigned_complaints": {"$each": ids}}}
+            )
+
+    def write_batch(self, batch: list) -> int:
+        """Validates, hashes and upserts one batch. Returns the number of input rows handled."""
+        docs, rejects = [], []
+        for line_no, record, raw in batch:
+            if record is None:
+                rejects.append((line_no, "unparsable line", raw))
+                continue
+            try:
+                docs.append((line_no, to_document(self.kind_name, self.kind, record)))
+            except (ValidationError, TypeError, KeyError, ValueError) as e:
+                rejects.append((line_no, str(e), raw))
+
+        if self.kind_name == "complaints" and docs:
+            docs = self._attach_villagers(docs, rejects)
+
+        self.reject(rejects)
+        if not docs or self.dry_run:
+            return len(batch)
+
+        if self.kind.hashes_password:
+            # Already-hashed exports ($2b$...) are stored as-is
+            plain = [i for i, (_, d) in enumerate(docs) if not d["password"].startswith("$2")]
+            hashed = self.hash_pool.map(get_password_hash, [docs[i][1]["password"] for i in plain], chunksize=32)
+            for i, value in zip(plain, hashed):
+                docs[i][1]["password"] = value
+
+        ops = [upsert_op(self.kind, doc) for _, doc in docs]
+        try:
+            result = self.db[self.kind.collection].bulk_write(ops, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            # Unordered: everything except the failed ops was applied
+            details = e.details
+            self.reject([(docs[err["index"]][0], err.get("errmsg"), docs[err["index"]][1])
+                         for err in details.get("writeErrors", [])])
+
+        upserted_ids = {u["index"]: u["_id"] for u in details.get("upserted", [])}
+        if self.kind_name == "complaints" and upserted_ids:
+            self._link_complaints(docs, upserted_ids)
+
+        self.totals["upserted"] += details.get("nUpserted", 0)
+        self.totals["modified"] += details.get("nModified", 0)
+        self.totals["matched"] += details.get("nMatched", 0)
+        return len(batch)
+
+
+# --- Checkpointing ---
+
+def load_checkpoint(path: str, kind_name: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("kind") != kind_name:
+        print(f"❌ Error: checkpoint {path} belongs to a '{state.get('kind')}' import. Use --restart.")
+        sys.exit(1)
+    return state["records_done"]
+
+
+def save_checkpoint(path: str, kind_name: str, records_done: int):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"kind": kind_name, "records_done": records_done,
+                   "updated_at": datetime.now(timezone.utc).isoformat()}, f)
+    os.replace(tmp, path)
+
+
+def run_import(args):
+    if not MONGO_URI:
+        print("❌ Error: MONGO_URI not found. Check your .env file.")
+        sys.exit(1)
+
+    client = MongoClient(MONGO_URI, maxPoolSize=args.workers + 2)
+    db = client[DB_NAME]
+    kind = KINDS[args.kind]
+    checkpoint_path = args.input + ".checkpoint"
+    rejects_path = args.input + ".rejects.ndjson"
+
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    skip = 0 if args.dry_run else load_checkpoint(checkpoint_path, args.kind)
+    if skip:
+        print(f"↩️  Resuming after {skip:,} records (from {checkpoint_path})")
+
+    # Natural-key indexes keep concurrent upserts from creating duplicates
+    if not args.dry_run:
+        try:
+            db[kind.collection].create_index([(field, 1) for field in kind.key], unique=True)
+        except PyMongoError as e:
+            print(f"⚠️ Could not ensure unique index on {kind.key}: {e}")
+
+    print(f"📥 Importing {args.kind} from {args.input} into {DB_NAME}.{kind.collection}"
+          f" (batch={args.batch_size}, workers={args.workers}{', dry run' if args.dry_run else ''})")
+
+    records = read_records(args.input)
+    for _ in range(skip):
+        next(records, None)
+
+    start = time.perf_counter()
+    done_batches, next_to_commit, records_done = {}, 0, skip
+    in_flight = {}
+    failed = None
+
+    # spawn: the pool is first used from writer threads, and forking a threaded process can deadlock
+    hash_pool = ProcessPoolExecutor(args.hash_workers, mp_context=multiprocessing.get_context("spawn"))
+    with hash_pool, ThreadPoolExecutor(args.workers) as writers:
+        importer = Importer(db, args.kind, hash_pool, rejects_path, args.dry_run)
+
+        def collect(futures):
+            """Marks finished batches and advances the checkpoint over the contiguous prefix."""
+            nonlocal next_to_commit, records_done, failed
+            for future in futures:
+                seq = in_flight.pop(future)
+                try:
+                    done_batches[seq] = future.result()
+                except Exception as e:  # noqa: BLE001 - stop cleanly and keep the checkpoint
+                    failed = failed or e
+            while next_to_commit in done_batches:
+                records_done += done_batches.pop(next_to_commit)
+                next_to_commit += 1
+            if not args.dry_run:
+                save_checkpoint(checkpoint_path, args.kind, records_done)
+
+        for seq, batch in enumerate(batched(records, args.batch_size)):
+            # Bounded in-flight batches keep memory flat on huge files
+            while len(in_flight) >= args.workers * 2:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+                print(f"   ... {records_done:,} records ({records_done / (time.perf_counter() - start):,.0f}/s)")
+            if failed:
+                break
+            in_flight[writers.submit(importer.write_batch, batch)] = seq
+
+        if in_flight:
+            finished, _ = wait(in_flight)
+            collect(finished)
+
+    elapsed = time.perf_counter() - start
+    if failed:
+        print(f"❌ Import stopped: {failed}")
+        print(f"   Checkpoint at {records_done:,} records; rerun the same command to resume.")
+        sys.exit(1)
+
+    if args.kind == "projects" and not args.dry_run:
+        # Dashboards read the per-village / per-contractor rollups
+        import asyncio
+        from app.services.rollups import rebuild_rollups
+        print(f"✅ Rebuilt {asyncio.run(rebuild_rollups())} project rollups.")
+    if args.kind == "complaints" and not args.dry_run:
+        # /complaints/analytics reads the day / week buckets
+        import asyncio
+        from app.services.complaint_stats import rebuild_complaint_stats
+        print(f"✅ Rebuilt {asyncio.run(rebuild_complaint_stats())} complaint analytics buckets.")
+
+    t = importer.totals
+    print("\n---------------------------------------------------")
+    print(f"🎉 {records_done - skip:,} records in {elapsed:.1f}s "
+          f"({(records_done - skip) / elapsed if elapsed else 0:,.0f}/s)")
+    print(f"   inserted={t['upserted']:,} updated={t['modified']:,} "
+          f"unchanged={t['matched'] - t['modified']:,} rejected={t['rejected']:,}")
+    if t["rejected"]:
+        print(f"   Rejected rows: {rejects_path}")
+    print("---------------------------------------------------")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import NDJSON/CSV into Gram-Sahayak")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("input", help="Path to a .ndjson/.jsonl or .csv file")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4, help="Parallel bulk_write threads")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 2, help="bcrypt processes")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only; write rejects, no DB writes")
+    run_import(parser.parse_args())
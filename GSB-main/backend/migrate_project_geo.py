@@ -0,0 +1,54 @@
+import os
+from pymongo import MongoClient, UpdateOne, GEOSPHERE
+from dotenv import load_dotenv
+
+from app.utils.geo import point, route_geometry
+
+# Backfills the GeoJSON 'start_location' / 'route' fields on projects created
+# before proximity search existed, then ensures the 2dsphere index.
+
+load_dotenv()
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("DB_NAME")
+
+if not MONGO_URI:
+    print("❌ Error: MONGO_URI not found. Check your .env file.")
+    exit(1)
+
+client = MongoClient(MONGO_URI)
+db = client[DB_NAME]
+
+def migrate_projects():
+    cursor = db.projects.find(
+        {"route": {"$exists": False}, "start_point": {"$exists": True}, "end_point": {"$exists": True}},
+        {"start_point": 1, "end_point": 1}
+    )
+
+    ops = []
+    skipped = 0
+    for p in cursor:
+        start, end = p.get("start_point") or {}, p.get("end_point") or {}
+        if not {"lat", "lng"} <= start.keys() or not {"lat", "lng"} <= end.keys():
+            skipped += 1
+            continue
+        ops.append(UpdateOne(
+            {"_id": p["_id"]},
+            {"$set": {
+                "start_location": point(start["lat"], start["lng"]),
+                "route": route_geometry(start, end)
+            }}
+        ))
+
+    if ops:
+        result = db.projects.bulk_write(ops, ordered=False)
+        print(f"✅ Added GeoJSON fields to {result.modified_count} projects.")
+    else:
+        print("✅ No projects need migrating.")
+    if skipped:
+        print(f"⚠️  Skipped {skipped} projects with malformed start/end points.")
+
+    db.projects.create_index([("route", GEOSPHERE)])
+    print("✅ 2dsphere index ensured on 'route'.")
+
+if __name__ == "__main__":
+    migrate_projects()
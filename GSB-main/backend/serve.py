@@ -0,0 +1,64 @@
+"""
+Production launcher: several uvicorn worker processes behind one port.
+
+Each worker is a separate Python process, so CPU-bound request work (bcrypt,
+Pydantic validation, JSON encoding) spreads over all cores. uvicorn's
+supervisor restarts crashed workers and forwards SIGTERM/SIGINT for a graceful
+shutdown. One-off startup work runs on a single worker (services/leader.py).
+
+Usage:
+  python serve.py                     # WEB_CONCURRENCY or one worker per core
+  python serve.py --workers 4 --port 8000
+
+Cross-worker state:
+  CACHE_BACKEND=mongo                 share cached dashboard cards between workers
+  PROMETHEUS_MULTIPROC_DIR            set here automatically so /metrics
+                                      aggregates every worker
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+
+def prepare_metrics_dir(path: str):
+    """Prometheus multiprocess files must start empty on every launch."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gram-Sahayak production server")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30")),
+                        help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--metrics-dir",
+                        default=os.getenv("PROMETHEUS_MULTIPROC_DIR",
+                                          os.path.join(tempfile.gettempdir(), "gram_sahayak_metrics")))
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        prepare_metrics_dir(args.metrics_dir)
+
+    print(f"🚀 Starting {args.workers} worker(s) on {args.host}:{args.port}")
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
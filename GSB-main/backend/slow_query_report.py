@@ -0,0 +1,34 @@
+import asyncio
+import argparse
+import json
+
+from app.services.slow_queries import load_report
+
+# Prints the persisted slow-query report (all app workers) to the terminal.
+# Usage: python slow_query_report.py [--limit 20] [--json]
+
+async def print_report(limit: int, as_json: bool):
+    rows = await load_report("db", limit)
+
+    if as_json:
+        print(json.dumps(rows, indent=2, default=str))
+        return
+
+    if not rows:
+        print("✅ No slow queries recorded yet.")
+        return
+
+    print(f"{'total ms':>10} {'count':>7} {'avg ms':>8} {'max ms':>8}  {'index':<8} collection.command  shape")
+    for r in rows:
+        index = "❌ NONE" if r["no_index"] else ("✅" if r["no_index"] is False else "?")
+        print(
+            f"{r['total_ms']:>10.1f} {r['count']:>7} {r['avg_ms']:>8.1f} {r['max_ms']:>8.1f}  {index:<8} "
+            f"{r['collection']}.{r['command']}  {json.dumps(r['shape'], default=str)}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Slow MongoDB query shapes ranked by total time")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON rows")
+    args = parser.parse_args()
+    asyncio.run(print_report(args.limit, args.json))
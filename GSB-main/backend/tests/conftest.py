@@ -0,0 +1,22 @@
+import os
+import sys
+
+# Importing the routers builds the (lazy) Motor client; no server is contacted
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "gram_sahayak_test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import mongomock.collection as _mongomock_collection
+except ImportError:
+    _mongomock_collection = None
+
+if _mongomock_collection is not None:
+    # pymongo 4.9+ passes `sort` to bulk update ops; mongomock 4.3 doesn't accept it
+    for _name in ("add_update", "add_replace", "add_delete"):
+        _original = getattr(_mongomock_collection.BulkOperationBuilder, _name, None)
+        if _original is not None:
+            def _without_sort(self, *args, _original=_original, **kwargs):
+                kwargs.pop("sort", None)
+                return _original(self, *args, **kwargs)
+            setattr(_mongomock_collection.BulkOperationBuilder, _name, _without_sort)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.routers import complaints
+from app.services import archive
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def archive_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(archive, "db", db)
+    monkeypatch.setattr(complaints, "db", db)
+    return db
+
+
+def complaint(days_old, **fields):
+    created = NOW - timedelta(days=days_old)
+    return {
+        "village_name": "Rampur", "villager_phone": "900", "status": "Resolved", "complaint_name": f"{days_old}d",
+        "complaint_desc": "", "location": "", "attachments": [],
+        "created_at": created, "resolved_at": created + timedelta(days=1), "reopen_count": 0, **fields,
+    }
+
+
+def titles(response):
+    return [c["complaint_name"] for c in json.loads(response.body)]
+
+
+def test_old_resolved_complaints_move_to_the_archive(archive_db, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_BATCH_SIZE", 2)
+
+    async def run():
+        await archive_db.complaints.insert_many([
+            complaint(800), complaint(700), complaint(600),
+            complaint(900, status="Pending", resolved_at=None),
+            complaint(10),
+        ])
+        moved = await archive.archive_collection(archive.POLICIES["complaints"])
+        hot = await archive_db.complaints.find({}, {"complaint_name": 1}).to_list(None)
+        cold = await archive_db.complaints_archive.find({}, {"complaint_name": 1, "archived_at": 1}).to_list(None)
+        return moved, hot, cold
+
+    moved, hot, cold = asyncio.run(run())
+    assert moved == 3
+    assert sorted(d["complaint_name"] for d in hot) == ["10d", "900d"]
+    assert sorted(d["complaint_name"] for d in cold) == ["600d", "700d", "800d"]
+    assert all("archived_at" in d for d in cold)
+
+
+class ReopenAfterRead:
+    """db stand-in whose complaints.find reopens the complaint before returning it."""
+
+    def __init__(self, db, complaint_id):
+        self._db, self._complaint_id = db, complaint_id
+
+    def __getitem__(self, name):
+        if name != "complaints":
+            return self._db[name]
+        db, complaint_id, collection = self._db, self._complaint_id, self._db[name]
+
+        class Hot:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            def find(self, *args, **kwargs):
+                cursor = collection.find(*args, **kwargs)
+                to_list = cursor.to_list
+
+                async def reopened(length):
+                    docs = await to_list(length)
+                    await db.complaints.update_one({"_id": complaint_id}, {"$set": {"status": "Pending"}})
+                    return docs
+                cursor.to_list = reopened
+                return cursor
+        return Hot()
+
+
+def test_changed_complaint_stays_hot_without_a_copy(archive_db, monkeypatch):
+    async def run():
+        result = await archive_db.complaints.insert_one(complaint(800))
+        monkeypatch.setattr(archive, "db", ReopenAfterRead(archive_db, result.inserted_id))
+        moved = await archive.archive_batch(archive.POLICIES["complaints"])
+        return moved, await archive_db.complaints.count_documents({}), await archive_db.complaints_archive.count_documents({})
+
+    assert asyncio.run(run()) == (0, 1, 0)
+
+
+def test_reads_reach_the_archive_only_for_old_ranges(archive_db):
+    async def run():
+        await archive_db.complaints.insert_many([complaint(800), complaint(10)])
+        await archive.archive_collection(archive.POLICIES["complaints"])
+
+        recent = await complaints.get_complaints_by_villager("900", start=None, end=None)
+        ranged = await complaints.get_complaints_by_villager("900", start=(NOW - timedelta(days=900)).date(), end=None)
+        return recent, ranged
+
+    recent, ranged = asyncio.run(run())
+    assert titles(recent) == ["10d"]
+    assert titles(ranged) == ["10d", "800d"]
+
+
+def test_only_idle_discussions_are_archived(archive_db):
+    old = NOW - timedelta(days=800)
+
+    async def run():
+        await archive_db.discussions.insert_many([
+            {"content": "quiet", "created_at": old, "replies": [{"created_at": old}]},
+            {"content": "upvoted", "created_at": old, "updated_at": NOW - timedelta(days=3)},
+            {"content": "commented", "created_at": old, "replies": [{"created_at": old}, {"created_at": NOW}]},
+            {"content": "new", "created_at": NOW},
+        ])
+        await archive.archive_collection(archive.POLICIES["discussions"])
+        hot = await archive_db.discussions.find({}, {"content": 1}).to_list(None)
+        cold = await archive_db.discussions_archive.find({}, {"content": 1}).to_list(None)
+        return [d["content"] for d in hot], [d["content"] for d in cold]
+
+    hot, cold = asyncio.run(run())
+    assert hot == ["upvoted", "commented", "new"] and cold == ["quiet"]
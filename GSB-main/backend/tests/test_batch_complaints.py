@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import BackgroundTasks
+
+from app.routers import complaints
+from app.schemas import BatchReopenRequest
+from app.services import attachments, complaint_stats
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def complaints_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    for module in (complaints, complaint_stats, attachments):
+        monkeypatch.setattr(module, "db", db)
+    return db
+
+
+def complaint(**fields):
+    return {
+        "village_name": "Rampur", "villager_phone": "900", "status": "Pending",
+        "created_at": datetime.now(timezone.utc), "reopen_count": 0, **fields,
+    }
+
+
+def resolve_batch(ids):
+    return complaints.resolve_complaints_batch(
+        BackgroundTasks(), official_id="G1", complaint_ids=ids, resolution_notes="Drive", files=None
+    )
+
+
+def test_batch_resolve_reports_each_complaint(complaints_db):
+    async def run():
+        await complaints_db.government_officials.insert_one({"government_id": "G1", "village_name": "Rampur", "name": "Asha"})
+        result = await complaints_db.complaints.insert_many([
+            complaint(),
+            complaint(),
+            complaint(village_name="Other"),
+            complaint(created_at=datetime.now(timezone.utc) - timedelta(days=20)),
+        ])
+        ok1, ok2, other, old = map(str, result.inserted_ids)
+        report = await resolve_batch([ok1, ok2, ok1, other, old, "bad", str(ObjectId())])
+        docs = await complaints_db.complaints.find({}, {"status": 1}).to_list(None)
+        return report, [d["status"] for d in docs]
+
+    report, statuses = asyncio.run(run())
+    assert (report["resolved"], report["failed"]) == (2, 4)
+    assert [r.get("status_code") for r in report["results"]] == [None, None, 403, 403, 400, 404]
+    assert statuses == ["Resolved", "Resolved", "Pending", "Pending"]
+
+
+def test_batch_reopen_moves_each_tier_once(complaints_db):
+    async def run():
+        result = await complaints_db.complaints.insert_many([
+            complaint(status="Resolved"),
+            complaint(status="Resolved", reopen_count=1),
+            complaint(status="Resolved", villager_phone="901"),
+        ])
+        ids = list(map(str, result.inserted_ids))
+        first = await complaints.reopen_complaints_batch(BatchReopenRequest(phone_number="900", complaint_ids=ids))
+        again = await complaints.reopen_complaints_batch(BatchReopenRequest(phone_number="900", complaint_ids=ids[:1]))
+        docs = await complaints_db.complaints.find({}, {"status": 1, "reopen_count": 1}).to_list(None)
+        return first, again, [(d["status"], d["reopen_count"]) for d in docs]
+
+    first, again, docs = asyncio.run(run())
+    assert (first["reopened"], first["failed"]) == (2, 1)
+    assert again["results"][0]["status_code"] == 400
+    assert docs == [("Pending", 1), ("Migrated to Higher Officials", 2), ("Resolved", 0)]
+
+
+def test_batch_size_is_capped(complaints_db, monkeypatch):
+    monkeypatch.setattr(complaints, "COMPLAINT_BATCH_LIMIT", 2)
+    with pytest.raises(complaints.HTTPException) as error:
+        complaints.parse_batch_ids([str(ObjectId()) for _ in range(3)])
+    assert error.value.status_code == 400
+
+
+def test_rejected_resolve_uploads_nothing(complaints_db, monkeypatch):
+    uploads = []
+
+    async def store_upload(file, folder):
+        uploads.append(file)
+
+    monkeypatch.setattr(complaints, "store_upload", store_upload)
+
+    async def run():
+        await complaints_db.government_officials.insert_one({"government_id": "G1", "village_name": "Rampur", "name": "Asha"})
+        other = await complaints_db.complaints.insert_one(complaint(village_name="Other"))
+        codes = []
+        for cid in (str(other.inserted_id), str(ObjectId())):
+            try:
+                await complaints.resolve_complaint(cid, BackgroundTasks(), official_id="G1", resolution_notes=None, files=[object()])
+            except complaints.HTTPException as e:
+                codes.append(e.status_code)
+        return codes
+
+    assert asyncio.run(run()) == [403, 404]
+    assert uploads == []
+
+
+def test_oversized_later_file_releases_earlier_refs(complaints_db, monkeypatch):
+    released = []
+
+    class Upload:
+        def __init__(self, filename):
+            self.filename = filename
+
+    async def store_upload(file, folder):
+        if file.filename == "big.jpg":
+            raise complaints.HTTPException(status_code=413, detail="too big")
+        return attachments.StoredUpload(f"https://cdn/{file.filename}", file.filename, "image/jpeg", 1, None, False)
+
+    async def release_attachments(urls):
+        released.extend(urls)
+
+    monkeypatch.setattr(complaints, "store_upload", store_upload)
+    monkeypatch.setattr(complaints, "release_attachments", release_attachments)
+    with pytest.raises(complaints.HTTPException) as error:
+        asyncio.run(complaints.store_uploads([Upload("a.jpg"), Upload("b.jpg"), Upload("big.jpg")], "complaints"))
+    assert error.value.status_code == 413
+    assert released == ["https://cdn/a.jpg", "https://cdn/b.jpg"]
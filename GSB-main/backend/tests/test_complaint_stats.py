@@ -0,0 +1,99 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.routers import complaints
+from app.services import complaint_stats
+from app.utils.escalation import ESCALATION_DAYS
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+# 2026-03-02 is a Monday; 06:00 UTC is 11:30 IST, well inside the local day
+MONDAY = datetime(2026, 3, 2, 6, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def stats_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(complaint_stats, "db", db)
+    monkeypatch.setattr(complaints, "db", db)
+    return db
+
+
+def complaint(**fields):
+    return {"village_name": "Rampur", "status": "Pending", "created_at": MONDAY, "reopen_count": 0, **fields}
+
+
+def test_events_fill_day_and_week_buckets(stats_db):
+    async def run():
+        await complaint_stats.record_raised(complaint())
+        await complaint_stats.record_raised(complaint())
+        await complaint_stats.record_resolved(complaint(), MONDAY + timedelta(hours=6))
+        await complaint_stats.record_reopened(complaint(status="Resolved"), MONDAY + timedelta(days=1), escalated=False)
+        days = await complaint_stats.query_stats("Rampur", date(2026, 3, 2), date(2026, 3, 3))
+        weeks = await complaint_stats.query_stats("Rampur", date(2026, 3, 2), date(2026, 3, 8), "week")
+        return days, weeks
+
+    days, weeks = asyncio.run(run())
+    monday, tuesday = days["buckets"]
+    assert (monday["raised"], monday["resolved"], monday["reopened"]) == (2, 1, 0)
+    assert monday["mean_resolution_hours"] == 6.0
+    assert monday["resolved_by_tier"]["First Attempt"] == 1
+    assert tuesday["reopened"] == 1 and tuesday["raised"] == 0
+    assert days["totals"]["reopen_rate"] == 1.0
+
+    assert len(weeks["buckets"]) == 1
+    assert weeks["buckets"][0]["period"] == "2026-W10"
+    assert weeks["totals"] == days["totals"]
+
+
+def test_re_resolving_is_not_counted_twice(stats_db):
+    async def run():
+        await complaint_stats.record_resolved(complaint(status="Resolved"), MONDAY)
+        return await complaint_stats.query_stats("Rampur", date(2026, 3, 2), date(2026, 3, 2))
+
+    assert asyncio.run(run())["totals"]["resolved"] == 0
+
+
+def test_sweeper_counts_each_time_escalation_once(stats_db):
+    old = datetime.now(timezone.utc) - timedelta(days=ESCALATION_DAYS + 2)
+
+    async def run():
+        await stats_db.complaints.insert_many([complaint(created_at=old), complaint(created_at=datetime.now(timezone.utc))])
+        first = await complaint_stats.sweep_escalations()
+        second = await complaint_stats.sweep_escalations()
+        escalated_on = complaint_stats.escalation_time(old).astimezone(complaint_stats.LOCAL_TZ).date()
+        report = await complaint_stats.query_stats("Rampur", escalated_on, escalated_on)
+        return first, second, report["totals"]["escalated"]
+
+    assert asyncio.run(run()) == (1, 0, 1)
+
+
+def test_rebuild_matches_incremental_counts(stats_db):
+    resolved = complaint(status="Resolved", resolved_at=MONDAY + timedelta(hours=3))
+
+    async def run():
+        await stats_db.complaints.insert_many([complaint(), resolved])
+        await complaint_stats.rebuild_complaint_stats()
+        return await complaint_stats.query_stats("Rampur", date(2026, 3, 2), date(2026, 3, 2))
+
+    totals = asyncio.run(run())["totals"]
+    assert (totals["raised"], totals["resolved"], totals["mean_resolution_hours"]) == (2, 1, 3.0)
+
+
+def test_analytics_are_for_officials_only(stats_db):
+    async def run():
+        await stats_db.government_officials.insert_one({"government_id": "G1", "village_name": "Rampur"})
+        await complaint_stats.record_raised(complaint())
+        allowed = await complaints.get_complaint_analytics(
+            government_id="G1", village_name="Rampur", start=date(2026, 3, 2), end=date(2026, 3, 2), granularity="day"
+        )
+        with pytest.raises(complaints.HTTPException) as denied:
+            await complaints.get_complaint_analytics(
+                government_id="nobody", village_name="Rampur", start=None, end=None, granularity="day"
+            )
+        return allowed, denied.value.status_code
+
+    allowed, denied = asyncio.run(run())
+    assert allowed and denied == 403
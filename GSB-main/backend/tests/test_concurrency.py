@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import BackgroundTasks, HTTPException
+
+from app.routers import community, complaints, proposals
+from app.schemas import ReopenRequest
+from app import database
+from app.services import attachments, complaint_stats, jobs, rollups
+from app.services import proposals as proposal_service
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+CLICKS = 20
+
+
+class Interleaving:
+    """
+    Wraps a mongomock collection so every awaited call yields to the event loop
+    first, like a network round trip would. Without this, mongomock runs each
+    request to completion and concurrent requests never interleave.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0)
+            return await attr(*args, **kwargs)
+        return call
+
+
+class InterleavingDB:
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        return Interleaving(getattr(self._db, name))
+
+    def __getitem__(self, name):
+        return Interleaving(self._db[name])
+
+
+@pytest.fixture
+def db(monkeypatch):
+    raw = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    wrapped = InterleavingDB(raw)
+    for module in (complaints, community, proposals, proposal_service, complaint_stats, attachments, jobs, rollups):
+        monkeypatch.setattr(module, "db", wrapped)
+    # mongomock has no transactions; approvals take the queued path
+    monkeypatch.setattr(database, "transactions_supported", False)
+    monkeypatch.setattr(proposal_service, "APPROVAL_JOB_DELAY_SECONDS", 0)
+    return raw
+
+
+async def hammer(calls):
+    """Runs the calls concurrently; returns (successes, HTTP status codes of failures)."""
+    outcomes = await asyncio.gather(*calls, return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, Exception) and not isinstance(outcome, HTTPException):
+            raise outcome
+    failures = [o.status_code for o in outcomes if isinstance(o, HTTPException)]
+    return [o for o in outcomes if not isinstance(o, Exception)], failures
+
+
+def test_concurrent_reopens_move_one_tier_at_a_time(db):
+    async def run():
+        result = await db.complaints.insert_one({
+            "village_name": "Rampur", "villager_phone": "900", "status": "Resolved",
+            "created_at": datetime.now(timezone.utc), "reopen_count": 0,
+        })
+        cid = str(result.inserted_id)
+        request = ReopenRequest(phone_number="900")
+        first = await hammer([complaints.reopen_complaint(cid, request) for _ in range(CLICKS)])
+        after_first = await db.complaints.find_one({"_id": result.inserted_id})
+
+        await db.complaints.update_one({"_id": result.inserted_id}, {"$set": {"status": "Resolved"}})
+        second = await hammer([complaints.reopen_complaint(cid, request) for _ in range(CLICKS)])
+        after_second = await db.complaints.find_one({"_id": result.inserted_id})
+        stats = await db.complaint_stats.find_one({"granularity": "day"})
+        return first, after_first, second, after_second, stats
+
+    first, after_first, second, after_second, stats = asyncio.run(run())
+    assert len(first[0]) == 1 and set(first[1]) <= {400, 409}
+    assert (after_first["status"], after_first["reopen_count"]) == ("Pending", 1)
+    assert len(second[0]) == 1
+    assert (after_second["status"], after_second["reopen_count"]) == ("Migrated to Higher Officials", 2)
+    assert (stats["reopened"], stats["escalated"]) == (2, 1)
+
+
+def test_concurrent_resolves_count_once(db):
+    async def run():
+        await db.government_officials.insert_one({"government_id": "G1", "village_name": "Rampur", "name": "Asha"})
+        result = await db.complaints.insert_one({
+            "village_name": "Rampur", "villager_phone": "900", "status": "Pending",
+            "created_at": datetime.now(timezone.utc), "reopen_count": 0,
+        })
+        cid = str(result.inserted_id)
+        done, failed = await hammer([
+            complaints.resolve_complaint(cid, BackgroundTasks(), official_id="G1", resolution_notes=None, files=None)
+            for _ in range(CLICKS)
+        ])
+        stats = await db.complaint_stats.find_one({"granularity": "day"})
+        return done, failed, stats
+
+    done, failed, stats = asyncio.run(run())
+    assert len(done) == CLICKS and not failed
+    assert stats["resolved"] == 1
+
+
+def test_concurrent_upvotes_never_drift(db):
+    async def run():
+        voters = [{"_id": ObjectId(), "village_name": "Rampur", "name": f"v{i}"} for i in range(CLICKS)]
+        await db.villagers.insert_many(voters)
+        result = await db.discussions.insert_one({"village_name": "Rampur", "upvotes": 0, "upvoters": []})
+        did = str(result.inserted_id)
+
+        await hammer([community.upvote_discussion(did, user_id=str(v["_id"])) for v in voters])
+        everyone = await db.discussions.find_one({"_id": result.inserted_id})
+        # One voter clicking many times at once: each click toggles or gets a 409
+        toggles, failed = await hammer([community.upvote_discussion(did, user_id=str(voters[0]["_id"])) for _ in range(CLICKS)])
+        toggled = await db.discussions.find_one({"_id": result.inserted_id})
+        return everyone, toggles, failed, toggled
+
+    everyone, toggles, failed, toggled = asyncio.run(run())
+    assert everyone["upvotes"] == len(everyone["upvoters"]) == CLICKS
+    assert set(failed) <= {409}
+    assert toggled["upvotes"] == len(toggled["upvoters"]) == CLICKS - len(toggles) % 2
+
+
+def test_concurrent_reviews_have_one_winner(db):
+    async def run():
+        official = await db.government_officials.insert_one({"government_id": "G1", "village_name": "Rampur"})
+        oid = str(official.inserted_id)
+        result = await db.proposed_projects.insert_one({"title": "Well", "status": "Pending"})
+        pid = str(result.inserted_id)
+        calls = [proposals.approve_proposal(pid, official_id=oid) for _ in range(CLICKS // 2)]
+        calls += [proposals.reject_proposal(pid, official_id=oid) for _ in range(CLICKS // 2)]
+        outcome = await hammer(calls)
+        await jobs.run_pending()
+        projects = await db.projects.count_documents({})
+        return outcome, await db.proposed_projects.find_one({"_id": result.inserted_id}), projects
+
+    (done, failed), proposal, projects = asyncio.run(run())
+    assert len(done) == 1 and failed == [404] * (CLICKS - 1)
+    assert projects == (1 if proposal["status"] == "Approved" else 0)
+    expected = "Project Proposal APPROVED successfully" if proposal["status"] == "Approved" else "Project Proposal REJECTED"
+    assert done[0]["message"] == expected
+
+
+def test_concurrent_first_posts_share_one_stored_alias(db):
+    async def run():
+        villager = {"_id": ObjectId(), "village_name": "Rampur", "name": "Asha"}
+        await db.villagers.insert_one(villager)
+        names, _ = await hammer([community.anonymous_identity(dict(villager)) for _ in range(CLICKS)])
+        stored = await db.villagers.find_one({"_id": villager["_id"]})
+        return names, stored["anonymous_identity"]
+
+    names, stored = asyncio.run(run())
+    assert set(names) == {stored}
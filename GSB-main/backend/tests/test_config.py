@@ -0,0 +1,29 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+
+REQUIRED = {"MONGO_URI": "mongodb://localhost:27017", "DB_NAME": "gram_sahayak_test"}
+
+
+def test_fields_map_to_upper_case_env_vars():
+    settings = Settings.from_env({**REQUIRED, "MONGO_MAX_POOL_SIZE": "25", "CACHE_BACKEND": "Mongo"})
+    assert settings.mongo_max_pool_size == 25
+    assert settings.cache_backend == "mongo"
+    assert settings.escalation_days == 14
+
+
+@pytest.mark.parametrize("name, value", [
+    ("MONGO_MAX_POOL_SIZE", "0"),
+    ("STORAGE_BACKEND", "ftp"),
+    ("MONGO_SECONDARY_READ_PREFERENCE", "closest"),
+    ("LLM_TIMEOUT_SECONDS", "abc"),
+])
+def test_invalid_values_are_rejected(name, value):
+    with pytest.raises(ValidationError):
+        Settings.from_env({**REQUIRED, name: value})
+
+
+def test_database_settings_are_required():
+    with pytest.raises(ValidationError):
+        Settings.from_env({})
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.routers.complaints import process_complaint_status
+from app.services.search import complaint_filters
+
+mongomock = pytest.importorskip("mongomock")
+
+AGES_DAYS = [0, 13.9, 14.0, 14.5, 14.99, 15.01, 20]
+
+
+@pytest.fixture
+def complaints():
+    now = datetime.now(timezone.utc)
+    collection = mongomock.MongoClient().db.complaints
+    docs = []
+    for age in AGES_DAYS:
+        for status in ("Pending", "Resolved", "Migrated to Higher Officials"):
+            for reopen_count in (0, 1, 2):
+                docs.append({
+                    "_id": ObjectId(),
+                    "status": status,
+                    "reopen_count": reopen_count,
+                    "created_at": now - timedelta(days=age),
+                })
+    collection.insert_many(docs)
+    return collection
+
+
+def shown(collection):
+    return {doc["_id"]: process_complaint_status(dict(doc)) for doc in collection.find()}
+
+
+def matched(collection, status=None, tier=None):
+    clauses = complaint_filters(status, tier)
+    query = {"$and": clauses} if clauses else {}
+    return {doc["_id"] for doc in collection.find(query)}
+
+
+@pytest.mark.parametrize("status", ["Pending", "Resolved", "Migrated to Higher Officials"])
+def test_status_filter_matches_displayed_status(complaints, status):
+    expected = {oid for oid, c in shown(complaints).items() if c["status"] == status}
+    assert matched(complaints, status=status) == expected
+
+
+@pytest.mark.parametrize("tier", ["First Attempt", "Second Attempt", "Escalated"])
+def test_tier_filter_matches_displayed_tier(complaints, tier):
+    expected = {oid for oid, c in shown(complaints).items() if c["resolution_tier"] == tier}
+    assert matched(complaints, tier=tier) == expected
+
+
+@pytest.mark.parametrize("age_days, escalated", [(14.5, False), (14.99, False), (15.01, True)])
+def test_pending_escalates_after_fifteen_full_days(age_days, escalated):
+    doc = {"_id": ObjectId(), "status": "Pending", "created_at": datetime.now(timezone.utc) - timedelta(days=age_days)}
+    assert process_complaint_status(doc)["is_escalated"] is escalated
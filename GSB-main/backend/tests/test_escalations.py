@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import escalations
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+START = datetime(2026, 3, 2, 6, 0)
+PROJECTION = {"complaint_name": 1, "created_at": 1}
+
+
+@pytest.fixture
+def escalations_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(escalations, "db", db)
+    return db
+
+
+def complaint(n, village="Rampur", taluk="Sadar", district="Varanasi", escalated=True):
+    doc = {
+        "complaint_name": f"c{n}", "village_name": village, "taluk": taluk, "district": district,
+        "state": "Uttar Pradesh", "status": "Pending", "created_at": START + timedelta(hours=n),
+    }
+    if escalated:
+        doc["escalated_at"] = doc["created_at"] + timedelta(days=14)
+    return doc
+
+
+def test_pages_oldest_first_within_scope(escalations_db):
+    async def run():
+        await escalations_db.complaints.insert_many(
+            [complaint(n) for n in (3, 1, 4, 2)]
+            + [complaint(0, escalated=False), complaint(5, village="Other", district="Prayagraj")]
+        )
+        scope = escalations.scope_filter("Uttar Pradesh", "Varanasi", None, None)
+        names, cursor = [], None
+        while True:
+            page, cursor = await escalations.list_escalations(scope, PROJECTION, 3, cursor)
+            names.append([c["complaint_name"] for c in page])
+            if not cursor:
+                return names
+
+    assert asyncio.run(run()) == [["c1", "c2", "c3"], ["c4"]]
+
+
+def test_summary_groups_one_level_down(escalations_db):
+    async def run():
+        await escalations_db.complaints.insert_many([
+            complaint(1), complaint(2), complaint(3, district="Prayagraj"), complaint(4, escalated=False),
+        ])
+        return await escalations.escalation_summary(escalations.scope_filter("Uttar Pradesh", None, None, None))
+
+    summary = asyncio.run(run())
+    assert summary["level"] == "district" and summary["total"] == 3
+    assert [(g["name"], g["count"]) for g in summary["groups"]] == [("Varanasi", 2), ("Prayagraj", 1)]
+    assert summary["groups"][0]["oldest_created_at"] == START + timedelta(hours=1)
+
+
+def test_backfill_copies_villager_location(escalations_db):
+    async def run():
+        await escalations_db.villagers.insert_one(
+            {"phone_number": "900", "taluk": "Sadar", "district": "Varanasi", "state": "Uttar Pradesh"}
+        )
+        await escalations_db.complaints.insert_many([
+            {"villager_phone": "900", "status": "Migrated to Higher Officials", "created_at": START},
+            {"villager_phone": "missing", "status": "Pending", "created_at": START},
+        ])
+        updated = await escalations.backfill_complaint_locations()
+        again = await escalations.backfill_complaint_locations()
+        docs = await escalations_db.complaints.find({}, {"_id": 0}).sort("villager_phone", 1).to_list(None)
+        return updated, again, docs
+
+    updated, again, (known, orphan) = asyncio.run(run())
+    assert (updated, again) == (1, 0)
+    assert (known["district"], known["escalated_at"]) == ("Varanasi", START)
+    assert orphan["state"] is None and "escalated_at" not in orphan
+
+
+def test_bad_cursor_is_rejected():
+    assert escalations.decode_cursor("not-a-cursor") is None
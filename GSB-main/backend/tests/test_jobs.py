@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import jobs
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(jobs, "db", db)
+    monkeypatch.setattr(jobs, "_handlers", {})
+    monkeypatch.setattr(jobs, "backoff_seconds", lambda attempts: 0)
+    return db
+
+
+def test_idempotency_key_enqueues_once(queue):
+    calls = []
+
+    @jobs.handler("test.record")
+    async def record(payload):
+        calls.append(payload["n"])
+
+    async def run():
+        await jobs.ensure_indexes()
+        first = await jobs.enqueue("test.record", {"n": 1}, idempotency_key="k1")
+        second = await jobs.enqueue("test.record", {"n": 1}, idempotency_key="k1")
+        ran = await jobs.run_pending()
+        return first, second, ran
+
+    first, second, ran = asyncio.run(run())
+    assert first is not None and second is None
+    assert ran == 1 and calls == [1]
+
+
+def test_failed_job_is_retried_then_succeeds(queue):
+    attempts = []
+
+    @jobs.handler("test.flaky")
+    async def flaky(payload):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("temporary")
+
+    async def run():
+        job_id = await jobs.enqueue("test.flaky", {})
+        await jobs.run_pending()
+        return await queue.jobs.find_one({"_id": job_id})
+
+    job = asyncio.run(run())
+    assert len(attempts) == 3
+    assert job["status"] == "done" and job["attempts"] == 3
+
+
+def test_exhausted_job_moves_to_dead_letters(queue):
+    @jobs.handler("test.broken")
+    async def broken(payload):
+        raise ValueError("bad payload")
+
+    async def run():
+        job_id = await jobs.enqueue("test.broken", {}, max_attempts=2)
+        await jobs.run_pending()
+        return await queue.jobs.find_one({"_id": job_id}), await queue.jobs_dead.find_one({"_id": job_id})
+
+    live, dead = asyncio.run(run())
+    assert live is None
+    assert dead["attempts"] == 2 and dead["last_error"] == "ValueError: bad payload"
+
+
+def test_expired_lease_is_reclaimed(queue):
+    calls = []
+
+    @jobs.handler("test.record")
+    async def record(payload):
+        calls.append(1)
+
+    async def run():
+        now = datetime.now(timezone.utc)
+        await queue.jobs.insert_one({
+            "kind": "test.record", "payload": {}, "status": "running", "attempts": 1,
+            "max_attempts": 5, "run_at": now - timedelta(minutes=5),
+            "started_at": now - timedelta(minutes=5), "lease_until": now - timedelta(seconds=1),
+        })
+        return await jobs.run_pending()
+
+    assert asyncio.run(run()) == 1
+    assert calls == [1]
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        asyncio.run(jobs.enqueue("test.missing", {}))
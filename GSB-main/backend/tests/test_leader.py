@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import leader
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def locks(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(leader, "db", db)
+    return db
+
+
+def test_second_instance_cannot_take_a_live_lease(locks, monkeypatch):
+    async def run():
+        first = await leader.LeaderLock("startup").acquire()
+        monkeypatch.setattr(leader, "INSTANCE_ID", "other-worker")
+        second = await leader.LeaderLock("startup").acquire()
+        return first, second
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_expired_lease_is_taken_over(locks, monkeypatch):
+    async def run():
+        await locks.leader_locks.insert_one({
+            "_id": "startup", "owner": "dead-worker",
+            "expires_at": datetime.now(timezone.utc) - timedelta(seconds=1),
+        })
+        taken = await leader.LeaderLock("startup").acquire()
+        doc = await locks.leader_locks.find_one({"_id": "startup"})
+        return taken, doc["owner"]
+
+    assert asyncio.run(run()) == (True, leader.INSTANCE_ID)
+
+
+def test_run_once_skips_when_another_worker_holds_the_lock(locks):
+    calls = []
+
+    async def job():
+        calls.append(1)
+
+    async def run():
+        await locks.leader_locks.insert_one({
+            "_id": "startup", "owner": "other-worker",
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=30),
+        })
+        skipped = await leader.run_once("startup", job)
+        await locks.leader_locks.delete_many({})
+        ran = await leader.run_once("startup", job)
+        released = await locks.leader_locks.count_documents({})
+        return skipped, ran, released
+
+    assert asyncio.run(run()) == (False, True, 0)
+    assert calls == [1]
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app import database
+from app.routers import projects, proposals
+from app.schemas import ProposedProjectCreate
+from app.services import jobs, rollups
+from app.services import proposals as proposal_service
+from app.services.proposals import normalise_title
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def proposals_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(proposals, "db", db)
+    monkeypatch.setattr(proposal_service, "db", db)
+    monkeypatch.setattr(projects, "db", db)
+    monkeypatch.setattr(jobs, "db", db)
+    monkeypatch.setattr(rollups, "db", db)
+    return db
+
+
+def body(response):
+    return json.loads(response.body)
+
+
+def test_titles_normalise_to_one_key():
+    assert normalise_title("Repair of Village Pond - Rampur", "Rampur") == normalise_title("village pond REPAIR")
+    assert normalise_title("New Library Building") != normalise_title("New School Building")
+
+
+def test_repeat_proposals_merge_and_votes_count_once(proposals_db):
+    async def run():
+        await proposal_service.ensure_indexes()
+        voter = await proposals_db.villagers.insert_one({"village_name": "Rampur"})
+        outsider = await proposals_db.villagers.insert_one({"village_name": "Other"})
+        first = await proposals.create_proposal(ProposedProjectCreate(village_id="Rampur", proposed_project_title="Repair of Village Pond"))
+        again = await proposals.create_proposal(ProposedProjectCreate(village_id="Rampur", proposed_project_title="village pond repair - Rampur"))
+
+        vote = await proposals.vote_proposal(first["id"], user_id=str(voter.inserted_id))
+        errors = []
+        for user in (voter, outsider):
+            try:
+                await proposals.vote_proposal(first["id"], user_id=str(user.inserted_id))
+            except HTTPException as e:
+                errors.append(e.status_code)
+        stored = await proposals_db.proposed_projects.find_one({})
+        return first, again, vote, errors, stored, await proposals_db.proposed_projects.count_documents({})
+
+    first, again, vote, errors, stored, count = asyncio.run(run())
+    assert first["id"] == again["id"] and again["proposal_count"] == 2
+    assert vote["vote_count"] == 1 and errors == [409, 403]
+    assert (count, stored["support"]) == (1, 3)
+
+
+def test_list_is_ranked_and_paged(proposals_db):
+    async def run():
+        await proposals_db.proposed_projects.insert_many([
+            {"village_id": "Rampur", "proposed_project_title": f"p{support}", "status": "Pending",
+             "created_at": datetime.utcnow(), "support": support}
+            for support in (2, 5, 1, 5, 3)
+        ] + [{"village_id": "Rampur", "proposed_project_title": "dup", "status": "Merged",
+              "created_at": datetime.utcnow(), "support": 9}])
+        pages, cursor = [], None
+        while True:
+            page = body(await proposals.get_proposals(village_id="Rampur", status=None, limit=2, cursor=cursor))
+            pages.append([p["proposed_project_title"] for p in page["results"]])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return pages
+
+    assert asyncio.run(run()) == [["p5", "p5"], ["p3", "p2"], ["p1"]]
+
+
+def test_existing_duplicates_are_merged(proposals_db):
+    async def run():
+        await proposals_db.proposed_projects.insert_many([
+            {"village_id": "Rampur", "proposed_project_title": "Solar Street Lights for Market - Rampur", "status": "Pending"},
+            {"village_id": "Rampur", "proposed_project_title": "solar street lights market", "status": "Pending"},
+            {"village_id": "Kishanpur", "proposed_project_title": "Solar Street Lights for Market", "status": "Pending"},
+        ])
+        merged = await proposal_service.merge_duplicate_proposals()
+        return merged, await proposals_db.proposed_projects.find({}, {"_id": 0, "status": 1, "proposal_count": 1}).to_list(None)
+
+    merged, docs = asyncio.run(run())
+    assert merged == 1
+    assert docs == [
+        {"status": "Pending", "proposal_count": 2},
+        {"status": "Merged", "proposal_count": 1},
+        {"status": "Pending", "proposal_count": 1},
+    ]
+
+
+@pytest.mark.parametrize("transactions", [True, False])
+def test_approval_creates_linked_project_and_rollup(proposals_db, monkeypatch, transactions):
+    if transactions:
+        # mongomock has no sessions; run the transactional body directly
+        monkeypatch.setattr(database, "run_in_transaction", lambda work, fallback: work(None))
+    else:
+        monkeypatch.setattr(database, "transactions_supported", False)
+
+    async def run():
+        official = await proposals_db.government_officials.insert_one({"name": "Asha"})
+        created = await proposals.create_proposal(ProposedProjectCreate(village_id="Rampur", proposed_project_title="Village Pond Repair"))
+        approved = await proposals.approve_proposal(created["id"], official_id=str(official.inserted_id))
+        # The queued job waits for the approval write instead of failing its first run
+        early = await jobs.run_pending()
+        await proposals_db.jobs.update_many({}, {"$set": {"run_at": datetime.now(timezone.utc)}})
+        await jobs.run_pending()
+        project = await proposals_db.projects.find_one({})
+        proposal = await proposals_db.proposed_projects.find_one({})
+        rollup = await proposals_db.project_rollups.find_one({"_id": "village:Rampur"})
+
+        await projects.update_project_details(approved["project_id"], projects.ProjectDetailsUpdate(
+            contractor_id="C1", allocated_budget=5000, due_date=datetime(2027, 3, 31),
+            start_point={"lat": 25.1, "lng": 82.1}, end_point={"lat": 25.2, "lng": 82.2},
+        ))
+        planned = await proposals_db.projects.find_one({})
+        contractor = await proposals_db.project_rollups.find_one({"_id": "contractor:C1"})
+        return early, approved, project, proposal, rollup, planned, contractor
+
+    early, approved, project, proposal, rollup, planned, contractor = asyncio.run(run())
+    assert early == 0
+    assert approved["project_id"] == str(project["_id"]) == str(proposal["project_id"])
+    assert project["proposal_id"] == proposal["_id"] and proposal["status"] == "Approved"
+    assert (project["project_name"], project["approved_by"]) == ("Village Pond Repair", "Asha")
+    assert rollup["project_count"] == 1
+    assert planned["route"]["type"] == "LineString" and planned["due_date"] == datetime(2027, 3, 31)
+    assert (contractor["project_count"], contractor["budget_committed"]) == (1, 5000)
+
+
+def test_votes_cannot_be_withdrawn_after_the_decision(proposals_db, monkeypatch):
+    monkeypatch.setattr(database, "transactions_supported", False)
+
+    async def run():
+        official = await proposals_db.government_officials.insert_one({"name": "Asha"})
+        voter = await proposals_db.villagers.insert_one({"village_name": "Rampur"})
+        outsider = await proposals_db.villagers.insert_one({"village_name": "Other"})
+        created = await proposals.create_proposal(ProposedProjectCreate(village_id="Rampur", proposed_project_title="New Well"))
+        await proposals.vote_proposal(created["id"], user_id=str(voter.inserted_id))
+
+        errors = []
+        try:
+            await proposals.withdraw_vote(created["id"], user_id=str(outsider.inserted_id))
+        except HTTPException as e:
+            errors.append(e.status_code)
+        await proposals.reject_proposal(created["id"], official_id=str(official.inserted_id))
+        try:
+            await proposals.withdraw_vote(created["id"], user_id=str(voter.inserted_id))
+        except HTTPException as e:
+            errors.append(e.status_code)
+        proposal = await proposals_db.proposed_projects.find_one({})
+        return errors, proposal, await proposals_db.proposal_votes.count_documents({})
+
+    errors, proposal, votes = asyncio.run(run())
+    assert errors == [403, 404]
+    assert (proposal["vote_count"], proposal["support"], votes) == (1, 2, 1)
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBuckets, MongoBuckets, Rate
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+RATE = Rate(burst=3, per_minute=60)
+
+
+def test_memory_bucket_refills_over_time(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    buckets = MemoryBuckets()
+
+    async def run():
+        burst = [await buckets.take("k", RATE) for _ in range(4)]
+        clock[0] += 0.5
+        waiting = await buckets.take("k", RATE)
+        clock[0] += 0.5
+        refilled = await buckets.take("k", RATE)
+        return burst, waiting, refilled, await buckets.take("other", RATE)
+
+    burst, waiting, refilled, other = asyncio.run(run())
+    assert burst == [0, 0, 0, 1.0]
+    assert waiting == pytest.approx(0.5) and refilled == 0 and other == 0
+
+
+def test_mongo_bucket_is_shared():
+    collection = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"].rate_limits
+
+    async def run():
+        workers = [MongoBuckets(collection), MongoBuckets(collection)]
+        return [await workers[i % 2].take("k", RATE) for i in range(4)]
+
+    waits = asyncio.run(run())
+    assert waits[:3] == [0, 0, 0] and 0 < waits[3] <= 1
+
+
+class Login(BaseModel):
+    phone_number: str
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_buckets", MemoryBuckets())
+    monkeypatch.setitem(rate_limit.RATES, "login", RATE)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_IP_MULTIPLIER", 2)
+    app = FastAPI()
+
+    @app.post("/login", dependencies=[Depends(rate_limit.limit("login", "phone_number", kind="login"))])
+    async def login(credentials: Login):
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_route_answers_429_per_user_then_per_ip(client):
+    first = [client.post("/login", json={"phone_number": "900"}).status_code for _ in range(4)]
+    refused = client.post("/login", json={"phone_number": "900"})
+    # Other users still get in until the (larger) IP bucket runs dry
+    others = [client.post("/login", json={"phone_number": f"9{i:02}"}).status_code for i in range(1, 4)]
+
+    assert first == [200, 200, 200, 429]
+    assert refused.status_code == 429 and refused.headers["Retry-After"] == "1"
+    assert others == [200, 429, 429]
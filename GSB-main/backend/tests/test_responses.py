@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.routers import schemes
+from app.utils import compression
+from app.utils.compression import CompressionMiddleware, accepted_encodings
+from app.utils.responses import FastJSONResponse, not_modified, revalidate_headers, weak_etag
+
+NOW = datetime(2026, 1, 1)
+DOCS = [
+    {"_id": ObjectId(), "created_at": NOW, "status": "Pending"},
+    {"_id": ObjectId(), "created_at": NOW, "updated_at": NOW + timedelta(hours=1), "status": "Resolved"},
+]
+
+
+def test_etag_follows_ids_versions_and_derived_fields():
+    etag = weak_etag(DOCS, ("status",))
+    assert etag.startswith('W/"') and etag == weak_etag([dict(d) for d in DOCS], ("status",))
+
+    written = [DOCS[0], {**DOCS[1], "updated_at": NOW + timedelta(hours=2)}]
+    escalated = [{**DOCS[0], "status": "Migrated to Higher Officials"}, DOCS[1]]
+    assert len({etag, weak_etag(written, ("status",)), weak_etag(escalated, ("status",)),
+                weak_etag(DOCS[:1], ("status",)), weak_etag(DOCS, ("status",), "next")}) == 5
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/list")
+    async def listing(request: Request = None):
+        etag = weak_etag(DOCS)
+        return not_modified(request, etag) or FastJSONResponse(
+            [{"content": "village pond repair " * 20}] * 5, headers=revalidate_headers(etag)
+        )
+
+    return TestClient(app)
+
+
+def test_matching_if_none_match_gets_304(client):
+    first = client.get("/list")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+    assert client.get("/list", headers={"If-None-Match": etag}).status_code == 304
+    # Weak comparison, and any tag in the list may match
+    assert client.get("/list", headers={"If-None-Match": f'"x", {etag.removeprefix("W/")}'}).status_code == 304
+    assert client.get("/list", headers={"If-None-Match": 'W/"stale"'}).status_code == 200
+
+
+def test_compression_is_negotiated(client, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    gzipped = client.get("/list", headers={"Accept-Encoding": "br, gzip"})
+    refused = client.get("/list", headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip" and len(gzipped.json()) == 5
+    assert "Content-Encoding" not in refused.headers
+    assert accepted_encodings("br;q=0.8, gzip;q=0, *;q=bad") == {"br"}
+
+
+def test_brotli_is_preferred_when_installed(client):
+    pytest.importorskip("brotli")
+    response = client.get("/list", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_scheme_catalog_etags_are_weak():
+    def request(if_none_match):
+        return Request({"type": "http", "headers": [(b"if-none-match", if_none_match.encode())]})
+
+    etag = 'W/"abc"'
+    cached = schemes.catalog_response(request('"abc"'), b"[]", etag)
+    assert cached.status_code == 304 and cached.headers["Cache-Control"].startswith("public")
+    assert schemes.catalog_response(request('W/"old"'), b"[]", etag).status_code == 200
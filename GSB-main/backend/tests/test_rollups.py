@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from app.services import rollups
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def rollups_db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    monkeypatch.setattr(rollups, "db", db)
+    return db
+
+
+def test_rebuild_replaces_rollups_in_place(rollups_db):
+    async def run():
+        await rollups_db.projects.insert_many([
+            {"village_name": "Rampur", "contractor_id": "C1", "allocated_budget": 100, "status": "Completed", "category": "Water"},
+            {"village_name": "Rampur", "allocated_budget": 50, "status": "Ongoing", "category": "Roads",
+             "milestones": [{"status": "Completed"}, {"status": "Pending"}]},
+        ])
+        # Drifted counters, and a rollup whose projects are all gone
+        await rollups_db.project_rollups.insert_many([
+            {"_id": "village:Rampur", "project_count": 7, "budget_by_status": {"Stale": 1}},
+            {"_id": "village:Gone", "project_count": 1},
+        ])
+        rebuilt = await rollups.rebuild_rollups()
+        village = await rollups.get_rollup("village", "Rampur")
+        ids = sorted(d["_id"] for d in await rollups_db.project_rollups.find({}, {"_id": 1}).to_list(None))
+        return rebuilt, village, ids
+
+    rebuilt, village, ids = asyncio.run(run())
+    assert rebuilt == 2 and ids == ["contractor:C1", "village:Rampur"]
+    assert (village["project_count"], village["budget_committed"]) == (2, 150)
+    assert "Stale" not in village["budget_by_status"] and village["milestone_completion_pct"] == 50.0
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import slow_queries
+from app.utils.query_profiler import SlowQueryRecorder
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+FIND = {"find": "complaints", "filter": {"village_name": "Rampur", "status": "Pending"}, "sort": {"created_at": -1}}
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["gram_sahayak_test"]
+    recorder = SlowQueryRecorder(threshold_ms=100)
+    monkeypatch.setattr(slow_queries, "db", db)
+    monkeypatch.setattr(slow_queries, "slow_query_recorder", recorder)
+
+    async def fake_explain(database, collection, command_name, command):
+        return slow_queries.summarise_explain({
+            "queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}},
+            "executionStats": {"totalDocsExamined": 5000, "nReturned": 50},
+        })
+
+    monkeypatch.setattr(slow_queries, "explain_sample", fake_explain)
+    return db, recorder
+
+
+def test_report_after_one_tick(profiler):
+    db, recorder = profiler
+    recorder._record("find", 250.0, "gram_sahayak_test", "complaints", FIND)
+
+    async def run():
+        await slow_queries.profiler_tick()
+        return await slow_queries.load_report("db")
+
+    rows = asyncio.run(run())
+    assert len(rows) == 1
+    assert rows[0]["collection"] == "complaints"
+    assert rows[0]["command"] == "find"
+    assert rows[0]["count"] == 1
+    assert rows[0]["no_index"] is True
+
+
+def test_explain_written_before_flush_keeps_descriptors(profiler):
+    db, recorder = profiler
+    recorder._record("find", 250.0, "gram_sahayak_test", "complaints", FIND)
+
+    async def run():
+        await slow_queries.run_pending_explains()
+        await slow_queries.flush_shapes()
+        return await slow_queries.load_report("db")
+
+    rows = asyncio.run(run())
+    assert rows[0]["collection"] == "complaints"
+    assert rows[0]["shape"]["filter"] == {"status": "?str", "village_name": "?str"}
+
+
+def test_failed_flush_keeps_counts(profiler, monkeypatch):
+    db, recorder = profiler
+    recorder._record("find", 250.0, "gram_sahayak_test", "complaints", FIND)
+
+    async def broken_bulk_write(*args, **kwargs):
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(slow_queries, "db", SimpleNamespace(slow_query_shapes=SimpleNamespace(bulk_write=broken_bulk_write)))
+    with pytest.raises(RuntimeError):
+        asyncio.run(slow_queries.flush_shapes())
+
+    deltas = recorder.take_unflushed()
+    assert [d["delta"]["count"] for d in deltas] == [1]